@@ -0,0 +1,296 @@
+"""
+===============================================================
+📦 FICHIER appAssets.py – Fichiers statiques versionnés (JS / CSS)
+===============================================================
+
+static/JS (une quarantaine de modules ES) et static/CSS étaient servis par
+le gestionnaire statique de Flask sans cache longue durée : chaque page
+revalidait des dizaines de fichiers, découverts import après import.
+
+Étape de construction (à relancer après toute modification de static/JS ou
+static/CSS) :
+    python appAssets.py
+
+- Chaque fichier est copié dans static/dist avec l'empreinte de son contenu
+  dans le nom (hotel.3f2a9c1e.js). Les imports relatifs des modules sont
+  réécrits vers les noms versionnés : l'empreinte d'un module dépend donc de
+  celles de ses dépendances. Les modules qui s'importent mutuellement
+  (reservation.js ↔ reservations/reservationInit.js) partagent une empreinte.
+- Les url("../Image/…") relatives des CSS deviennent des chemins /static/….
+- Chaque fichier a ses variantes précompressées .gz (et .br si brotli est
+  installé).
+- static/dist/manifest.json associe chaque fichier source à son nom versionné
+  et, pour un point d'entrée de page, à la liste de tous les modules qu'il
+  charge (préchargés en parallèle par <link rel="modulepreload">).
+
+Les modules restent séparés (pas de bundler JS dans le projet) : une page
+précharge toute son arborescence d'un coup, puis plus aucune requête n'est
+faite tant que les fichiers ne changent pas (Cache-Control: immutable).
+
+Côté Flask, init_assets(app) ajoute la route /assets/<fichier> et les
+fonctions Jinja asset_url() / asset_preloads(). Sans manifest (construction
+non lancée), les templates retombent sur les fichiers de static/.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appAssets.py
+# =========================================
+
+# 1. 🔧 Chemins & réglages
+# 2. 🔗 Graphe des imports (modules ES)
+# 3. 🏗️ Construction (empreintes, réécriture, compression, manifest)
+# 4. 🌐 Intégration Flask (route /assets, fonctions Jinja)
+
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+from flask import request, send_from_directory, url_for, abort
+from markupsafe import Markup, escape
+
+try:
+    import brotli
+except ImportError:  # Dépendance optionnelle : pip install brotli (sinon .gz seulement)
+    brotli = None
+
+# =========================================
+# 1. 🔧 Chemins & réglages
+# =========================================
+STATIC_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "static"))
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_NAME = "manifest.json"
+
+# Dossiers de static/ traités par la construction
+ASSET_DIRS = ("JS", "CSS")
+ASSET_EXTENSIONS = (".js", ".css")
+
+ASSET_URL_PREFIX = "/assets"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+HASH_LENGTH = 8
+
+# Imports statiques et dynamiques à chemin relatif : from './x.js', import './x.js', import('./x.js')
+_IMPORT = re.compile(r"""(\bfrom\s*|\bimport\s*\(?\s*)(['"])(\.{1,2}/[^'"]+)\2""")
+# url(...) relatives dans les CSS (data:, http:, / absolus laissés tels quels)
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)(?![a-zA-Z][a-zA-Z0-9+.-]*:|/|#)([^'")]+)\1\s*\)""")
+
+
+# =========================================
+# 2. 🔗 Graphe des imports (modules ES)
+# =========================================
+def list_sources(static_dir=STATIC_DIR):
+    """Chemins relatifs (séparateur /) des fichiers JS et CSS à construire, triés."""
+    sources = []
+    for folder in ASSET_DIRS:
+        for root, _, files in os.walk(os.path.join(static_dir, folder)):
+            for name in files:
+                if name.endswith(ASSET_EXTENSIONS):
+                    path = os.path.relpath(os.path.join(root, name), static_dir)
+                    sources.append(path.replace(os.sep, "/"))
+    return sorted(sources)
+
+
+def resolve_import(source, specifier):
+    """'JS/reservations/x.js' + '../reservation.js' → 'JS/reservation.js'."""
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source), specifier))
+
+
+def module_imports(source, text, known):
+    """Modules (connus) importés par `source`, dans l'ordre d'apparition."""
+    found = []
+    for match in _IMPORT.finditer(text):
+        target = resolve_import(source, match.group(3))
+        if target in known and target not in found:
+            found.append(target)
+    return found
+
+
+def strongly_connected(graph):
+    """Composantes fortement connexes (Tarjan), dépendances avant dépendants."""
+    index, low, stack, on_stack, components = {}, {}, [], set(), []
+    counter = [0]
+
+    def visit(node):
+        index[node] = low[node] = counter[0]
+        counter[0] += 1
+        stack.append(node)
+        on_stack.add(node)
+        for target in graph[node]:
+            if target not in index:
+                visit(target)
+                low[node] = min(low[node], low[target])
+            elif target in on_stack:
+                low[node] = min(low[node], index[target])
+        if low[node] == index[node]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == node:
+                    break
+            components.append(sorted(component))
+
+    for node in sorted(graph):
+        if node not in index:
+            visit(node)
+    return components
+
+
+def transitive_imports(graph, entry):
+    """Tous les modules chargés par `entry` (sans lui-même), dans l'ordre de découverte."""
+    seen, pending = [], list(graph[entry])
+    while pending:
+        node = pending.pop(0)
+        if node != entry and node not in seen:
+            seen.append(node)
+            pending.extend(graph[node])
+    return seen
+
+
+# =========================================
+# 3. 🏗️ Construction
+# =========================================
+def hashed_name(path, digest):
+    stem, extension = posixpath.splitext(path)
+    return f"{stem}.{digest[:HASH_LENGTH]}{extension}"
+
+
+def rewrite_js(source, text, names):
+    def replace(match):
+        target = resolve_import(source, match.group(3))
+        if target not in names:
+            return match.group(0)
+        relative = posixpath.relpath(names[target], posixpath.dirname(source))
+        if not relative.startswith("."):
+            relative = "./" + relative
+        return f"{match.group(1)}{match.group(2)}{relative}{match.group(2)}"
+    return _IMPORT.sub(replace, text)
+
+
+def rewrite_css(source, text):
+    def replace(match):
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(source), match.group(2)))
+        return f'url("/static/{target}")'
+    return _CSS_URL.sub(replace, text)
+
+
+def write_with_variants(path, data):
+    """Écrit le fichier et ses variantes précompressées (.gz, .br)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build_assets(static_dir=STATIC_DIR, dist_dir=None):
+    """Construit static/dist et renvoie le manifest {source: {"file", "imports"}}."""
+    dist_dir = dist_dir or os.path.join(static_dir, "dist")
+    sources = list_sources(static_dir)
+    texts = {}
+    for source in sources:
+        with open(os.path.join(static_dir, source), encoding="utf-8") as f:
+            texts[source] = f.read()
+
+    known = set(sources)
+    graph = {source: module_imports(source, texts[source], known) if source.endswith(".js") else []
+             for source in sources}
+
+    # Empreinte par composante : contenu source de ses membres + noms versionnés de ses dépendances
+    names = {}
+    for component in strongly_connected(graph):
+        digest = hashlib.sha256()
+        for member in component:
+            digest.update(member.encode("utf-8") + b"\0" + texts[member].encode("utf-8") + b"\0")
+            for target in graph[member]:
+                if target not in component:
+                    digest.update(names[target].encode("utf-8") + b"\0")
+        for member in component:
+            names[member] = hashed_name(member, digest.hexdigest())
+
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+
+    manifest = {}
+    for source in sources:
+        if source.endswith(".js"):
+            output = rewrite_js(source, texts[source], names)
+        else:
+            output = rewrite_css(source, texts[source])
+        write_with_variants(os.path.join(dist_dir, *names[source].split("/")), output.encode("utf-8"))
+        manifest[source] = {
+            "file": names[source],
+            "imports": [names[target] for target in transitive_imports(graph, source)]
+        }
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# =========================================
+# 4. 🌐 Intégration Flask (route /assets, fonctions Jinja)
+# =========================================
+def load_manifest(dist_dir=DIST_DIR):
+    """Manifest de la dernière construction ({} si elle n'a pas été lancée)."""
+    try:
+        with open(os.path.join(dist_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def init_assets(app, dist_dir=DIST_DIR):
+    """Route /assets/<fichier> (immutable, précompressé) et fonctions Jinja asset_url / asset_preloads."""
+    manifest = load_manifest(dist_dir)
+
+    def asset_url(path):
+        entry = manifest.get(path)
+        if entry is None:
+            return url_for("static", filename=path)  # Construction non lancée : fichier source
+        return f"{ASSET_URL_PREFIX}/{entry['file']}"
+
+    def asset_preloads(*paths):
+        """<link rel="modulepreload"> pour tous les modules chargés par les points d'entrée de la page."""
+        names = []
+        for path in paths:
+            entry = manifest.get(path)
+            if entry is not None:
+                names.extend(name for name in [entry["file"], *entry["imports"]] if name not in names)
+        return Markup("\n".join(
+            f'<link rel="modulepreload" href="{ASSET_URL_PREFIX}/{escape(name)}">' for name in names
+        ))
+
+    def serve_asset(filename):
+        if filename.endswith((".gz", ".br")) or filename == MANIFEST_NAME:
+            abort(404)
+        encodings = request.accept_encodings
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encodings[encoding] and os.path.isfile(os.path.join(dist_dir, filename + suffix)):
+                mimetype = "text/css" if filename.endswith(".css") else "text/javascript"
+                response = send_from_directory(dist_dir, filename + suffix, mimetype=mimetype, max_age=31536000)
+                response.headers["Content-Encoding"] = encoding
+                break
+        else:
+            response = send_from_directory(dist_dir, filename, max_age=31536000)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE
+        response.vary.add("Accept-Encoding")
+        return response
+
+    app.add_url_rule(f"{ASSET_URL_PREFIX}/<path:filename>", "assets", serve_asset)
+    app.jinja_env.globals.update(asset_url=asset_url, asset_preloads=asset_preloads)
+    return manifest
+
+
+if __name__ == "__main__":
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else STATIC_DIR
+    built = build_assets(static_dir)
+    print(f"✅ {len(built)} fichier(s) versionné(s) dans {os.path.join(static_dir, 'dist')}")
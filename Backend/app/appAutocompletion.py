@@ -0,0 +1,125 @@
+"""
+===============================================================
+🔎 FICHIER appAutocompletion.py – Index de préfixes pour /autocomplete
+===============================================================
+
+La route /autocomplete exécutait trois `LOWER(name) LIKE '%q%'` (parcours
+complets de cities et countries) à chaque frappe, sans trouver les variantes
+accentuées ("seville" → "Séville", "sao paulo" → "São Paulo").
+
+Ce module construit en mémoire un tableau trié de clés normalisées (sans
+accents, sans casse, tirets et apostrophes remplacés par des espaces) pour
+les villes, pays et continents. Chaque début de mot est indexé ("york" trouve
+"New York"). Une recherche est une dichotomie (bisect) suivie d'un parcours
+des seules clés qui commencent par la saisie. Les résultats sont classés par
+nombre d'hôtels puis par nom, et limités à N suggestions. Une ville et un pays
+de même nom (ex. Luxembourg) restent deux suggestions distinctes, chacune avec
+son propre nombre d'hôtels.
+
+L'index est reconstruit à partir de l'instantané du catalogue (appCatalogue)
+à chaque changement de version.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appAutocompletion.py
+# =========================================
+
+# 1. 🔤 Normalisation (accents, casse, ponctuation)
+# 2. 🗂️ AutocompleteIndex (construction, recherche)
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+
+# =========================================
+# 1. 🔤 Normalisation (accents, casse, ponctuation)
+# =========================================
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+
+def fold(text):
+    """'São Paulo' → 'sao paulo' ; 'Nouvelle-Zélande' → 'nouvelle zelande'."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", without_accents.casefold()).strip()
+
+
+def word_suffixes(folded):
+    """Toutes les fins de libellé commençant par un mot : 'rio de janeiro', 'de janeiro', 'janeiro'."""
+    words = folded.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+# =========================================
+# 2. 🗂️ AutocompleteIndex
+# =========================================
+class AutocompleteIndex:
+    def __init__(self, entries):
+        """`entries` : itérable de (type, libellé affiché, nombre d'hôtels), type = 'city', 'country' ou 'continent'."""
+        counts = Counter()
+        for kind, label, hotel_count in entries:
+            if label:
+                counts[(kind, label)] += hotel_count
+
+        entry_keys = sorted(counts, key=lambda entry: (entry[1], entry[0]))
+        self.kinds = [kind for kind, _ in entry_keys]
+        self.labels = [label for _, label in entry_keys]
+        self.hotel_counts = [counts[entry] for entry in entry_keys]
+        keys = []
+        for label_id, label in enumerate(self.labels):
+            for suffix in word_suffixes(fold(label)):
+                keys.append((suffix, label_id))
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._label_ids = [label_id for _, label_id in keys]
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Villes, pays et continents du catalogue, pondérés par leur nombre d'hôtels."""
+        city_counts = Counter(hotel.city_id for hotel in snapshot.hotels)
+        country_counts = Counter(hotel.country for hotel in snapshot.hotels)
+        continent_counts = Counter(hotel.continent for hotel in snapshot.hotels)
+
+        entries = [("city", city.name, city_counts[city.id]) for city in snapshot.cities]
+        entries += [("country", country.name, country_counts[country.name]) for country in snapshot.countries]
+        entries += [("continent", continent, continent_counts[continent])
+                    for continent in {country.continent for country in snapshot.countries}]
+        return cls(entries)
+
+    def search(self, query, limit=10):
+        prefix = fold(query)
+        if not prefix:
+            return []
+
+        matches = set()
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and self._keys[position].startswith(prefix):
+            matches.add(self._label_ids[position])
+            position += 1
+
+        ranked = sorted(matches, key=lambda label_id: (-self.hotel_counts[label_id], self.labels[label_id], label_id))
+        return [self.labels[label_id] for label_id in ranked[:limit]]
+
+
+class CatalogAutocomplete:
+    """Index d'autocomplétion lié à une version du catalogue, reconstruit quand elle change."""
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self._lock = threading.Lock()
+        self._version = None
+        self._index = None
+
+    def get(self, conn):
+        snapshot = self._catalog.get(conn)
+        if self._index is None or self._version != snapshot.version:
+            with self._lock:
+                if self._index is None or self._version != snapshot.version:
+                    self._index = AutocompleteIndex.from_snapshot(snapshot)
+                    self._version = snapshot.version
+        return self._index
+
+    def search(self, conn, query, limit=10):
+        return self.get(conn).search(query, limit)
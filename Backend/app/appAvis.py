@@ -0,0 +1,275 @@
+"""
+===============================================================
+💬 FICHIER appAvis.py – Chargement groupé des avis (SQLite)
+===============================================================
+
+Les routes de listing (/hotels, /recherche, /filter_hotels, /api/hotels)
+renvoient chaque hôtel avec ses avis. Plutôt que d'exécuter la même
+requête `reviews JOIN user` une fois par hôtel (N+1 requêtes), ce module
+récupère les avis de tout un lot d'hôtels en une seule requête (découpée
+par paquets pour rester sous la limite de paramètres SQLite) puis les
+regroupe par hôtel en Python.
+
+Statistiques d'avis : la table `hotel_review_stats` tient, pour chaque hôtel,
+le nombre d'avis, leur somme, la moyenne, l'histogramme des notes (7 à 10) et
+la date du dernier avis. Des triggers sur `reviews` la mettent à jour à chaque
+INSERT / UPDATE / DELETE : afficher ou classer les hôtels par note ne demande
+plus de parcourir les avis. La table, ses triggers et le calcul initial sont
+créés une fois par la migration 7 (appMigrations.py), jamais par une route.
+
+Page d'avis (/get_reviews) : pagination keyset sur (date, id) ou (note, id),
+appuyée sur les index composites `(hotel_id, date_posted DESC, id)` et
+`(hotel_id, rating DESC, id)`. Chaque page est une recherche dans l'index à
+partir du dernier avis renvoyé : le coût ne dépend ni du numéro de page ni du
+nombre total d'avis de l'hôtel.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appAvis.py
+# =========================================
+
+# 1. 🔧 Constantes
+# 2. 🧩 Mise en forme d'un avis
+# 3. 📦 Chargement groupé des avis
+# 4. 📊 Statistiques d'avis par hôtel (table + triggers)
+# 5. 📄 Page d'avis d'un hôtel (index composites + keyset)
+
+# =========================================
+# 1. 🔧 Constantes
+# =========================================
+
+# Nombre maximum d'identifiants par requête (SQLite limite les paramètres à 999 sur les anciennes versions)
+REVIEW_CHUNK_SIZE = 500
+
+# Notes possibles (contrainte CHECK de la table reviews) : une colonne d'histogramme par note
+RATING_VALUES = (7, 8, 9, 10)
+
+
+# =========================================
+# 2. 🧩 Mise en forme d'un avis
+# =========================================
+def format_review(row):
+    return {
+        "first_name": row["first_name"],
+        "last_name": row["name"],
+        "rating": row["rating"],
+        "comment": row["comment"],
+        "date_posted": row["date_posted"]
+    }
+
+
+# =========================================
+# 3. 📦 Chargement groupé des avis
+# =========================================
+def load_reviews_for_hotels(conn, hotel_ids, chunk_size=REVIEW_CHUNK_SIZE):
+    """
+    Renvoie un dictionnaire {hotel_id: [avis, ...]} pour tous les hôtels demandés.
+    Les avis de chaque hôtel sont triés du plus récent au plus ancien.
+    Chaque hôtel demandé est présent dans le résultat (liste vide s'il n'a aucun avis).
+    """
+    unique_ids = list(dict.fromkeys(hotel_ids))
+    reviews_by_hotel = {hotel_id: [] for hotel_id in unique_ids}
+
+    for start in range(0, len(unique_ids), chunk_size):
+        chunk = unique_ids[start:start + chunk_size]
+        placeholders = ",".join(["?"] * len(chunk))
+        cursor = conn.execute(f"""
+            SELECT r.hotel_id, r.rating, r.comment, r.date_posted, u.first_name, u.name
+            FROM reviews r
+            JOIN user u ON r.user_id = u.id_user
+            WHERE r.hotel_id IN ({placeholders})
+            ORDER BY r.hotel_id, r.date_posted DESC
+        """, chunk)
+
+        for row in cursor.fetchall():
+            reviews_by_hotel[row["hotel_id"]].append(format_review(row))
+
+    return reviews_by_hotel
+
+
+# =========================================
+# 4. 📊 Statistiques d'avis par hôtel (table + triggers)
+# =========================================
+_HISTOGRAM_COLUMNS = tuple(f"rating_{value}" for value in RATING_VALUES)
+
+
+def _add_review_sql(ref):
+    """Ajoute l'avis `ref` (new) aux statistiques de son hôtel."""
+    histogram = ", ".join(f"rating_{value} = rating_{value} + ({ref}.rating = {value})" for value in RATING_VALUES)
+    return f"""
+        INSERT OR IGNORE INTO hotel_review_stats (hotel_id) VALUES ({ref}.hotel_id);
+        UPDATE hotel_review_stats SET
+            review_count = review_count + 1,
+            rating_sum = rating_sum + {ref}.rating,
+            average_rating = (rating_sum + {ref}.rating) * 1.0 / (review_count + 1),
+            {histogram},
+            last_review_date = CASE
+                WHEN last_review_date IS NULL OR {ref}.date_posted > last_review_date THEN {ref}.date_posted
+                ELSE last_review_date
+            END
+        WHERE hotel_id = {ref}.hotel_id;
+    """
+
+
+def _remove_review_sql(ref):
+    """Retire l'avis `ref` (old) des statistiques de son hôtel (la date est relue dans reviews)."""
+    histogram = ", ".join(f"rating_{value} = rating_{value} - ({ref}.rating = {value})" for value in RATING_VALUES)
+    return f"""
+        UPDATE hotel_review_stats SET
+            review_count = review_count - 1,
+            rating_sum = rating_sum - {ref}.rating,
+            average_rating = CASE
+                WHEN review_count > 1 THEN (rating_sum - {ref}.rating) * 1.0 / (review_count - 1)
+            END,
+            {histogram},
+            last_review_date = (SELECT MAX(date_posted) FROM reviews WHERE hotel_id = {ref}.hotel_id)
+        WHERE hotel_id = {ref}.hotel_id;
+    """
+
+
+def ensure_review_stats(conn):
+    """
+    Crée la table hotel_review_stats et ses triggers si besoin, puis la remplit. Renvoie True si créée.
+    Pas de commit : exécutée dans la transaction de la migration 7.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hotel_review_stats'"
+    ).fetchone()
+    histogram_columns = ",\n".join(f"            {column} INTEGER NOT NULL DEFAULT 0" for column in _HISTOGRAM_COLUMNS)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS hotel_review_stats (
+            hotel_id INTEGER PRIMARY KEY,
+            review_count INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            average_rating REAL,
+{histogram_columns},
+            last_review_date TEXT
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_review_stats_insert AFTER INSERT ON reviews BEGIN
+            {_add_review_sql("new")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_review_stats_delete AFTER DELETE ON reviews BEGIN
+            {_remove_review_sql("old")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_review_stats_update AFTER UPDATE OF hotel_id, rating, date_posted ON reviews BEGIN
+            {_remove_review_sql("old")}
+            {_add_review_sql("new")}
+            UPDATE hotel_review_stats
+            SET last_review_date = (SELECT MAX(date_posted) FROM reviews WHERE hotel_id = new.hotel_id)
+            WHERE hotel_id = new.hotel_id;
+        END
+    """)
+    if exists is None:
+        _fill_review_stats(conn)
+    return exists is None
+
+
+def rebuild_review_stats(conn):
+    """Recalcule toutes les statistiques à partir de la table reviews (import en masse, réparation)."""
+    _fill_review_stats(conn)
+    conn.commit()
+
+
+def _fill_review_stats(conn):
+    histogram = ", ".join(f"SUM(rating = {value})" for value in RATING_VALUES)
+    conn.execute("DELETE FROM hotel_review_stats")
+    conn.execute(f"""
+        INSERT INTO hotel_review_stats (
+            hotel_id, review_count, rating_sum, average_rating, {", ".join(_HISTOGRAM_COLUMNS)}, last_review_date
+        )
+        SELECT hotel_id, COUNT(*), SUM(rating), AVG(rating), {histogram}, MAX(date_posted)
+        FROM reviews
+        GROUP BY hotel_id
+    """)
+
+
+def format_review_stats(row=None):
+    """Statistiques exposées par les listings (valeurs vides pour un hôtel sans avis)."""
+    if row is None or not row["review_count"]:
+        return {
+            "review_count": 0,
+            "average_rating": None,
+            "rating_histogram": {str(value): 0 for value in RATING_VALUES},
+            "last_review_date": None
+        }
+    return {
+        "review_count": row["review_count"],
+        "average_rating": round(row["average_rating"], 1),
+        "rating_histogram": {str(value): row[f"rating_{value}"] for value in RATING_VALUES},
+        "last_review_date": row["last_review_date"]
+    }
+
+
+def load_review_stats(conn, hotel_ids=None, chunk_size=REVIEW_CHUNK_SIZE):
+    """Renvoie {hotel_id: statistiques} pour les hôtels demandés (tous si `hotel_ids` vaut None)."""
+    if hotel_ids is None:
+        rows = conn.execute("SELECT * FROM hotel_review_stats").fetchall()
+        return {row["hotel_id"]: format_review_stats(row) for row in rows}
+
+    unique_ids = list(dict.fromkeys(hotel_ids))
+    stats = {hotel_id: format_review_stats() for hotel_id in unique_ids}
+    for start in range(0, len(unique_ids), chunk_size):
+        chunk = unique_ids[start:start + chunk_size]
+        placeholders = ",".join(["?"] * len(chunk))
+        for row in conn.execute(f"SELECT * FROM hotel_review_stats WHERE hotel_id IN ({placeholders})", chunk):
+            stats[row["hotel_id"]] = format_review_stats(row)
+    return stats
+
+
+# =========================================
+# 5. 📄 Page d'avis d'un hôtel (index composites + keyset)
+# =========================================
+
+# Tri -> (nom de l'index, colonne de tri) ; l'ordre est toujours `colonne DESC, id ASC`
+# (index créés par la migration 4 d'appMigrations.py)
+REVIEW_SORTS = {
+    "date": ("idx_reviews_hotel_date", "date_posted"),
+    "note": ("idx_reviews_hotel_rating", "rating"),
+}
+# Anciens noms de tri acceptés par /get_reviews
+REVIEW_SORT_ALIASES = {"rating": "note"}
+
+
+def normalize_review_sort(sort_by):
+    sort_by = REVIEW_SORT_ALIASES.get(sort_by, sort_by)
+    return sort_by if sort_by in REVIEW_SORTS else "date"
+
+
+def load_review_page(conn, hotel_id, sort_by="date", after=None, limit=10):
+    """
+    Renvoie (lignes, position) : au plus `limit` avis de l'hôtel dans l'ordre demandé,
+    à partir de la position `after` = [valeur de tri, id] du dernier avis déjà reçu.
+    `position` est celle du dernier avis renvoyé, ou None s'il n'y a plus d'avis.
+    """
+    _, column = REVIEW_SORTS[normalize_review_sort(sort_by)]
+    select = f"""
+        SELECT r.id, r.rating, r.comment, r.date_posted, u.first_name, u.name
+        FROM reviews r
+        JOIN user u ON r.user_id = u.id_user
+        WHERE r.hotel_id = ?
+    """
+
+    if after is None:
+        rows = conn.execute(f"{select} ORDER BY r.{column} DESC, r.id LIMIT ?", (hotel_id, limit + 1)).fetchall()
+    else:
+        # Deux recherches bornées dans l'index, quel que soit le nombre d'ex-aequo :
+        # la suite des avis de même valeur (id plus grand), puis les valeurs inférieures.
+        rows = conn.execute(
+            f"{select} AND r.{column} = ? AND r.id > ? ORDER BY r.id LIMIT ?",
+            (hotel_id, after[0], after[1], limit + 1)
+        ).fetchall()
+        if len(rows) <= limit:
+            rows += conn.execute(
+                f"{select} AND r.{column} < ? ORDER BY r.{column} DESC, r.id LIMIT ?",
+                (hotel_id, after[0], limit + 1 - len(rows))
+            ).fetchall()
+
+    page = rows[:limit]
+    position = [page[-1][column], page[-1]["id"]] if len(rows) > limit else None
+    return page, position
@@ -6,8 +6,10 @@ import random
 import logging
 import time
 from opencage.geocoder import OpenCageGeocode
-from flask import Flask, g, request, jsonify
+from flask import Flask, request, jsonify
 from datetime import datetime, timedelta
+from appMigrations import migrate
+from appConnexion import get_db_connection, init_db
 
 # Initialisation de l'application Flask
 app = Flask(__name__, static_folder="../../static", template_folder="../../Frontend/templates")  # Chemin relatif vers les templates
@@ -17,18 +19,9 @@ app = Flask(__name__, static_folder="../../static", template_folder="../../Front
 # 🔧 Connexion à la base de données SQLite
 # ============================
 
-# Fonction pour gérer la connexion à la base de données SQLite
-def get_db_connection():
-    if not hasattr(g, 'sqlite_db'):  # Vérifier si la connexion à la DB existe déjà
-        g.sqlite_db = sqlite3.connect('hotels.db')  # Ouvrir une nouvelle connexion à la DB
-        g.sqlite_db.row_factory = sqlite3.Row  # Permet de récupérer les résultats sous forme de dictionnaire
-    return g.sqlite_db  # Retourner la connexion à la DB
-
-# Fermeture de la connexion à la base de données quand l'application se termine
-@app.teardown_appcontext
-def close_db_connection(exception):
-    if hasattr(g, 'sqlite_db'):  # Vérifier si la connexion à la DB existe
-        g.sqlite_db.close()  # Fermer la connexion à la base de données
+# get_db_connection() (appConnexion) : connexion configurée, prise dans le pool
+# partagé et rendue automatiquement à la fin du contexte Flask
+init_db(app)
 
 
 # ============================
@@ -180,6 +173,9 @@ def create_tables():
 
             conn.commit()
 
+            # Migrations numérotées (index des réservations et des avis, statistiques d'avis, recherche plein texte, index spatial, occupation par nuit, version du catalogue, ...) suivies dans schema_version
+            migrate(conn)
+
     except sqlite3.Error as e:
             # Gestion des erreurs lors de la création des tables et des transactions
             logging.error(f"Erreur lors de la création des tables : {e}")
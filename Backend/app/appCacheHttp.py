@@ -0,0 +1,295 @@
+"""
+===============================================================
+🏷️ FICHIER appCacheHttp.py – Réponses conditionnelles (ETag / 304)
+===============================================================
+
+/hotels, /api/hotels, /get_reviews, /api/default-hotel et /autocomplete
+recalculaient et renvoyaient tout le corps à chaque appel, même quand rien
+n'avait changé depuis le dernier chargement du navigateur.
+
+- Version des données : le compteur `catalog_version` (appCatalogue), incrémenté
+  par triggers à chaque écriture sur hotels, cities, countries ou reviews.
+  DataVersion le garde en mémoire et ne le relit qu'au plus une fois par
+  VERSION_CHECK_INTERVAL secondes, ou dès qu'une écriture de l'application
+  est validée (écouteur de l'écrivain unique, appEcriture).
+- ETag fort = version des données + endpoint + paramètres de la requête
+  (+ FORMAT_VERSION, à incrémenter quand un format JSON change).
+  Last-Modified = moment où ce processus a vu la version changer, arrondi à la
+  seconde SUPÉRIEURE (et toujours postérieur au précédent) : deux versions vues
+  dans la même seconde n'ont jamais la même date.
+- Le décorateur `conditional(policy)` compare If-None-Match (seul, si la
+  requête porte un ETag) ou If-Modified-Since AVANT d'appeler la route : un 304 ne lance aucune requête SQL (tant que la
+  version en mémoire est récente) et ne construit aucun corps.
+- Cache-Control : une politique par type d'endpoint (CACHE_POLICIES).
+
+Compression : brotli (si installé) ou gzip, selon l'en-tête Accept-Encoding.
+Pour les endpoints conditionnels, le corps encodé est conservé dans un cache
+en mémoire indexé par l'ETag (un ETag par encodage) : une requête répétée est
+servie depuis ce cache, sans rappeler la route ni recompresser. Les autres
+réponses JSON volumineuses (ex. /recherche) sont compressées à la volée par
+init_compression(app).
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appCacheHttp.py
+# =========================================
+
+# 1. 🔧 Réglages (politiques Cache-Control)
+# 2. 🔢 DataVersion (version des données en mémoire)
+# 3. 🏷️ Calcul de l'ETag
+# 4. 🗜️ Compression (gzip / brotli) & cache des corps encodés
+# 5. 🚦 Décorateur conditional (304 avant toute requête SQL)
+
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import request, current_app
+from appCatalogue import get_catalog_version
+from appConnexion import get_db_connection
+
+try:
+    import brotli
+except ImportError:  # Dépendance optionnelle : pip install brotli (sinon gzip seulement)
+    brotli = None
+
+# =========================================
+# 1. 🔧 Réglages
+# =========================================
+
+# Délai maximal avant de relire catalog_version (écritures faites hors de l'application)
+VERSION_CHECK_INTERVAL = 1.0
+
+# À incrémenter quand le format JSON d'un endpoint conditionnel change
+FORMAT_VERSION = 2
+
+CACHE_POLICIES = {
+    # Listings : toujours revalidés (réponse 304 sans corps si rien n'a changé)
+    "catalog": "public, no-cache",
+    "reviews": "public, no-cache",
+    # Hôtel par défaut de la page de réservation : peut rester affiché une minute
+    "default_hotel": "public, max-age=60, must-revalidate",
+    # Suggestions : villes et pays changent rarement
+    "autocomplete": "public, max-age=600",
+}
+
+# En dessous de cette taille, la compression coûte plus qu'elle ne rapporte
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Taille totale maximale des corps conservés par le cache des réponses conditionnelles
+RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+
+
+# =========================================
+# 2. 🔢 DataVersion
+# =========================================
+class DataVersion:
+    def __init__(self, connect=get_db_connection, interval=VERSION_CHECK_INTERVAL):
+        self.connect = connect
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._version = None
+        self._changed_at = None
+        self._checked_at = None  # time.monotonic() de la dernière lecture
+
+    def current(self):
+        """
+        Renvoie (version, changed_at). La connexion n'est demandée (`connect`)
+        que si la valeur en mémoire doit être relue.
+        """
+        checked_at = self._checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.interval:
+            return self._version, self._changed_at
+
+        with self._lock:
+            version = get_catalog_version(self.connect())
+            if version != self._version:
+                self._version = version
+                self._changed_at = self._next_changed_at()
+            self._checked_at = time.monotonic()
+            return self._version, self._changed_at
+
+    def _next_changed_at(self):
+        """
+        Last-Modified n'a qu'une précision d'une seconde : l'instant du changement est arrondi à la
+        seconde suivante et reste strictement postérieur au précédent. Un client qui a reçu l'ancienne
+        version dans la même seconde envoie un If-Modified-Since antérieur : pas de 304 erroné.
+        """
+        now = datetime.now(timezone.utc)
+        changed_at = now.replace(microsecond=0) + timedelta(seconds=1 if now.microsecond else 0)
+        if self._changed_at is not None and changed_at <= self._changed_at:
+            changed_at = self._changed_at + timedelta(seconds=1)
+        return changed_at
+
+    def invalidate(self):
+        """Force la relecture au prochain appel (après une écriture validée)."""
+        self._checked_at = None
+
+
+# Instance partagée par les routes
+data_version = DataVersion()
+
+
+# =========================================
+# 3. 🏷️ Calcul de l'ETag
+# =========================================
+def make_etag(version, endpoint, args, encoding=None):
+    """
+    ETag fort : identique tant que les données et la requête (endpoint + paramètres) sont identiques.
+    Chaque encodage est une représentation distincte, avec son propre ETag.
+    """
+    params = "&".join(f"{key}={value}" for key, value in sorted(args.items(multi=True)))
+    digest = hashlib.sha1(f"{FORMAT_VERSION}|{endpoint}|{params}".encode("utf-8")).hexdigest()[:16]
+    return f"{version}-{digest}-{encoding}" if encoding else f"{version}-{digest}"
+
+
+def is_not_modified(etag, changed_at):
+    """Règles HTTP : si la requête porte un ETag, seul If-None-Match est pris en compte."""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    since = request.if_modified_since
+    return since is not None and changed_at is not None and changed_at <= since
+
+
+# =========================================
+# 4. 🗜️ Compression & cache des corps encodés
+# =========================================
+def negotiate_encoding(accept_encodings):
+    """Encodage préféré accepté par le client : 'br', 'gzip' ou None (corps non compressé)."""
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)  # mtime fixe : mêmes octets pour un même ETag
+
+
+def encode_body(body, encoding):
+    """Renvoie (corps, encodage réellement appliqué) ; les petits corps restent non compressés."""
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    return compress(body, encoding), encoding
+
+
+class ResponseCache:
+    """Corps des réponses (déjà encodés) par ETag, limités en taille totale (LRU)."""
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()  # etag -> (corps, type MIME, encodage)
+        self._lock = threading.Lock()
+
+    def get(self, etag):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, etag, body, mimetype, encoding):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(etag, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            self._entries[etag] = (body, mimetype, encoding)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (old_body, _, _) = self._entries.popitem(last=False)
+                self.size -= len(old_body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+# Instance partagée par les routes
+response_cache = ResponseCache()
+
+
+def _compress_response(response):
+    """after_request : compresse les réponses JSON volumineuses qui ne l'ont pas déjà été."""
+    if (response.status_code != 200 or response.direct_passthrough or not response.is_json
+            or "Content-Encoding" in response.headers):
+        return response
+    encoding = negotiate_encoding(request.accept_encodings)
+    response.vary.add("Accept-Encoding")
+    body, applied = encode_body(response.get_data(), encoding)
+    if applied:
+        response.set_data(body)
+        response.headers["Content-Encoding"] = applied
+    return response
+
+
+def init_compression(app):
+    """Active la compression des réponses JSON de toutes les routes."""
+    app.after_request(_compress_response)
+
+
+# =========================================
+# 5. 🚦 Décorateur conditional
+# =========================================
+def _set_validators(response, etag, changed_at, policy):
+    response.set_etag(etag)
+    response.last_modified = changed_at
+    response.headers["Cache-Control"] = CACHE_POLICIES[policy]
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def _cached_response(entry):
+    body, mimetype, encoding = entry
+    response = current_app.response_class(body, mimetype=mimetype)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def conditional(policy):
+    """
+    Rend une route GET conditionnelle : 304 si le client a déjà la version
+    courante ; sinon corps servi depuis le cache s'il existe pour cet ETag,
+    ou route exécutée et sa réponse 200 (encodée, mise en cache) reçoit
+    ETag, Last-Modified et Cache-Control.
+    """
+    if policy not in CACHE_POLICIES:
+        raise ValueError(f"Politique de cache inconnue : {policy}")
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version, changed_at = data_version.current()
+            encoding = negotiate_encoding(request.accept_encodings)
+            etag = make_etag(version, request.endpoint, request.args, encoding)
+
+            if is_not_modified(etag, changed_at):
+                response = current_app.response_class(status=304)
+                return _set_validators(response, etag, changed_at, policy)
+
+            # ✅ Corps déjà calculé (et compressé) pour cet ETag : ni route, ni SQL, ni compression
+            cached = response_cache.get(etag)
+            if cached is not None:
+                return _set_validators(_cached_response(cached), etag, changed_at, policy)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                body, applied = encode_body(response.get_data(), encoding)
+                response_cache.put(etag, body, response.mimetype, applied)
+                response = _cached_response((body, response.mimetype, applied))
+                _set_validators(response, etag, changed_at, policy)
+            return response
+        return wrapper
+    return decorator
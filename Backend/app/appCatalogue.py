@@ -0,0 +1,282 @@
+"""
+===============================================================
+🏨 FICHIER appCatalogue.py – Catalogue d'hôtels en mémoire
+===============================================================
+
+Les routes de listing (/hotels, /api/hotels, /filter_hotels) reconstruisaient
+à chaque appel les mêmes dictionnaires d'hôtels à partir de `hotels JOIN cities`.
+Ce module charge une seule fois les hôtels, villes, pays et avis dans des
+enregistrements immuables (namedtuple) et sert les listings depuis la mémoire.
+
+Invalidation : la table `catalog_version` (migration 11) contient un compteur
+incrémenté par des triggers SQLite à chaque écriture sur hotels, cities,
+countries ou reviews.
+Les écritures faites par appBDD.insert_data ou par les scripts d'administration
+(app_Insertion_Bdd/*) sont donc détectées sans redémarrer le serveur : le
+catalogue compare le compteur à chaque lecture et se reconstruit d'un bloc
+(le nouvel instantané remplace l'ancien en une seule affectation).
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appCatalogue.py
+# =========================================
+
+# 1. 🔧 Constantes & enregistrements immuables
+# 2. 🔢 Compteur de version du catalogue
+# 3. 📦 Instantané du catalogue
+# 4. 🏨 HotelCatalog (chargement, invalidation, filtres)
+
+import threading
+from bisect import bisect_right
+from collections import namedtuple
+from appAvis import load_reviews_for_hotels, load_review_stats, format_review_stats, RATING_VALUES
+from appSerialisation import EQUIPMENT_COLUMNS, amenity_mask, amenity_labels
+
+# =========================================
+# 1. 🔧 Constantes & enregistrements immuables
+# =========================================
+
+# Tables dont toute modification invalide le catalogue
+CATALOG_TABLES = ("hotels", "cities", "countries", "reviews")
+
+CountryRecord = namedtuple("CountryRecord", ["id", "name", "continent"])
+CityRecord = namedtuple("CityRecord", ["id", "name", "country_id"])
+ReviewRecord = namedtuple("ReviewRecord", ["first_name", "last_name", "rating", "comment", "date_posted"])
+HotelRecord = namedtuple("HotelRecord", [
+    "id", "name", "city_id", "city", "country", "continent",
+    "stars", "rooms", "adults_per_room", "children_per_room", "price_per_night",
+    "hotel_rating", "meal_plan", "address", "description", "latitude", "longitude",
+    "image_url", "available_from", "available_to",
+    *EQUIPMENT_COLUMNS,
+    "amenities", "equipments", "reviews", "review_count", "average_rating", "rating_histogram", "last_review_date",
+])
+
+
+# =========================================
+# 2. 🔢 Compteur de version du catalogue
+# =========================================
+def ensure_catalog_version(conn):
+    """Crée la table catalog_version et les triggers qui l'incrémentent (migration 11, sans commit)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)")
+
+    for table in CATALOG_TABLES:
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_catalog_version_{table}_{operation.lower()}
+                AFTER {operation} ON {table}
+                BEGIN
+                    UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+                END
+            """)
+
+
+def get_catalog_version(conn):
+    row = conn.execute("SELECT version FROM catalog_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def bump_catalog_version(conn):
+    """Force l'invalidation du catalogue (écritures faites sans passer par les triggers)."""
+    conn.execute("UPDATE catalog_version SET version = version + 1 WHERE id = 1")
+    conn.commit()
+
+
+# =========================================
+# 3. 📦 Instantané du catalogue
+# =========================================
+class CatalogSnapshot:
+    __slots__ = ("version", "hotels", "hotel_ids", "hotels_by_id", "total", "cities", "countries")
+
+    def __init__(self, version, hotels, cities, countries):
+        self.version = version
+        self.hotels = hotels  # tuple de HotelRecord, triés par id
+        self.hotel_ids = tuple(hotel.id for hotel in hotels)
+        self.hotels_by_id = {hotel.id: hotel for hotel in hotels}
+        self.total = len(hotels)  # Compteur mis en cache (plus de COUNT(*) par appel)
+        self.cities = cities
+        self.countries = countries
+
+
+def build_snapshot(conn, version):
+    countries = tuple(
+        CountryRecord(row["id"], row["name"], row["continent"])
+        for row in conn.execute("SELECT id, name, continent FROM countries ORDER BY id")
+    )
+    cities = tuple(
+        CityRecord(row["id"], row["name"], row["country_id"])
+        for row in conn.execute("SELECT id, name, country_id FROM cities ORDER BY id")
+    )
+
+    rows = conn.execute("""
+        SELECT hotels.*, cities.name AS city, countries.name AS country, countries.continent AS continent
+        FROM hotels
+        JOIN cities ON hotels.city_id = cities.id
+        LEFT JOIN countries ON cities.country_id = countries.id
+        ORDER BY hotels.id
+    """).fetchall()
+    reviews_by_hotel = load_reviews_for_hotels(conn, [row["id"] for row in rows])
+    stats_by_hotel = load_review_stats(conn)  # Agrégats tenus à jour par les triggers (hotel_review_stats)
+    no_reviews = format_review_stats()
+
+    hotels = []
+    for row in rows:
+        reviews = tuple(ReviewRecord(**review) for review in reviews_by_hotel[row["id"]])
+        stats = stats_by_hotel.get(row["id"], no_reviews)
+        amenities = amenity_mask(row)
+
+        hotels.append(HotelRecord(
+            id=row["id"],
+            name=row["name"],
+            city_id=row["city_id"],
+            city=row["city"],
+            country=row["country"],
+            continent=row["continent"],
+            stars=row["stars"],
+            rooms=row["rooms"],
+            adults_per_room=row["adults_per_room"],
+            children_per_room=row["children_per_room"],
+            price_per_night=row["price_per_night"],
+            hotel_rating=row["hotel_rating"],
+            meal_plan=row["meal_plan"],
+            address=row["address"],
+            description=row["description"],
+            latitude=row["latitude"],
+            longitude=row["longitude"],
+            image_url=row["image_url"],
+            available_from=row["available_from"],
+            available_to=row["available_to"],
+            **{column: row[column] for column in EQUIPMENT_COLUMNS},
+            amenities=amenities,
+            equipments=amenity_labels(amenities),  # Tuple partagé, lu dans la table des libellés
+            reviews=reviews,
+            review_count=stats["review_count"],
+            average_rating=stats["average_rating"],
+            rating_histogram=tuple(stats["rating_histogram"][str(value)] for value in RATING_VALUES),
+            last_review_date=stats["last_review_date"],
+        ))
+
+    return CatalogSnapshot(version, tuple(hotels), cities, countries)
+
+
+# =========================================
+# 4. 🏨 HotelCatalog
+# =========================================
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_list(value):
+    """Filtre à choix multiples : liste (JSON, getlist) ou valeur seule ('4', 'breakfast'), jamais itérée caractère par caractère."""
+    if value is None or value == "":
+        return []
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+# Filtres à choix multiples : lus avec request.args.getlist() pour une requête GET
+LIST_FILTERS = ("stars", "meal_plan", "hotel_rating")
+
+
+def _like(text, pattern):
+    """Équivalent de `text LIKE '%pattern%'` (insensible à la casse)."""
+    return text is not None and str(pattern).lower() in text.lower()
+
+
+class HotelCatalog:
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self, conn):
+        """Renvoie l'instantané courant, reconstruit si la version en base a changé."""
+        version = get_catalog_version(conn)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = build_snapshot(conn, version)
+                self._snapshot = snapshot  # ✅ Remplacement atomique
+        return snapshot
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def hotels(self, conn):
+        return self.get(conn).hotels
+
+    def count(self, conn):
+        return self.get(conn).total
+
+    def page_after(self, conn, after_id, limit):
+        """
+        Pagination keyset sur l'id (clé de tri stable) : renvoie les `limit` hôtels
+        d'id strictement supérieur à `after_id`, l'id du dernier s'il reste une page, et le total.
+        """
+        snapshot = self.get(conn)
+        start = bisect_right(snapshot.hotel_ids, after_id) if after_id is not None else 0
+        items = snapshot.hotels[start:start + limit]
+        has_more = start + limit < snapshot.total
+        last_id = items[-1].id if items and has_more else None
+        return items, last_id, snapshot.total
+
+    def filter_hotels(self, conn, filters):
+        """Applique en mémoire les mêmes filtres que l'ancienne requête SQL de /filter_hotels."""
+        stars = {_to_number(s) for s in _as_list(filters.get('stars'))}
+        min_price = _to_number(filters.get('min_price'))
+        max_price = _to_number(filters.get('max_price'))
+        max_rooms = _to_number(filters.get('max_rooms'))
+        hotel_name = filters.get('hotel_name')
+        city_name = filters.get('city_name')
+        kitchenette = filters.get('kitchenette')
+        meal_plan = set(_as_list(filters.get('meal_plan')))
+        flags = {
+            column: _to_number(filters.get(column))
+            for column in ("parking", "restaurant", "piscine", "gym", "spa", "pets_allowed", "free_wifi",
+                           "air_conditioning", "ev_charging", "wheelchair_accessible", "washing_machine")
+            if filters.get(column)
+        }
+        if kitchenette is not None:
+            flags["kitchenette"] = _to_number(kitchenette)
+
+        # ✅ Note minimale parmi les notes cochées
+        ratings = [float(r) for r in _as_list(filters.get('hotel_rating'))
+                   if isinstance(r, (int, float, str)) and str(r).replace('.', '', 1).isdigit()]
+        min_rating = min(ratings) if ratings else None
+
+        result = []
+        for hotel in self.get(conn).hotels:
+            if stars and hotel.stars not in stars:
+                continue
+            if min_price is not None and (hotel.price_per_night is None or hotel.price_per_night < min_price):
+                continue
+            if max_price is not None and (hotel.price_per_night is None or hotel.price_per_night > max_price):
+                continue
+            if max_rooms is not None and hotel.rooms > max_rooms:
+                continue
+            if hotel_name and not _like(hotel.name, hotel_name):
+                continue
+            if city_name and not _like(hotel.city, city_name):
+                continue
+            if any(getattr(hotel, column) != wanted for column, wanted in flags.items()):
+                continue
+            if meal_plan and hotel.meal_plan not in meal_plan:
+                continue
+            if min_rating is not None and (hotel.hotel_rating is None or hotel.hotel_rating < min_rating):
+                continue
+            result.append(hotel)
+        return result
+
+
+# Instance partagée par les routes
+catalog = HotelCatalog()
@@ -0,0 +1,148 @@
+"""
+===============================================================
+🔌 FICHIER appConnexion.py – Connexions SQLite partagées (pool + PRAGMA)
+===============================================================
+
+Point d'entrée unique vers hotels.db pour toute l'application (routes,
+blueprint d'inscription, création des tables, scripts d'insertion).
+
+- Chemin absolu : la base est celle du dossier Backend/app (ou celle indiquée
+  par la variable d'environnement HOTELS_DB_PATH), quel que soit le dossier
+  depuis lequel le serveur est lancé.
+- Réglages appliqués à chaque ouverture : journal WAL (les lectures ne sont
+  plus bloquées par une écriture), synchronous=NORMAL, busy_timeout, mmap,
+  cache de pages agrandi, et un cache de requêtes préparées plus grand.
+- Pool : une connexion ouverte est réutilisée d'une requête à l'autre au lieu
+  d'être rouverte (et ses PRAGMA réappliqués) à chaque appel. Un thread garde
+  la même connexion tant qu'il en a besoin (appels imbriqués compris) ; elle
+  retourne au pool à la fin du contexte Flask, jamais fermée par les routes.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appConnexion.py
+# =========================================
+
+# 1. 🔧 Chemin & réglages SQLite
+# 2. 🔓 Ouverture d'une connexion configurée
+# 3. ♻️ ConnectionPool (par thread, réutilisable)
+# 4. 🌐 Intégration Flask (g + teardown)
+
+import os
+import sqlite3
+import threading
+from flask import g
+
+# =========================================
+# 1. 🔧 Chemin & réglages SQLite
+# =========================================
+DB_PATH = os.path.abspath(
+    os.environ.get("HOTELS_DB_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "hotels.db")
+)
+
+# Appliqués dans cet ordre à chaque nouvelle connexion
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", 5000),             # ms d'attente avant « database is locked »
+    ("mmap_size", 256 * 1024 * 1024),   # lectures via la mémoire mappée (256 Mo max)
+    ("cache_size", -32000),             # ~32 Mo de pages en cache (valeur négative = Kio)
+    ("temp_store", "MEMORY"),
+)
+
+# Requêtes préparées conservées par connexion (128 par défaut dans sqlite3)
+STATEMENT_CACHE_SIZE = 512
+
+# Connexions inactives conservées par le pool
+MAX_IDLE_CONNECTIONS = 8
+
+
+# =========================================
+# 2. 🔓 Ouverture d'une connexion configurée
+# =========================================
+def open_connection(path=None):
+    """Ouvre une connexion configurée (row_factory=Row + PRAGMA) ; utilisée telle quelle par les scripts."""
+    conn = sqlite3.connect(
+        path or DB_PATH,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,  # Une connexion rendue au pool peut resservir dans un autre thread
+    )
+    conn.row_factory = sqlite3.Row
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+# =========================================
+# 3. ♻️ ConnectionPool
+# =========================================
+class ConnectionPool:
+    def __init__(self, path=None, max_idle=MAX_IDLE_CONNECTIONS):
+        self.path = path or DB_PATH
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def acquire(self):
+        """Connexion du thread courant (la même pour des appels imbriqués), sinon une connexion inactive."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.depth += 1
+            return conn
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = open_connection(self.path)
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn):
+        """Rend la connexion au pool quand le thread n'en a plus besoin."""
+        if getattr(self._local, "conn", None) is not conn:
+            return
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+
+        if conn.in_transaction:
+            conn.rollback()  # Une transaction oubliée ne doit pas suivre la connexion
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+# Pool partagé par toute l'application
+pool = ConnectionPool()
+
+
+# =========================================
+# 4. 🌐 Intégration Flask (g + teardown)
+# =========================================
+def get_db_connection():
+    """Connexion de la requête (ou du contexte d'application) en cours, prise dans le pool."""
+    if "sqlite_db" not in g:
+        g.sqlite_db = pool.acquire()
+    return g.sqlite_db
+
+
+def release_db_connection(exception=None):
+    conn = g.pop("sqlite_db", None)
+    if conn is not None:
+        pool.release(conn)
+
+
+def init_db(app):
+    """Rend la connexion au pool à la fin de chaque contexte d'application."""
+    app.teardown_appcontext(release_db_connection)
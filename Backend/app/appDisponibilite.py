@@ -0,0 +1,192 @@
+"""
+===============================================================
+📆 FICHIER appDisponibilite.py – Disponibilité des hôtels par nuit
+===============================================================
+
+Un hôtel dispose de `hotels.rooms` chambres : il n'est complet une nuit donnée
+que lorsque le nombre de réservations confirmées couvrant cette nuit atteint
+ce nombre de chambres.
+
+Table d'occupation `hotel_occupancy(hotel_id, night, booked)` :
+précalcule, pour chaque hôtel et chaque nuit, le nombre de réservations
+confirmées. Elle est mise à jour dans la même transaction que l'insertion
+(stripe_webhook) ou l'annulation (cancel_reservation) d'une réservation, et
+peut être entièrement recalculée par rebuild_occupancy() après un import en
+masse (ex. app_Insertion_Bdd/appFakeReservations.py). La table est créée et
+remplie à partir des réservations existantes par la migration 10
+(appMigrations.py).
+
+Index en mémoire : pour chaque hôtel, la liste triée des nuits complètes
+(booked >= rooms). Savoir si un hôtel est libre sur les nuits [start, end)
+revient à une recherche dichotomique (bisect) dans cette liste, quelle que
+soit la longueur du séjour ou le nombre de réservations.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appDisponibilite.py
+# =========================================
+
+# 1. 🔧 Constantes & conversion des dates
+# 2. 🧱 Table d'occupation par nuit
+# 3. 📆 AvailabilityIndex (chargement, mises à jour, requêtes)
+
+import threading
+from bisect import bisect_left
+from datetime import date, datetime
+from appCatalogue import get_catalog_version
+
+# =========================================
+# 1. 🔧 Constantes & conversion des dates
+# =========================================
+
+# Statuts de réservation qui occupent une chambre
+CONFIRMED_STATUSES = ("paid", "confirmed")
+
+
+def to_ordinal(value):
+    """Convertit une date (objet date ou chaîne 'YYYY-MM-DD') en numéro de jour."""
+    if isinstance(value, date):
+        return value.toordinal()
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date().toordinal()
+
+
+def night_range(start, end):
+    """Intervalle de nuits [start, end) ; une recherche sur une seule date couvre la nuit de cette date."""
+    start, end = to_ordinal(start), to_ordinal(end)
+    return start, max(end, start + 1)
+
+
+# =========================================
+# 2. 🧱 Table d'occupation par nuit
+# =========================================
+def ensure_occupancy_table(conn):
+    """Crée la table d'occupation et son index si besoin (migration 10, sans commit)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS hotel_occupancy (
+            hotel_id INTEGER NOT NULL,
+            night TEXT NOT NULL,
+            booked INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (hotel_id, night)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_hotel_occupancy_night ON hotel_occupancy(night, hotel_id)")
+
+
+def rebuild_occupancy(conn):
+    """
+    Recalcule toute la table d'occupation à partir des réservations confirmées.
+    Ne fait pas de commit : à appeler dans la transaction de l'appelant (migration 10, import en masse).
+    """
+    placeholders = ",".join(["?"] * len(CONFIRMED_STATUSES))
+    conn.execute("DELETE FROM hotel_occupancy")
+    conn.execute(f"""
+        WITH RECURSIVE nights(hotel_id, night, checkout) AS (
+            SELECT hotel_id, date(checkin), date(checkout)
+            FROM reservations
+            WHERE status IN ({placeholders}) AND date(checkout) > date(checkin)
+            UNION ALL
+            SELECT hotel_id, date(night, '+1 day'), checkout
+            FROM nights
+            WHERE date(night, '+1 day') < checkout
+        )
+        INSERT INTO hotel_occupancy (hotel_id, night, booked)
+        SELECT hotel_id, night, COUNT(*) FROM nights GROUP BY hotel_id, night
+    """, CONFIRMED_STATUSES)
+
+
+def record_stay(conn, hotel_id, checkin, checkout, delta=1):
+    """
+    Ajoute (delta=1) ou retire (delta=-1) un séjour de la table d'occupation.
+    Ne fait pas de commit : à appeler dans la transaction qui insère ou annule la réservation.
+    """
+    first, last = to_ordinal(checkin), to_ordinal(checkout)
+    nights = [(delta, int(hotel_id), date.fromordinal(n).isoformat()) for n in range(first, last)]
+    if delta < 0:
+        # Annulation : seules les nuits déjà comptées sont décrémentées (jamais de ligne négative)
+        conn.executemany("""
+            UPDATE hotel_occupancy SET booked = MAX(booked + ?, 0) WHERE hotel_id = ? AND night = ?
+        """, nights)
+        return
+    conn.executemany("""
+        INSERT INTO hotel_occupancy (booked, hotel_id, night) VALUES (?, ?, ?)
+        ON CONFLICT(hotel_id, night) DO UPDATE SET booked = booked + excluded.booked
+    """, nights)
+
+
+# =========================================
+# 3. 📆 AvailabilityIndex
+# =========================================
+class AvailabilityIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._catalog_version = None
+        self._full_nights = {}  # hotel_id -> liste triée des nuits complètes (numéros de jour)
+
+    # ---------- Chargement ----------
+    def ensure_loaded(self, conn):
+        # Le nombre de chambres vient du catalogue : on recharge si les hôtels ont changé
+        if not self._loaded or self._catalog_version != get_catalog_version(conn):
+            self.load(conn)
+
+    def load(self, conn):
+        catalog_version = get_catalog_version(conn)
+        rows = conn.execute("""
+            SELECT o.hotel_id, o.night
+            FROM hotel_occupancy o
+            JOIN hotels h ON h.id = o.hotel_id
+            WHERE o.booked >= h.rooms
+            ORDER BY o.hotel_id, o.night
+        """).fetchall()
+
+        full_nights = {}
+        for hotel_id, night in rows:
+            full_nights.setdefault(hotel_id, []).append(to_ordinal(night))
+
+        with self._lock:
+            self._full_nights = full_nights
+            self._catalog_version = catalog_version
+            self._loaded = True
+
+    def invalidate(self):
+        """Force un rechargement complet à la prochaine recherche."""
+        with self._lock:
+            self._loaded = False
+
+    # ---------- Mises à jour ----------
+    def refresh_hotel(self, conn, hotel_id):
+        """Relit les nuits complètes d'un hôtel après une réservation ou une annulation."""
+        if not self._loaded:
+            return  # Sera lu depuis la base au prochain chargement
+        rows = conn.execute("""
+            SELECT o.night
+            FROM hotel_occupancy o
+            JOIN hotels h ON h.id = o.hotel_id
+            WHERE o.hotel_id = ? AND o.booked >= h.rooms
+            ORDER BY o.night
+        """, (int(hotel_id),)).fetchall()
+
+        with self._lock:
+            self._full_nights[int(hotel_id)] = [to_ordinal(row[0]) for row in rows]
+
+    # ---------- Requêtes ----------
+    def is_available(self, hotel_id, start, end):
+        start, end = night_range(start, end)
+        return self._is_free(hotel_id, start, end)
+
+    def _is_free(self, hotel_id, start, end):
+        full = self._full_nights.get(hotel_id)
+        if not full:
+            return True
+        # Première nuit complète à partir de l'arrivée : libre si elle tombe après le départ
+        index = bisect_left(full, start)
+        return index == len(full) or full[index] >= end
+
+    def available_hotels(self, hotel_ids, start, end):
+        """Renvoie, dans l'ordre reçu, les hôtels ayant au moins une chambre libre chaque nuit de [start, end)."""
+        start, end = night_range(start, end)
+        return [hotel_id for hotel_id in hotel_ids if self._is_free(hotel_id, start, end)]
+
+
+# Instance partagée par les routes
+availability = AvailabilityIndex()
@@ -0,0 +1,174 @@
+"""
+===============================================================
+✍️ FICHIER appEcriture.py – Écrivain unique (file d'écritures SQLite)
+===============================================================
+
+SQLite n'accepte qu'une écriture à la fois : quand plusieurs requêtes
+(webhook Stripe, annulations, newsletter, contact, inscription…) écrivent en
+même temps, elles se disputent le verrou et finissent par « database is
+locked ».
+
+Un thread dédié possède la seule connexion d'écriture. Les routes lui
+soumettent une fonction `job(conn, *args)` via une file et reçoivent un
+Future ; elles ne gardent que des connexions de lecture (en WAL, les lectures
+ne sont jamais bloquées par l'écrivain).
+
+Validation groupée : l'écrivain prend toutes les écritures en attente (au plus
+MAX_BATCH_SIZE) et les exécute dans une seule transaction, chacune sous un
+SAVEPOINT. Une écriture en erreur est annulée seule (son Future reçoit
+l'exception) sans empêcher les autres d'être validées. Les Futures ne sont
+résolus qu'après le COMMIT : une route qui relit la base voit son écriture.
+
+Une fonction d'écriture ne doit ni valider (commit) ni annuler (rollback)
+elle-même : c'est l'écrivain qui gère la transaction.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appEcriture.py
+# =========================================
+
+# 1. 🔧 Réglages
+# 2. ✍️ SingleWriter (thread, file, validation groupée)
+# 3. 🌐 Écrivain partagé de l'application
+
+import atexit
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from appConnexion import open_connection
+
+# =========================================
+# 1. 🔧 Réglages
+# =========================================
+
+# Écritures validées au plus par transaction
+MAX_BATCH_SIZE = 64
+
+# Attente maximale du résultat d'une écriture côté route (secondes)
+WRITE_TIMEOUT = 30
+
+_STOP = object()
+
+
+# =========================================
+# 2. ✍️ SingleWriter
+# =========================================
+class SingleWriter:
+    def __init__(self, path=None, max_batch=MAX_BATCH_SIZE):
+        self.path = path
+        self.max_batch = max_batch
+        self.batch_count = 0  # Transactions validées (une par lot)
+        self._commit_listeners = []
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ---------- Cycle de vie ----------
+    def start(self):
+        """Démarre le thread d'écriture (au premier appel seulement)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def close(self):
+        """Termine les écritures déjà soumises puis arrête le thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+
+    def add_commit_listener(self, listener):
+        """`listener()` est appelé après chaque transaction validée (ex. invalidation de caches) ; ses erreurs sont ignorées."""
+        self._commit_listeners.append(listener)
+
+    # ---------- Soumission ----------
+    def submit(self, job, *args, **kwargs):
+        """Met `job(conn, *args, **kwargs)` en file ; renvoie un Future (valeur de retour ou exception)."""
+        future = Future()
+        self.start()
+        self._queue.put((future, job, args, kwargs))
+        return future
+
+    def execute(self, job, *args, **kwargs):
+        """Soumet l'écriture et attend qu'elle soit validée ; renvoie le résultat de `job`."""
+        return self.submit(job, *args, **kwargs).result(timeout=WRITE_TIMEOUT)
+
+    # ---------- Thread d'écriture ----------
+    def _run(self):
+        conn = open_connection(self.path)
+        conn.isolation_level = None  # Transactions explicites (BEGIN / SAVEPOINT / COMMIT)
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if _STOP in batch:
+                    stopping = True
+                    batch = [item for item in batch if item is not _STOP]
+                if batch:
+                    self._write_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn, batch):
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, job, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    outcomes.append(None)
+                    continue
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = job(conn, *args, **kwargs)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    outcomes.append((False, e))
+                else:
+                    outcomes.append((True, result))
+                conn.execute("RELEASE job")
+            conn.execute("COMMIT")
+            self.batch_count += 1
+        except sqlite3.Error as e:
+            # Échec de la transaction elle-même : aucune écriture du lot n'est conservée
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for future, *_ in batch:
+                if future.running():
+                    future.set_exception(e)
+            return
+
+        # Écouteurs appelés avant de résoudre les Futures (une route qui relit ne voit pas un cache périmé),
+        # chacun isolé : une erreur est affichée sans arrêter le thread ni bloquer les Futures du lot
+        for listener in self._commit_listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"⚠️ Écouteur de validation {getattr(listener, '__qualname__', listener)} :", e)
+        for (future, *_), outcome in zip(batch, outcomes):
+            if outcome is None:
+                continue
+            succeeded, value = outcome
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+# =========================================
+# 3. 🌐 Écrivain partagé de l'application
+# =========================================
+writer = SingleWriter()
+atexit.register(writer.close)
+
+
+def run_write(job, *args, **kwargs):
+    """Exécute une écriture via l'écrivain partagé et renvoie son résultat (ou lève son exception)."""
+    return writer.execute(job, *args, **kwargs)
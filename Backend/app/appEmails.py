@@ -0,0 +1,372 @@
+"""
+===============================================================
+📬 FICHIER appEmails.py – File d'envoi des emails (email_outbox)
+===============================================================
+
+mail.send() était appelé pendant la requête (webhook Stripe, annulation,
+contact, newsletter, inscription, mot de passe oublié) : chaque réponse
+attendait la connexion TLS et l'authentification auprès de smtp.gmail.com,
+souvent plusieurs secondes, et un email perdu en cas d'erreur SMTP.
+
+- Les routes appellent queue_email(...) : le message est enregistré dans la
+  table `email_outbox` (via l'écrivain unique) et la route répond aussitôt.
+- Un groupe de threads (OUTBOX_WORKERS) vide la file. Chaque thread garde sa
+  propre connexion SMTP ouverte d'un message à l'autre (vérifiée par NOOP
+  après une période d'inactivité, rouverte si le serveur l'a fermée).
+- Échec temporaire (serveur indisponible, code 4xx…) : nouvel essai après un
+  délai exponentiel avec gigue (BACKOFF_BASE × 2^(essais-1), plafonné).
+  Échec définitif (destinataire refusé, code 5xx) ou MAX_ATTEMPTS atteints :
+  le message passe au statut 'dead' avec sa dernière erreur (à examiner
+  puis remettre en 'pending' à la main).
+- Un message pris par un thread est « loué » LEASE_SECONDS : si le processus
+  s'arrête pendant l'envoi, il redevient disponible à l'expiration du bail.
+
+Statuts : pending → sending → sent | pending (nouvel essai) | dead.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appEmails.py
+# =========================================
+
+# 1. 🔧 Réglages
+# 2. 🗄️ Table email_outbox (écritures exécutées par l'écrivain unique)
+# 3. ✉️ Construction du message & connexion SMTP persistante
+# 4. 👷 EmailOutbox (groupe de threads d'envoi)
+# 5. 🌐 File partagée de l'application
+
+import atexit
+import json
+import random
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from appEcriture import writer as app_writer
+
+# =========================================
+# 1. 🔧 Réglages
+# =========================================
+
+# Threads d'envoi (une connexion SMTP chacun)
+OUTBOX_WORKERS = 2
+
+# Messages pris par un thread à chaque passage
+CLAIM_BATCH = 10
+
+# Essais avant de passer un message en 'dead'
+MAX_ATTEMPTS = 6
+
+# Délai avant un nouvel essai (secondes) : BACKOFF_BASE × 2^(essais-1), plafonné à BACKOFF_MAX
+BACKOFF_BASE = 30
+BACKOFF_MAX = 3600
+
+# Durée pendant laquelle un message pris par un thread n'est pas repris par un autre
+LEASE_SECONDS = 300
+
+# Relecture de la file sans signal (nouveaux essais arrivés à échéance)
+POLL_INTERVAL = 5.0
+
+SMTP_TIMEOUT = 20
+
+# Connexion inutilisée depuis plus longtemps : vérifiée (NOOP) avant le message suivant
+SMTP_IDLE_CHECK = 60
+
+
+# =========================================
+# 2. 🗄️ Table email_outbox
+# =========================================
+def ensure_outbox_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            subject TEXT NOT NULL,
+            sender TEXT,
+            recipients TEXT NOT NULL,
+            body TEXT,
+            html TEXT,
+            reply_to TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            sent_at TEXT
+        )
+    """)
+    # Messages à envoyer : status IN ('pending', 'sending') AND next_attempt_at <= maintenant
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(status, next_attempt_at)")
+
+
+def insert_email(conn, subject, recipients, body=None, html=None, sender=None, reply_to=None):
+    """Ajoute un message à la file ; renvoie son id."""
+    return conn.execute("""
+        INSERT INTO email_outbox (subject, sender, recipients, body, html, reply_to, next_attempt_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (subject, sender, json.dumps(list(recipients)), body, html, reply_to, time.time())).lastrowid
+
+
+def claim_due(conn, limit, now, lease=LEASE_SECONDS):
+    """
+    Prend jusqu'à `limit` messages à échéance (en attente, ou dont le bail a
+    expiré) et les loue jusqu'à now + lease.
+    """
+    rows = conn.execute("""
+        SELECT * FROM email_outbox
+        WHERE status IN ('pending', 'sending') AND next_attempt_at <= ?
+        ORDER BY next_attempt_at, id
+        LIMIT ?
+    """, (now, limit)).fetchall()
+    conn.executemany(
+        "UPDATE email_outbox SET status = 'sending', next_attempt_at = ? WHERE id = ?",
+        [(now + lease, row["id"]) for row in rows]
+    )
+    return rows
+
+
+def mark_sent(conn, email_id):
+    conn.execute("""
+        UPDATE email_outbox
+        SET status = 'sent', attempts = attempts + 1, last_error = NULL, sent_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """, (email_id,))
+
+
+def mark_failed(conn, email_id, error, retry_at):
+    """Échec d'un envoi : nouvel essai à `retry_at`, ou 'dead' si `retry_at` vaut None."""
+    conn.execute("""
+        UPDATE email_outbox
+        SET status = ?, attempts = attempts + 1, last_error = ?, next_attempt_at = COALESCE(?, next_attempt_at)
+        WHERE id = ?
+    """, ("dead" if retry_at is None else "pending", error, retry_at, email_id))
+
+
+def retry_delay(attempts, base=BACKOFF_BASE, maximum=BACKOFF_MAX):
+    """Délai avant l'essai suivant `attempts` échecs (exponentiel, gigue ±20 %)."""
+    return min(maximum, base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+def is_permanent(error):
+    """Erreurs qu'un nouvel essai ne corrigera pas (adresse refusée, message rejeté, message invalide)."""
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, ValueError)):
+        return True
+    if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        return error.smtp_code >= 500
+    return False
+
+
+# =========================================
+# 3. ✉️ Construction du message & connexion SMTP persistante
+# =========================================
+def build_message(row, default_sender=None):
+    """EmailMessage (texte et/ou HTML) à partir d'une ligne de email_outbox."""
+    sender = row["sender"] or default_sender
+    if not sender:
+        raise ValueError("Aucun expéditeur (MAIL_DEFAULT_SENDER non configuré)")
+    message = EmailMessage()
+    message["Subject"] = row["subject"]
+    message["From"] = sender
+    message["To"] = ", ".join(json.loads(row["recipients"]))
+    if row["reply_to"]:
+        message["Reply-To"] = row["reply_to"]
+    message["Date"] = formatdate(localtime=True)
+    message["Message-ID"] = make_msgid(idstring=f"outbox{row['id']}")
+    if row["body"]:
+        message.set_content(row["body"])
+        if row["html"]:
+            message.add_alternative(row["html"], subtype="html")
+    else:
+        message.set_content(row["html"] or "", subtype="html" if row["html"] else "plain")
+    return message
+
+
+class SmtpSender:
+    """Connexion SMTP gardée ouverte entre deux messages (un objet par thread d'envoi)."""
+
+    def __init__(self, host, port, use_tls=False, use_ssl=False, username=None, password=None, timeout=SMTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.connections = 0  # Connexions ouvertes depuis la création (suivi / tests)
+        self._smtp = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = smtp_class(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self.connections += 1
+
+    def _is_alive(self):
+        try:
+            return self._smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def send(self, message):
+        if self._smtp is not None and time.monotonic() - self._last_used > SMTP_IDLE_CHECK and not self._is_alive():
+            self.close()
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Connexion fermée par le serveur depuis le dernier message : une reconnexion
+            self.close()
+            self._connect()
+            self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+
+
+# =========================================
+# 4. 👷 EmailOutbox (groupe de threads d'envoi)
+# =========================================
+class EmailOutbox:
+    def __init__(self, writer=app_writer, sender_factory=None, workers=OUTBOX_WORKERS,
+                 max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE, poll_interval=POLL_INTERVAL):
+        self.writer = writer
+        self.sender_factory = sender_factory  # () -> SmtpSender (configuré par init_outbox)
+        self.default_sender = None
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.poll_interval = poll_interval
+        self._table_ready = False
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._signal = 0  # Incrémenté à chaque message ajouté (réveil des threads)
+        self._stopping = False
+
+    # ---------- Cycle de vie ----------
+    def _ensure_table(self):
+        if not self._table_ready:
+            self.writer.execute(ensure_outbox_table)
+            self._table_ready = True
+
+    def start(self):
+        """Démarre les threads d'envoi (au premier appel seulement) ; ils reprennent les messages restés en file."""
+        if self.sender_factory is None:
+            raise RuntimeError("EmailOutbox non configurée : appeler init_outbox(app)")
+        with self._lock:
+            if any(thread.is_alive() for thread in self._threads):
+                return
+            self._ensure_table()
+            self._stopping = False
+            self._threads = [
+                threading.Thread(target=self._run, name=f"email-outbox-{number}", daemon=True)
+                for number in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def close(self):
+        """Arrête les threads après le message en cours (les autres restent en file pour le prochain démarrage)."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in threads:
+            thread.join()
+
+    # ---------- Ajout ----------
+    def enqueue(self, subject, recipients, body=None, html=None, reply_to=None, sender=None):
+        """Enregistre le message dans email_outbox et réveille un thread d'envoi ; renvoie son id."""
+        self._ensure_table()
+        email_id = self.writer.execute(insert_email, subject, recipients, body=body, html=html,
+                                       sender=sender or self.default_sender, reply_to=reply_to)
+        self.notify()
+        return email_id
+
+    def notify(self):
+        """Réveille un thread d'envoi (ex. message ajouté par insert_email dans une autre transaction)."""
+        self.start()
+        with self._wakeup:
+            self._signal += 1
+            self._wakeup.notify()
+
+    # ---------- Threads d'envoi ----------
+    def _run(self):
+        sender = self.sender_factory()
+        try:
+            while not self._stopping:
+                seen = self._signal
+                try:
+                    batch = self.writer.execute(claim_due, CLAIM_BATCH, time.time())
+                    for row in batch:
+                        self._deliver(sender, row)
+                except Exception as e:
+                    # Base indisponible : les messages loués seront repris à l'expiration du bail
+                    print("❌ File d'emails :", e)
+                    batch = []
+                if batch:
+                    continue
+                with self._wakeup:
+                    if self._signal == seen and not self._stopping:
+                        self._wakeup.wait(self.poll_interval)
+        finally:
+            sender.close()
+
+    def _deliver(self, sender, row):
+        try:
+            sender.send(build_message(row, self.default_sender))
+        except Exception as e:
+            if not isinstance(e, (smtplib.SMTPRecipientsRefused, ValueError)):
+                sender.close()  # État de la connexion inconnu : nouvelle connexion au prochain message
+            attempts = row["attempts"] + 1
+            retry_at = None
+            if not is_permanent(e) and attempts < self.max_attempts:
+                retry_at = time.time() + retry_delay(attempts, self.backoff_base)
+            print(f"❌ Email {row['id']} non envoyé (essai {attempts}) :", e)
+            self.writer.execute(mark_failed, row["id"], f"{type(e).__name__}: {e}", retry_at)
+        else:
+            self.writer.execute(mark_sent, row["id"])
+
+
+# =========================================
+# 5. 🌐 File partagée de l'application
+# =========================================
+outbox = EmailOutbox()
+
+
+def init_outbox(app, email_outbox=None):
+    """Connexion SMTP construite depuis la configuration Flask (MAIL_SERVER, MAIL_PORT, MAIL_USE_TLS…)."""
+    email_outbox = email_outbox or outbox
+    config = app.config
+    email_outbox.default_sender = config.get("MAIL_DEFAULT_SENDER") or config.get("MAIL_USERNAME")
+    email_outbox.sender_factory = lambda: SmtpSender(
+        config.get("MAIL_SERVER", "localhost"),
+        config.get("MAIL_PORT", 25),
+        use_tls=config.get("MAIL_USE_TLS", False),
+        use_ssl=config.get("MAIL_USE_SSL", False),
+        username=config.get("MAIL_USERNAME"),
+        password=config.get("MAIL_PASSWORD")
+    )
+    atexit.register(email_outbox.close)  # Avant writer.close (ordre inverse d'enregistrement)
+    return email_outbox
+
+
+def queue_email(subject, recipients, body=None, html=None, reply_to=None, sender=None):
+    """Met un email en file d'envoi (réponse immédiate de la route) ; renvoie son id dans email_outbox."""
+    return outbox.enqueue(subject, recipients, body=body, html=html, reply_to=reply_to, sender=sender)
@@ -0,0 +1,235 @@
+"""
+===============================================================
+🗺️ FICHIER appGeo.py – Index spatial des hôtels (SQLite R*Tree)
+===============================================================
+
+La carte de reservations.html chargeait /hotels en entier (avec les avis)
+pour placer tous les marqueurs, quelle que soit la zone affichée.
+
+La table virtuelle R*Tree `hotels_rtree(id, min_lat, max_lat, min_lng, max_lng)`
+indexe la position de chaque hôtel (un point : min = max). Elle est créée et
+remplie une fois par la migration 9 (appMigrations.py) ; des triggers la
+tiennent à jour à chaque INSERT, UPDATE de latitude / longitude (ex.
+appBDD.update_hotel_coordinates) et DELETE sur `hotels`. Une requête
+« hôtels visibles dans cette zone » ne lit alors que les nœuds de l'arbre
+qui recoupent le rectangle demandé.
+
+Regroupement (clusters) : à faible zoom, des milliers de marqueurs se
+superposent. Chaque hôtel est rangé, pour chaque niveau de zoom, dans une case
+d'une grille de CLUSTER_CELL_PX pixels (projection Web Mercator, celle des
+tuiles Leaflet). Les cases (nombre d'hôtels, centre de gravité) sont
+précalculées pour tous les zooms et recalculées quand la version du catalogue
+change, c'est-à-dire après toute modification des coordonnées.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appGeo.py
+# =========================================
+
+# 1. 🧱 Table R*Tree & triggers de synchronisation
+# 2. 📐 Validation de la zone (bornes, antiméridien)
+# 3. 📍 Hôtels dans une zone
+# 4. 🔵 Regroupement par zoom (grille Web Mercator)
+
+import math
+import threading
+from bisect import bisect_left, bisect_right
+
+# =========================================
+# 1. 🧱 Table R*Tree & triggers de synchronisation
+# =========================================
+def ensure_geo_index(conn):
+    """
+    Crée l'index R*Tree et ses triggers si besoin, puis y insère les hôtels déjà géolocalisés.
+    Pas de commit : exécutée dans la transaction de la migration 9.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hotels_rtree'"
+    ).fetchone()
+
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS hotels_rtree USING rtree(
+            id, min_lat, max_lat, min_lng, max_lng
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_hotels_rtree_insert AFTER INSERT ON hotels
+        WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+        BEGIN
+            INSERT OR REPLACE INTO hotels_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_hotels_rtree_update AFTER UPDATE OF latitude, longitude ON hotels
+        BEGIN
+            DELETE FROM hotels_rtree WHERE id = old.id;
+            INSERT INTO hotels_rtree
+                SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+                WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_hotels_rtree_delete AFTER DELETE ON hotels
+        BEGIN
+            DELETE FROM hotels_rtree WHERE id = old.id;
+        END
+    """)
+    if exists is None:
+        conn.execute("""
+            INSERT INTO hotels_rtree (id, min_lat, max_lat, min_lng, max_lng)
+            SELECT id, latitude, latitude, longitude, longitude
+            FROM hotels
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        """)
+    return exists is None
+
+
+# =========================================
+# 2. 📐 Validation de la zone (bornes, antiméridien)
+# =========================================
+class InvalidBounds(ValueError):
+    pass
+
+
+def parse_bounds(south, west, north, east):
+    """
+    Convertit les paramètres south/west/north/east en nombres.
+    Lève InvalidBounds si une valeur manque, n'est pas un nombre ou sort des limites.
+    """
+    try:
+        south, west, north, east = (float(value) for value in (south, west, north, east))
+    except (TypeError, ValueError):
+        raise InvalidBounds("Paramètres south, west, north, east requis (nombres)")
+
+    if not (-90 <= south <= north <= 90):
+        raise InvalidBounds("Latitudes invalides (attendu -90 <= south <= north <= 90)")
+    if not (-180 <= west <= 180 and -180 <= east <= 180):
+        raise InvalidBounds("Longitudes invalides (attendu entre -180 et 180)")
+    return south, west, north, east
+
+
+def longitude_ranges(west, east):
+    """Une zone qui traverse l'antiméridien (west > east) est découpée en deux bandes."""
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+# =========================================
+# 3. 📍 Hôtels dans une zone
+# =========================================
+def hotel_ids_in_bounds(conn, south, west, north, east, limit=None):
+    """Identifiants (triés) des hôtels dont la position tombe dans la zone demandée ; au plus `limit` s'il est donné."""
+    ids = set()
+    for min_lng, max_lng in longitude_ranges(west, east):
+        # R*Tree stocke des flottants 32 bits arrondis vers l'extérieur :
+        # les candidats en bordure sont revérifiés sur les coordonnées exactes.
+        rows = conn.execute("""
+            SELECT h.id
+            FROM hotels_rtree r
+            JOIN hotels h ON h.id = r.id
+            WHERE r.max_lat >= ? AND r.min_lat <= ?
+              AND r.max_lng >= ? AND r.min_lng <= ?
+              AND h.latitude BETWEEN ? AND ?
+              AND h.longitude BETWEEN ? AND ?
+            ORDER BY h.id
+            LIMIT ?
+        """, (south, north, min_lng, max_lng, south, north, min_lng, max_lng,
+              -1 if limit is None else limit)).fetchall()
+        ids.update(row[0] for row in rows)
+    return sorted(ids)[:limit]
+
+
+# =========================================
+# 4. 🔵 Regroupement par zoom (grille Web Mercator)
+# =========================================
+
+# Taille d'une case de regroupement à l'écran, zoom maximal pris en charge
+CLUSTER_CELL_PX = 64
+TILE_SIZE_PX = 256
+MAX_CLUSTER_ZOOM = 18
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def mercator_cell(latitude, longitude, zoom):
+    """Case (x, y) de la grille contenant le point au zoom donné (y croît vers le sud)."""
+    cells = (TILE_SIZE_PX // CLUSTER_CELL_PX) << zoom
+    latitude = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, latitude))
+    x = (longitude + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(latitude))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(int(x * cells), cells - 1), min(int(y * cells), cells - 1)
+
+
+class ClusterGrid:
+    def __init__(self, hotels):
+        """`hotels` : itérable d'enregistrements ayant id, latitude et longitude."""
+        # Case au zoom maximal ; au zoom z, la case est obtenue par décalage de bits
+        located = [(mercator_cell(h.latitude, h.longitude, MAX_CLUSTER_ZOOM), h)
+                   for h in hotels if h.latitude is not None and h.longitude is not None]
+
+        self._keys = []   # zoom -> liste triée des cases (x, y)
+        self._cells = []  # zoom -> liste parallèle de (nombre, somme lat, somme lng, id du 1er hôtel)
+        for zoom in range(MAX_CLUSTER_ZOOM + 1):
+            shift = MAX_CLUSTER_ZOOM - zoom
+            buckets = {}
+            for (x, y), hotel in located:
+                bucket = buckets.get((x >> shift, y >> shift))
+                if bucket is None:
+                    buckets[(x >> shift, y >> shift)] = [1, hotel.latitude, hotel.longitude, hotel.id]
+                else:
+                    bucket[0] += 1
+                    bucket[1] += hotel.latitude
+                    bucket[2] += hotel.longitude
+            keys = sorted(buckets)
+            self._keys.append(keys)
+            self._cells.append([tuple(buckets[key]) for key in keys])
+
+    def clusters(self, zoom, south, west, north, east):
+        """
+        Renvoie les cases non vides de la zone au zoom demandé :
+        liste de dictionnaires {latitude, longitude, count, hotel_id}
+        (`hotel_id` n'est renseigné que pour une case contenant un seul hôtel).
+        """
+        zoom = max(0, min(int(zoom), MAX_CLUSTER_ZOOM))
+        keys, cells = self._keys[zoom], self._cells[zoom]
+        _, y_min = mercator_cell(north, 0.0, zoom)
+        _, y_max = mercator_cell(south, 0.0, zoom)
+
+        result = []
+        for min_lng, max_lng in longitude_ranges(west, east):
+            x_min, _ = mercator_cell(0.0, min_lng, zoom)
+            x_max, _ = mercator_cell(0.0, max_lng, zoom)
+            start = bisect_left(keys, (x_min, y_min))
+            stop = bisect_right(keys, (x_max, y_max))
+            for position in range(start, stop):
+                x, y = keys[position]
+                if not y_min <= y <= y_max:
+                    continue
+                count, sum_lat, sum_lng, hotel_id = cells[position]
+                result.append({
+                    "latitude": sum_lat / count,
+                    "longitude": sum_lng / count,
+                    "count": count,
+                    "hotel_id": hotel_id if count == 1 else None
+                })
+        return result
+
+
+class CatalogClusters:
+    """Grille de regroupement liée à une version du catalogue, recalculée quand elle change."""
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self._lock = threading.Lock()
+        self._version = None
+        self._grid = None
+
+    def get(self, conn):
+        snapshot = self._catalog.get(conn)
+        if self._grid is None or self._version != snapshot.version:
+            with self._lock:
+                if self._grid is None or self._version != snapshot.version:
+                    self._grid = ClusterGrid(snapshot.hotels)
+                    self._version = snapshot.version
+        return self._grid
@@ -0,0 +1,193 @@
+"""
+===============================================================
+🖼️ FICHIER appImages.py – Variantes responsive des photos (WebP / JPEG)
+===============================================================
+
+Les photos des hôtels (hotel1.jpg … hotel10.jpg, jusqu'à 5760 px de large et
+plusieurs Mo) étaient envoyées en pleine résolution, y compris pour les
+vignettes de la grille des hôtels (200 px de haut).
+
+Étape hors ligne (à relancer après l'ajout ou le remplacement d'une image) :
+    python appImages.py
+
+- Images traitées : toutes celles référencées par hotels.image_url, l'image
+  par défaut et le dossier avatars/.
+- Pour chaque image, une variante par largeur de VARIANT_WIDTHS (jamais
+  d'agrandissement) en WebP et en JPEG, dans static/Image/variants/
+  (hotel1-640.webp, hotel1-640.jpg…). Les variantes déjà à jour sont
+  conservées (construction incrémentale).
+- variants/manifest.json liste, pour chaque image source, ses dimensions et
+  les largeurs générées.
+
+Côté API, `variants.srcset(image_url, image_base)` renvoie les attributs srcset prêts à
+l'emploi ({"webp": "... 320w, ... 640w", "jpeg": ..., "width", "height"}),
+exposés par les listings sous la clé `image_srcset` (None tant que la
+construction n'a pas été lancée : le navigateur garde alors `image`).
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appImages.py
+# =========================================
+
+# 1. 🔧 Chemins & réglages
+# 2. 🏗️ Génération des variantes (Pillow)
+# 3. 🔎 Variantes disponibles (srcset des listings)
+
+import json
+import os
+import sys
+import threading
+
+try:
+    from PIL import Image
+except ImportError:  # Nécessaire uniquement pour la génération : pip install pillow
+    Image = None
+
+# =========================================
+# 1. 🔧 Chemins & réglages
+# =========================================
+IMAGE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "static", "Image"))
+VARIANTS_FOLDER = "variants"
+MANIFEST_NAME = "manifest.json"
+
+# Largeurs générées (px) : vignettes de la grille → grande image de la page de réservation
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+
+# Qualité d'encodage (0-100)
+WEBP_QUALITY = 78
+JPEG_QUALITY = 80
+
+# Dossiers dont toutes les images sont traitées, en plus de hotels.image_url
+EXTRA_FOLDERS = ("avatars",)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+# =========================================
+# 2. 🏗️ Génération des variantes (Pillow)
+# =========================================
+def referenced_images(conn, image_dir=IMAGE_DIR, extra_images=()):
+    """Chemins (relatifs à static/Image) des images à décliner : hotels.image_url, `extra_images`, avatars/."""
+    names = {row[0] for row in conn.execute("SELECT DISTINCT image_url FROM hotels WHERE image_url IS NOT NULL AND image_url != ''")}
+    names.update(extra_images)
+    for folder in EXTRA_FOLDERS:
+        folder_path = os.path.join(image_dir, folder)
+        if os.path.isdir(folder_path):
+            names.update(f"{folder}/{name}" for name in os.listdir(folder_path) if name.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(names)
+
+
+def target_widths(width, widths=VARIANT_WIDTHS):
+    """Largeurs à générer pour une image de `width` px (jamais plus large que l'original)."""
+    smaller = [w for w in widths if w < width]
+    return smaller if len(smaller) == len(widths) else smaller + [width]
+
+
+def variant_name(source, width, extension):
+    stem = os.path.splitext(source)[0]
+    return f"{VARIANTS_FOLDER}/{stem}-{width}.{extension}"
+
+
+def _is_fresh(output, source_mtime):
+    return os.path.exists(output) and os.path.getmtime(output) >= source_mtime
+
+
+def build_variants(sources, image_dir=IMAGE_DIR, widths=VARIANT_WIDTHS):
+    """Génère les variantes manquantes ou périmées et écrit le manifest ; renvoie le manifest."""
+    if Image is None:
+        raise RuntimeError("Pillow est nécessaire pour générer les variantes : pip install pillow")
+
+    manifest = {}
+    for source in sources:
+        path = os.path.join(image_dir, *source.split("/"))
+        if not os.path.isfile(path):
+            print(f"⚠️ Image introuvable, ignorée : {source}")
+            continue
+        source_mtime = os.path.getmtime(path)
+        with Image.open(path) as original:
+            width, height = original.size  # Lu dans l'en-tête, sans décoder l'image
+            generated = target_widths(width, widths)
+            outputs = [(variant_width, extension, os.path.join(image_dir, *variant_name(source, variant_width, extension).split("/")))
+                       for variant_width in generated for extension in ("webp", "jpg")]
+            missing = [output for output in outputs if not _is_fresh(output[2], source_mtime)]
+            if missing:
+                rgb = original.convert("RGB")  # JPEG n'accepte ni transparence ni palette
+                resized = {}
+                for variant_width, extension, output in missing:
+                    if variant_width not in resized:
+                        variant_height = max(1, round(height * variant_width / width))
+                        resized[variant_width] = (rgb if variant_width == width
+                                                  else rgb.resize((variant_width, variant_height), Image.LANCZOS))
+                    os.makedirs(os.path.dirname(output), exist_ok=True)
+                    if extension == "webp":
+                        resized[variant_width].save(output, "WEBP", quality=WEBP_QUALITY, method=6)
+                    else:
+                        resized[variant_width].save(output, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        manifest[source] = {"width": width, "height": height, "widths": generated}
+
+    os.makedirs(os.path.join(image_dir, VARIANTS_FOLDER), exist_ok=True)
+    with open(os.path.join(image_dir, VARIANTS_FOLDER, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# =========================================
+# 3. 🔎 Variantes disponibles (srcset des listings)
+# =========================================
+class ImageVariants:
+    """Lecture paresseuse du manifest ; attributs srcset calculés une fois par (image, base d'URL)."""
+
+    def __init__(self, image_dir=IMAGE_DIR):
+        self.image_dir = image_dir
+        self._manifest = None
+        self._srcsets = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._manifest is None:
+                try:
+                    with open(os.path.join(self.image_dir, VARIANTS_FOLDER, MANIFEST_NAME), encoding="utf-8") as f:
+                        self._manifest = json.load(f)
+                except FileNotFoundError:
+                    self._manifest = {}
+        return self._manifest
+
+    def reload(self):
+        """Relit le manifest au prochain appel (après une nouvelle génération)."""
+        with self._lock:
+            self._manifest = None
+            self._srcsets = {}
+
+    def srcset(self, image_url, image_base):
+        """{"webp", "jpeg", "width", "height"} pour `image_url`, ou None si aucune variante n'existe."""
+        key = (image_url, image_base)
+        if key in self._srcsets:
+            return self._srcsets[key]
+        entry = self._load().get(image_url)
+        result = None
+        if entry is not None:
+            result = {
+                "webp": ", ".join(f"{image_base}{variant_name(image_url, w, 'webp')} {w}w" for w in entry["widths"]),
+                "jpeg": ", ".join(f"{image_base}{variant_name(image_url, w, 'jpg')} {w}w" for w in entry["widths"]),
+                "width": entry["width"],
+                "height": entry["height"]
+            }
+        self._srcsets[key] = result  # Dictionnaire partagé par tous les hôtels de cette image (à ne pas modifier)
+        return result
+
+
+# Instance partagée (appSerialisation)
+variants = ImageVariants()
+
+
+if __name__ == "__main__":
+    from appConnexion import open_connection
+    from appSerialisation import DEFAULT_IMAGE
+
+    conn = open_connection(sys.argv[1] if len(sys.argv) > 1 else None)
+    try:
+        images = referenced_images(conn, extra_images=(DEFAULT_IMAGE,))
+    finally:
+        conn.close()
+    built = build_variants(images)
+    print(f"✅ Variantes générées pour {len(built)} image(s) dans {os.path.join(IMAGE_DIR, VARIANTS_FOLDER)}")
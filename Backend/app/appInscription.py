@@ -11,10 +11,13 @@ Blueprint (`inscription_bp`) pour modulariser l'application.
 Il couvre les fonctionnalités suivantes :
 - Initialisation des extensions liées à l'authentification et aux emails
 - Connexion et inscription des utilisateurs avec hachage de mot de passe
+  (bcrypt calculé hors du thread de la requête, voir appMotDePasse)
 - Validation du numéro de téléphone
-- Envoi d'emails (bienvenue, test, réinitialisation)
+- Envoi d'emails (bienvenue, test, réinitialisation), mis en file via appEmails
 - Suppression de compte utilisateur
 - Réinitialisation sécurisée du mot de passe avec tokens signés
+- Jeton de session signé (id utilisateur + rôle + expiration) délivré par
+  /login et /register, vérifié avant chaque requête sans accès à la base
 
 Ce fichier joue un rôle fondamental dans l’authentification et 
 la gestion des comptes utilisateurs, assurant à la fois sécurité, 
@@ -34,6 +37,7 @@ NB : Ce fichier est prévu pour une version utilisant SQLite uniquement.
 # 5. ✉️ Envoi de mail de test
 # 6. 🗑️ Suppression utilisateur
 # 7. ♻️ Réinitialisation mot de passe
+# 8. 🎫 Jeton de session
 
 # =========================================
 # 1. 🔧 Initialisation
@@ -43,24 +47,30 @@ import os
 import re
 import logging
 import sqlite3
-from flask import Blueprint, request, jsonify, current_app, render_template
-from flask_bcrypt import Bcrypt
-from flask_mail import Message
-from itsdangerous import URLSafeTimedSerializer
+from functools import wraps
+from flask import Blueprint, request, jsonify, current_app, render_template, g
+from itsdangerous import URLSafeTimedSerializer, BadSignature
 from dotenv import load_dotenv
+from appConnexion import get_db_connection
+from appEcriture import run_write
+from appEmails import queue_email
+from appPasserelleStripe import stripe_gateway
+from appMotDePasse import password_hasher, PasswordHasherBusy
 
-bcrypt = Bcrypt()
 inscription_bp = Blueprint('inscription', __name__)
 load_dotenv("securite_mdp.env")
 
 serializer = URLSafeTimedSerializer(os.getenv("SECRET_KEY"))
-mail = None  # sera injecté par appRoute
 
 
 def init_inscription_extensions(app):
-    bcrypt.init_app(app)
-    global mail
-    mail = app.extensions['mail']
+    password_hasher.init_app(app)
+
+
+@inscription_bp.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(error):
+    # Rafale de connexions : refus immédiat plutôt qu'une file d'attente sans fin
+    return jsonify({'error': 'Serveur occupé, réessayez dans quelques secondes'}), 503, {'Retry-After': '1'}
 
 
 # =========================================
@@ -82,17 +92,26 @@ def login():
     email = data.get('email', '').strip().lower()
     password = data.get('password', '').strip()
 
-    conn = sqlite3.connect('hotels.db')
-    conn.row_factory = sqlite3.Row
+    conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM user WHERE email = ?", (email,))
     user = cursor.fetchone()
 
-    if not user or not bcrypt.check_password_hash(user['password'], password):
+    if not user:
+        return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
+    valid, new_hash = password_hasher.verify(password, user['password'])
+    if not valid:
         return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
+    if new_hash:
+        # Hash enregistré avec un ancien coût : remplacé par un hash au coût actuel
+        run_write(lambda write_conn: write_conn.execute(
+            "UPDATE user SET password = ? WHERE id_user = ? AND password = ?",
+            (new_hash, user['id_user'], user['password'])
+        ))
 
     return jsonify({
         'message': 'Connexion réussie !',
+        'token': issue_session_token(user['id_user'], user['role']),
         'id': user['id_user'],
         'name': user['name'],
         'first_name': user['first_name'],
@@ -121,32 +140,34 @@ def register():
     if phone and not is_valid_phone(phone):
         return jsonify({'error': 'Téléphone invalide'}), 400
 
-    conn = sqlite3.connect('hotels.db')
+    conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT id_user FROM user WHERE email = ?", (email,))
     if cursor.fetchone():
         return jsonify({'error': "L'email existe déjà"}), 400
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-    cursor.execute("""
-        INSERT INTO user (name, first_name, email, password, phone)
-        VALUES (?, ?, ?, ?, ?)
-    """, (name, first_name, email, hashed_password, phone))
-    conn.commit()
-    user_id = cursor.lastrowid
+    hashed_password = password_hasher.hash(password)
+    try:
+        user_id = run_write(lambda write_conn: write_conn.execute("""
+            INSERT INTO user (name, first_name, email, password, phone)
+            VALUES (?, ?, ?, ?, ?)
+        """, (name, first_name, email, hashed_password, phone)).lastrowid)
+    except sqlite3.IntegrityError:
+        # Même email inscrit entre la vérification et l'écriture
+        return jsonify({'error': "L'email existe déjà"}), 400
 
     try:
-        msg = Message(
+        queue_email(
             subject="Bienvenue sur notre plateforme !",
             recipients=[email],
             body=f"Bonjour {first_name} {name},\nVotre compte a été créé avec succès."
         )
-        mail.send(msg)
     except Exception as e:
-        logging.warning(f"Email non envoyé : {e}")
+        logging.warning(f"Email non mis en file : {e}")
 
     return jsonify({
         'success': True,
+        'token': issue_session_token(user_id, 'user'),
         'id': user_id,
         'name': name,
         'first_name': first_name,
@@ -161,13 +182,12 @@ def register():
 @inscription_bp.route('/send_email')
 def send_test_email():
     try:
-        msg = Message(
+        queue_email(
             subject="Test",
             recipients=["justdreams06@gmail.com"],
             body="Test email depuis Flask."
         )
-        mail.send(msg)
-        return 'Email envoyé !', 200
+        return 'Email mis en file d\'envoi !', 200
     except Exception as e:
         return f"Erreur : {e}", 500
 
@@ -177,11 +197,11 @@ def send_test_email():
 # =========================================
 @inscription_bp.route('/delete_user/<int:id_user>', methods=['DELETE'])
 def delete_user(id_user):
-    conn = sqlite3.connect('hotels.db')
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM user WHERE id_user = ?", (id_user,))
-    conn.commit()
-    if cursor.rowcount:
+    deleted = run_write(lambda write_conn: write_conn.execute(
+        "DELETE FROM user WHERE id_user = ?", (id_user,)
+    ).rowcount)
+    if deleted:
+        stripe_gateway.forget_customer(id_user)
         return jsonify({'message': f'Utilisateur {id_user} supprimé.'}), 200
     return jsonify({'error': 'Utilisateur non trouvé'}), 404
 
@@ -203,8 +223,7 @@ def request_password_reset():
     data = request.get_json()
     email = data.get('email', '').strip().lower()
 
-    conn = sqlite3.connect('hotels.db')
-    conn.row_factory = sqlite3.Row
+    conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM user WHERE email = ?", (email,))
     user = cursor.fetchone()
@@ -216,12 +235,11 @@ def request_password_reset():
     link = f"http://127.0.0.1:5003/resetPassword?token={token}"
 
     try:
-        msg = Message(
+        queue_email(
             subject="Réinitialisation de votre mot de passe",
             recipients=[email],
             body=f"Bonjour {user['first_name']},\nVoici le lien : {link}"
         )
-        mail.send(msg)
         return jsonify({'message': 'Email envoyé'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -236,11 +254,50 @@ def submit_new_password():
     if not email:
         return jsonify({'error': 'Lien expiré ou invalide.'}), 400
 
-    hashed = bcrypt.generate_password_hash(new_password).decode('utf-8')
+    if not new_password:
+        return jsonify({'error': 'Mot de passe manquant.'}), 400
+    hashed = password_hasher.hash(new_password)
 
-    conn = sqlite3.connect('hotels.db')
-    cursor = conn.cursor()
-    cursor.execute("UPDATE user SET password = ? WHERE email = ?", (hashed, email))
-    conn.commit()
+    run_write(lambda write_conn: write_conn.execute(
+        "UPDATE user SET password = ? WHERE email = ?", (hashed, email)
+    ))
     return jsonify({'message': 'Mot de passe mis à jour.'}), 200
 
+
+# =========================================
+# 8. 🎫 Jeton de session
+# =========================================
+# Jeton signé par `serializer` (salt propre aux sessions) : {"u": id_user, "r": rôle}
+# + date de création. Vérifié par HMAC avant chaque requête : l'identité et le rôle
+# ne sont plus relus dans la table user. Un changement de rôle s'applique à la
+# connexion suivante (au plus SESSION_TOKEN_MAX_AGE plus tard).
+SESSION_TOKEN_SALT = 'session'
+SESSION_TOKEN_MAX_AGE = 24 * 3600  # secondes
+
+def issue_session_token(user_id, role):
+    return serializer.dumps({'u': user_id, 'r': role or 'user'}, salt=SESSION_TOKEN_SALT)
+
+def read_session_token(token):
+    """{'id', 'role'} du jeton, ou None s'il est absent, modifié ou expiré."""
+    if not token:
+        return None
+    try:
+        claims = serializer.loads(token, salt=SESSION_TOKEN_SALT, max_age=SESSION_TOKEN_MAX_AGE)
+    except BadSignature:  # Inclut SignatureExpired
+        return None
+    return {'id': claims['u'], 'role': claims['r']}
+
+@inscription_bp.before_app_request
+def load_session_user():
+    # En-tête « Authorization: Bearer <jeton> » envoyé par le front (localStorage)
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    g.session_user = read_session_token(token.strip()) if scheme.lower() == 'bearer' else None
+
+def session_required(view):
+    """Route réservée aux utilisateurs connectés (jeton valide) : 401 sinon."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if g.get('session_user') is None:
+            return jsonify({'error': 'Session expirée ou absente, veuillez vous reconnecter'}), 401
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,190 @@
+"""
+===============================================================
+🧬 FICHIER appMigrations.py – Migrations versionnées du schéma SQLite
+===============================================================
+
+appBDD.create_tables ne fait que des `CREATE TABLE IF NOT EXISTS` : une base
+hotels.db déjà en service ne reçoit jamais les nouveaux index ou colonnes.
+
+Chaque migration porte un numéro croissant et une description. Les numéros
+appliqués sont enregistrés dans la table `schema_version` ; migrate() exécute,
+dans l'ordre, celles qui manquent, chacune dans sa propre transaction (en cas
+d'erreur, la migration est annulée et son numéro n'est pas enregistré).
+
+Pour modifier le schéma : ajouter une fonction décorée par
+`@migration(<numéro suivant>, "<description>")` en fin de fichier, sans jamais
+modifier une migration déjà publiée.
+
+Utilisation sur une base existante :
+    python appMigrations.py [chemin/vers/hotels.db]
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appMigrations.py
+# =========================================
+
+# 1. 🗂️ Registre des migrations
+# 2. 🔢 Table schema_version
+# 3. 🚀 Exécution des migrations
+# 4. 📜 Migrations
+
+import sqlite3
+import sys
+from collections import namedtuple
+from appAvis import REVIEW_SORTS, ensure_review_stats
+from appCatalogue import ensure_catalog_version
+from appConnexion import DB_PATH, open_connection
+from appDisponibilite import ensure_occupancy_table, rebuild_occupancy
+from appEmails import ensure_outbox_table
+from appGeo import ensure_geo_index
+from appRechercheTexte import ensure_text_search
+from appWebhookStripe import ensure_events_table
+
+# =========================================
+# 1. 🗂️ Registre des migrations
+# =========================================
+Migration = namedtuple("Migration", ["version", "name", "apply"])
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    """Enregistre la fonction décorée comme migration numéro `version`."""
+    def register(apply):
+        if any(existing.version == version for existing in MIGRATIONS):
+            raise ValueError(f"Migration {version} déjà définie")
+        MIGRATIONS.append(Migration(version, name, apply))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return apply
+    return register
+
+
+# =========================================
+# 2. 🔢 Table schema_version
+# =========================================
+def ensure_schema_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def applied_versions(conn):
+    ensure_schema_version(conn)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+
+
+def get_schema_version(conn):
+    """Numéro de la dernière migration appliquée (0 pour une base jamais migrée)."""
+    versions = applied_versions(conn)
+    return max(versions) if versions else 0
+
+
+# =========================================
+# 3. 🚀 Exécution des migrations
+# =========================================
+def migrate(conn, target=None, migrations=None):
+    """
+    Applique les migrations manquantes jusqu'à `target` (toutes par défaut).
+    Renvoie la liste des numéros appliqués lors de cet appel.
+    """
+    migrations = MIGRATIONS if migrations is None else sorted(migrations, key=lambda m: m.version)
+    done = applied_versions(conn)
+    applied = []
+
+    for pending in migrations:
+        if pending.version in done or (target is not None and pending.version > target):
+            continue
+        try:
+            conn.execute("BEGIN")
+            pending.apply(conn)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (pending.version, pending.name))
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(pending.version)
+        print(f"🧬 Migration {pending.version} appliquée : {pending.name}")
+
+    return applied
+
+
+# =========================================
+# 4. 📜 Migrations
+# =========================================
+@migration(1, "Index des réservations par hôtel et dates de séjour")
+def _index_reservations_hotel_dates(conn):
+    # Chevauchement d'un séjour : hotel_id = ? AND checkin < ? AND checkout > ?
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reservations_hotel_dates ON reservations(hotel_id, checkin, checkout)")
+
+
+@migration(2, "Index des réservations par utilisateur et date d'arrivée")
+def _index_reservations_user_checkin(conn):
+    # /api/mes-reservations/<user_id> : WHERE user_id = ? ORDER BY checkin DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reservations_user_checkin ON reservations(user_id, checkin DESC)")
+
+
+@migration(3, "Index des réservations par statut et date de création")
+def _index_reservations_status_created(conn):
+    # Nettoyage des 'pending' > 24h et recalcul de l'occupation (statuts confirmés)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reservations_status_created ON reservations(status, created_at)")
+
+
+@migration(4, "Index des avis par hôtel (tri par date et par note)")
+def _index_reviews_by_hotel(conn):
+    # /get_reviews, listings et page de réservation : WHERE hotel_id = ? ORDER BY <date|note> DESC, id
+    for index_name, column in REVIEW_SORTS.values():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON reviews(hotel_id, {column} DESC, id)")
+
+
+@migration(5, "File d'envoi des emails (email_outbox)")
+def _create_email_outbox(conn):
+    ensure_outbox_table(conn)
+
+
+@migration(6, "Événements Stripe reçus (stripe_events)")
+def _create_stripe_events(conn):
+    ensure_events_table(conn)
+
+
+@migration(7, "Statistiques d'avis par hôtel (hotel_review_stats + triggers)")
+def _create_review_stats(conn):
+    # Table remplie à partir des avis existants, puis tenue à jour par les triggers sur reviews
+    ensure_review_stats(conn)
+
+
+@migration(8, "Recherche plein texte (hotels_fts, reviews_fts + triggers)")
+def _create_text_search(conn):
+    # Index FTS5 construits à partir des hôtels et avis existants, puis tenus à jour par les triggers
+    ensure_text_search(conn)
+
+
+@migration(9, "Index spatial des hôtels (hotels_rtree + triggers)")
+def _create_geo_index(conn):
+    # Hôtels déjà géolocalisés indexés, puis positions tenues à jour par les triggers sur hotels
+    ensure_geo_index(conn)
+
+
+@migration(10, "Occupation des hôtels par nuit (hotel_occupancy)")
+def _create_hotel_occupancy(conn):
+    # Table remplie à partir des réservations payées / confirmées existantes, même si elle existait déjà (vide)
+    ensure_occupancy_table(conn)
+    rebuild_occupancy(conn)
+
+
+@migration(11, "Version du catalogue (catalog_version + triggers)")
+def _create_catalog_version(conn):
+    # Compteur lu par le catalogue, la disponibilité et les ETag ; incrémenté par triggers à chaque écriture
+    ensure_catalog_version(conn)
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    connection = open_connection(db_path)
+    versions = migrate(connection)
+    print(f"✅ Schéma à la version {get_schema_version(connection)} ({len(versions)} migration(s) appliquée(s))")
+    connection.close()
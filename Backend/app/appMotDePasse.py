@@ -0,0 +1,182 @@
+"""
+===============================================================
+🔑 FICHIER appMotDePasse.py – Hachage des mots de passe (processus dédiés)
+===============================================================
+
+/login, /register et /submit-new-password appelaient Flask-Bcrypt dans le
+thread de la requête : 100 à 300 ms de calcul par appel. Une rafale de
+connexions occupait tout le processeur du serveur et ralentissait toutes
+les autres routes.
+
+- Le calcul bcrypt est fait dans un pool de processus borné
+  (PASSWORD_HASH_WORKERS processus, démarrés par warm_up()). Le serveur
+  garde au moins un cœur pour les autres routes.
+- File d'attente bornée (MAX_PENDING_PER_WORKER calculs par processus) : au-delà,
+  PasswordHasherBusy est levée après QUEUE_TIMEOUT secondes (→ 503) au lieu
+  d'accumuler les connexions en attente.
+- Coût configurable : BCRYPT_LOG_ROUNDS (même clé que Flask-Bcrypt, 12 par
+  défaut). verify() vérifie le mot de passe et, si le hash enregistré a un
+  autre coût, renvoie dans le même calcul un nouveau hash au coût actuel, que
+  /login enregistre.
+- PASSWORD_HASH_WORKERS = 0 : calcul dans le thread de la requête (tests,
+  développement).
+- Processus « spawn » : chacun réimporte le module principal (appRoute quand
+  le serveur est lancé par `python appRoute.py`). Les calculs ne dépendent que
+  de ce module, et un pool n'est jamais créé dans un processus enfant : s'il
+  réimporte du code qui demande un hachage, le calcul est fait sur place.
+
+Les hashes existants (Flask-Bcrypt) restent valides : même format, mot de
+passe encodé en UTF-8 et limité aux 72 octets lus par bcrypt.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appMotDePasse.py
+# =========================================
+
+# 1. 🔧 Réglages
+# 2. 🧮 Calculs bcrypt (exécutés dans les processus du pool)
+# 3. 🔑 PasswordHasher (pool borné, coût, re-hachage)
+# 4. 🌐 Instance partagée de l'application
+
+# Ce module est importé par les processus du pool : uniquement des dépendances légères
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+
+# =========================================
+# 1. 🔧 Réglages
+# =========================================
+DEFAULT_ROUNDS = 12
+
+# Processus de calcul : tous les cœurs sauf un (gardé pour les autres routes)
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Calculs en cours ou en attente par processus, puis délai d'attente d'une place
+MAX_PENDING_PER_WORKER = 8
+QUEUE_TIMEOUT = 5.0
+
+# bcrypt ne lit que les 72 premiers octets du mot de passe
+BCRYPT_MAX_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    """Trop de calculs en attente : la requête doit être refusée (503)."""
+
+
+# =========================================
+# 2. 🧮 Calculs bcrypt
+# =========================================
+def _encode(password):
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def hash_password(password, rounds):
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def hash_rounds(hashed):
+    """Coût d'un hash bcrypt ('$2b$12$...' → 12) ; None si le hash est illisible."""
+    parts = hashed.split("$")
+    return int(parts[2]) if len(parts) > 3 and parts[2].isdigit() else None
+
+
+def check_password(password, hashed, rounds):
+    """(mot de passe correct, nouveau hash au coût `rounds` si le hash enregistré a un autre coût)."""
+    try:
+        valid = bcrypt.checkpw(_encode(password), hashed.encode("utf-8"))
+    except ValueError:
+        return False, None  # Hash enregistré invalide
+    if valid and hash_rounds(hashed) != rounds:
+        return True, hash_password(password, rounds)
+    return valid, None
+
+
+def _ready():
+    return True
+
+
+# =========================================
+# 3. 🔑 PasswordHasher
+# =========================================
+class PasswordHasher:
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, queue_timeout=QUEUE_TIMEOUT):
+        self.rounds = rounds
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._pool = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.rounds = int(app.config.get("BCRYPT_LOG_ROUNDS", os.getenv("BCRYPT_LOG_ROUNDS", self.rounds)))
+        self.workers = int(app.config.get("PASSWORD_HASH_WORKERS", os.getenv("PASSWORD_HASH_WORKERS", self.workers)))
+
+    # ---------- Pool de processus ----------
+    def _executor(self):
+        # Dans un processus du pool (ou tout autre enfant), jamais de pool imbriqué : calcul sur place
+        if multiprocessing.parent_process() is not None:
+            return None
+        with self._lock:
+            if self._pool is None and self.workers > 0:
+                # spawn : processus neufs, sans les threads (écrivain, emails…) du serveur
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                if self._slots is None:
+                    self._slots = threading.BoundedSemaphore(self.workers * MAX_PENDING_PER_WORKER)
+            return self._pool
+
+    def warm_up(self):
+        """Démarre tous les processus (au démarrage : le premier login n'attend pas leur lancement)."""
+        pool = self._executor()
+        if pool is not None:
+            for future in [pool.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+
+    def _discard(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None  # Le sémaphore est conservé : les calculs en cours gardent leur place
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    def _run(self, fn, *args):
+        pool = self._executor()
+        if pool is None:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy("Trop de calculs de mots de passe en attente")
+        try:
+            try:
+                return pool.submit(fn, *args).result()
+            except BrokenProcessPool:
+                # Processus de calcul arrêté (tué, mémoire…) : pool remplacé, calcul relancé une fois
+                self._discard(pool)
+                return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    # ---------- API ----------
+    def hash(self, password):
+        """Hash bcrypt du mot de passe au coût actuel."""
+        return self._run(hash_password, password, self.rounds)
+
+    def verify(self, password, hashed):
+        """(valide, nouveau_hash) : nouveau_hash à enregistrer si le coût a changé, sinon None."""
+        if not password or not hashed:
+            return False, None
+        return self._run(check_password, password, hashed, self.rounds)
+
+
+# =========================================
+# 4. 🌐 Instance partagée de l'application
+# =========================================
+password_hasher = PasswordHasher()
+atexit.register(password_hasher.close)
@@ -0,0 +1,44 @@
+"""
+===============================================================
+🔖 FICHIER appPagination.py – Curseurs de pagination (keyset)
+===============================================================
+
+Les routes paginées renvoient un `next_cursor` opaque : un petit dictionnaire
+JSON (la clé de tri du dernier élément renvoyé) encodé en base64 URL-safe.
+Le client le renvoie tel quel pour obtenir la page suivante, ce qui évite
+les `LIMIT ? OFFSET ?` qui ralentissent linéairement en fin de liste.
+"""
+
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(position):
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Décode un curseur ; renvoie None si aucun curseur n'est fourni."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise InvalidCursor("Curseur invalide")
+    if not isinstance(position, dict):
+        raise InvalidCursor("Curseur invalide")
+    return position
+
+
+def parse_limit(value, default=10, maximum=100):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
@@ -0,0 +1,184 @@
+"""
+===============================================================
+💳 FICHIER appPasserelleStripe.py – Appels à l'API Stripe (délais bornés, connexions réutilisées)
+===============================================================
+
+/create-checkout-session appelait stripe.Customer.create puis
+stripe.checkout.Session.create avec le client HTTP par défaut du SDK : délai
+de lecture de 80 s, aucune limite sur la connexion. Une réponse lente de
+Stripe immobilisait un worker Flask aussi longtemps.
+
+- Un seul client Stripe pour l'application (StripeGateway) : session HTTP
+  persistante (keep-alive), pool de connexions borné (POOL_SIZE), délais stricts
+  de connexion (CONNECT_TIMEOUT) et de lecture (READ_TIMEOUT).
+- Nouveaux essais bornés (MAX_RETRIES) avec délai exponentiel et gigue,
+  uniquement pour les erreurs temporaires (réseau, délai dépassé, 409, 429,
+  5xx). Chaque appel porte une clé d'idempotence conservée entre les essais :
+  un essai répété après une réponse perdue ne crée pas un deuxième client.
+- Cache en mémoire de user.stripe_customer_id : un client Stripe déjà connu
+  ne coûte ni requête SQL ni appel Stripe. Création protégée par un verrou par
+  utilisateur (deux paiements simultanés → un seul client Stripe).
+
+STRIPE_API_BASE (optionnel) redirige les appels, ex. vers le serveur de test
+tests/benchmarks/stripe_stub.py.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appPasserelleStripe.py
+# =========================================
+
+# 1. 🔧 Réglages
+# 2. 🔁 Erreurs temporaires
+# 3. 💳 StripeGateway (client HTTP, appels, cache des clients Stripe)
+# 4. 🌐 Passerelle partagée de l'application
+
+import os
+import threading
+import time
+import uuid
+import requests
+import stripe
+from appEcriture import writer as app_writer
+from appEmails import retry_delay
+
+# =========================================
+# 1. 🔧 Réglages
+# =========================================
+
+# Délais (secondes) : établissement de la connexion, puis attente de la réponse
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUT = 10.0
+
+# Nouveaux essais après une erreur temporaire (en plus du premier appel)
+MAX_RETRIES = 2
+RETRY_BASE_DELAY = 0.25
+RETRY_MAX_DELAY = 2.0
+
+# Connexions HTTP gardées ouvertes vers Stripe (une par worker en parallèle)
+POOL_SIZE = 10
+
+
+# =========================================
+# 2. 🔁 Erreurs temporaires
+# =========================================
+def is_retryable(error):
+    """Erreurs qu'un nouvel essai peut corriger : réseau, délai dépassé, conflit, limite de débit, 5xx."""
+    if isinstance(error, (stripe.error.APIConnectionError, stripe.error.RateLimitError)):
+        return True
+    status = getattr(error, "http_status", None)
+    return status is not None and (status == 409 or status >= 500)
+
+
+# =========================================
+# 3. 💳 StripeGateway
+# =========================================
+class StripeGateway:
+    def __init__(self, api_key=None, api_base=None, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, retry_base=RETRY_BASE_DELAY, retry_max=RETRY_MAX_DELAY,
+                 pool_size=POOL_SIZE, writer=app_writer):
+        self.api_key = api_key
+        self.api_base = api_base
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.pool_size = pool_size
+        self.writer = writer
+        self._client = None
+        self._session = None
+        self._lock = threading.Lock()
+        self._customers = {}  # id_user -> stripe_customer_id
+        self._creating = {}   # id_user -> verrou de création du client Stripe
+
+    # ---------- Client HTTP ----------
+    def client(self):
+        """StripeClient partagé, créé au premier appel (clé lue après chargement du .env)."""
+        with self._lock:
+            if self._client is None:
+                self._session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+                api_base = self.api_base or os.getenv("STRIPE_API_BASE")
+                self._client = stripe.StripeClient(
+                    self.api_key or stripe.api_key or os.getenv("STRIPE_SECRET_KEY"),
+                    base_addresses={"api": api_base} if api_base else None,
+                    max_network_retries=0,  # Nouveaux essais gérés par call()
+                    http_client=stripe.RequestsClient(timeout=self.timeout, session=self._session),
+                )
+            return self._client
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._client = self._session = None
+
+    # ---------- Appels ----------
+    def call(self, create, params):
+        """
+        Appelle `create(client)` (méthode de l'API, ex. client.v1.customers.create)
+        avec une clé d'idempotence commune à tous les essais.
+        """
+        options = {"idempotency_key": str(uuid.uuid4())}
+        attempts = 0
+        while True:
+            try:
+                return create(self.client())(params=params, options=options)
+            except stripe.error.StripeError as e:
+                attempts += 1
+                if attempts > self.max_retries or not is_retryable(e):
+                    raise
+                print(f"🔁 Appel Stripe à nouveau (essai {attempts + 1}) :", e)
+                time.sleep(retry_delay(attempts, self.retry_base, self.retry_max))
+
+    def create_checkout_session(self, **params):
+        return self.call(lambda client: client.v1.checkout.sessions.create, params)
+
+    # ---------- Clients Stripe des utilisateurs ----------
+    def customer_for(self, conn, user_id):
+        """
+        stripe_customer_id de l'utilisateur : cache, sinon base, sinon création
+        chez Stripe (enregistrée dans user). None si l'utilisateur n'existe pas.
+        """
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        customer_id = self._customers.get(user_id)
+        if customer_id is not None:
+            return customer_id
+
+        with self._lock:
+            creating = self._creating.setdefault(user_id, threading.Lock())
+        with creating:
+            customer_id = self._customers.get(user_id)
+            if customer_id is not None:
+                return customer_id
+            row = conn.execute(
+                "SELECT email, first_name, name, stripe_customer_id FROM user WHERE id_user = ?", (user_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            customer_id = row["stripe_customer_id"]
+            if not customer_id:
+                print("➕ Création d’un nouveau client Stripe...")
+                customer = self.call(lambda client: client.v1.customers.create,
+                                     {"email": row["email"], "name": f"{row['first_name']} {row['name']}"})
+                customer_id = customer.id
+                self.writer.execute(lambda write_conn: write_conn.execute(
+                    "UPDATE user SET stripe_customer_id = ? WHERE id_user = ?", (customer_id, user_id)
+                ))
+                print(f"✅ Nouveau client Stripe créé : {customer_id}")
+            self._customers[user_id] = customer_id
+            return customer_id
+
+    def forget_customer(self, user_id):
+        """À appeler quand l'utilisateur est supprimé (son id peut être réattribué)."""
+        self._customers.pop(int(user_id), None)
+
+
+# =========================================
+# 4. 🌐 Passerelle partagée de l'application
+# =========================================
+stripe_gateway = StripeGateway()
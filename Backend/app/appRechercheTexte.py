@@ -0,0 +1,183 @@
+"""
+===============================================================
+📝 FICHIER appRechercheTexte.py – Recherche plein texte (SQLite FTS5)
+===============================================================
+
+Recherche des hôtels par mots présents dans leur nom, description ou adresse,
+ainsi que dans le commentaire de leurs avis.
+
+Deux tables virtuelles FTS5 à contenu externe reflètent `hotels` et `reviews`
+(aucune copie du texte, seul l'index inversé est stocké). Des triggers créés
+par la migration 8 (appMigrations.py) les tiennent à jour à chaque
+INSERT / UPDATE / DELETE. Le classement utilise BM25 et les extraits
+correspondants sont renvoyés en HTML échappé, les termes trouvés entourés
+de <mark>.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appRechercheTexte.py
+# =========================================
+
+# 1. 🧱 Tables FTS5 & triggers de synchronisation
+# 2. 🔤 Construction de la requête MATCH
+# 3. 🔍 Recherche classée (BM25 + extraits)
+
+import html
+import json
+import re
+
+# =========================================
+# 1. 🧱 Tables FTS5 & triggers de synchronisation
+# =========================================
+
+# table source -> (table FTS, colonnes indexées)
+FTS_TABLES = {
+    "hotels": ("hotels_fts", ("name", "description", "address")),
+    "reviews": ("reviews_fts", ("comment",)),
+}
+
+
+def ensure_text_search(conn):
+    """
+    Crée les tables FTS5 et leurs triggers si besoin, puis indexe le contenu existant.
+    Pas de commit : exécutée dans la transaction de la migration 8.
+    """
+    for source, (fts_table, columns) in FTS_TABLES.items():
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)
+        ).fetchone()
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                {column_list},
+                content='{source}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_insert AFTER INSERT ON {source} BEGIN
+                INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_delete AFTER DELETE ON {source} BEGIN
+                INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_update AFTER UPDATE ON {source} BEGIN
+                INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.id, {new_values});
+            END
+        """)
+        if exists is None:
+            conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+
+# =========================================
+# 2. 🔤 Construction de la requête MATCH
+# =========================================
+_WORDS = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(text):
+    """
+    Transforme la saisie utilisateur en requête FTS5 sûre : chaque mot est
+    cité (pas d'opérateurs injectés) et cherché en préfixe, tous les mots requis.
+    """
+    words = _WORDS.findall(text or "")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+# =========================================
+# 3. 🔍 Recherche classée (BM25 + extraits)
+# =========================================
+
+# Poids BM25 des colonnes de hotels_fts : name, description, address
+HOTEL_COLUMN_WEIGHTS = (10.0, 2.0, 1.0)
+# Importance relative d'un avis correspondant par rapport au texte de l'hôtel
+REVIEW_WEIGHT = 0.5
+
+# Bornes des termes trouvés dans snippet() : caractères de contrôle, remplacés par <mark>
+# une fois le texte échappé (le texte des hôtels et des avis n'est jamais renvoyé brut)
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+
+def highlight(snippet):
+    """Extrait FTS5 → HTML sûr : texte échappé, termes trouvés entourés de <mark>."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def search_text(conn, text, limit=20, candidate_ids=None):
+    """
+    Renvoie une liste de dictionnaires {hotel_id, score, snippet, review_snippet}
+    triés par pertinence (score BM25 : plus il est bas, meilleur est le résultat).
+    `candidate_ids` restreint les résultats (filtres d'équipements, disponibilité).
+
+    Le filtre et la limite sont appliqués dans SQLite : les extraits ne sont
+    calculés que pour les `limit` hôtels renvoyés (et leur meilleur avis).
+    """
+    match = build_match_query(text)
+    if not match or limit <= 0 or (candidate_ids is not None and not candidate_ids):
+        return []
+
+    params = {"match": match, "review_weight": REVIEW_WEIGHT, "limit": limit}
+    hotel_filter = review_filter = ""
+    if candidate_ids is not None:
+        params["candidates"] = json.dumps(sorted(candidate_ids))
+        hotel_filter = "AND hotels_fts.rowid IN (SELECT value FROM json_each(:candidates))"
+        review_filter = "AND r.hotel_id IN (SELECT value FROM json_each(:candidates))"
+
+    # Score de chaque hôtel : texte de l'hôtel + meilleur avis (MIN → review_id de cet avis).
+    # MATERIALIZED : bm25() doit être évalué dans une requête simple sur la table FTS5.
+    ranked = conn.execute(f"""
+        WITH hotel_hits AS MATERIALIZED (
+            SELECT hotels_fts.rowid AS hotel_id,
+                   bm25(hotels_fts, {", ".join(str(w) for w in HOTEL_COLUMN_WEIGHTS)}) AS score
+            FROM hotels_fts
+            WHERE hotels_fts MATCH :match {hotel_filter}
+        ),
+        review_hits AS MATERIALIZED (
+            SELECT r.hotel_id, r.id AS review_id, bm25(reviews_fts) AS score
+            FROM reviews_fts
+            JOIN reviews r ON r.id = reviews_fts.rowid
+            WHERE reviews_fts MATCH :match {review_filter}
+        )
+        SELECT hotel_id, SUM(score) AS score, MAX(review_id) AS review_id
+        FROM (
+            SELECT hotel_id, score, NULL AS review_id FROM hotel_hits
+            UNION ALL
+            SELECT hotel_id, :review_weight * MIN(score), review_id FROM review_hits GROUP BY hotel_id
+        )
+        GROUP BY hotel_id
+        ORDER BY score, hotel_id
+        LIMIT :limit
+    """, params).fetchall()
+    if not ranked:
+        return []
+
+    # Extraits des seuls hôtels et avis renvoyés
+    hotel_ids = json.dumps([row["hotel_id"] for row in ranked])
+    review_ids = json.dumps([row["review_id"] for row in ranked if row["review_id"] is not None])
+    hotel_snippets = dict(conn.execute(f"""
+        SELECT rowid, snippet(hotels_fts, -1, '{_MARK_START}', '{_MARK_END}', '…', 12)
+        FROM hotels_fts
+        WHERE hotels_fts MATCH ? AND rowid IN (SELECT value FROM json_each(?))
+    """, (match, hotel_ids)).fetchall())
+    review_snippets = dict(conn.execute(f"""
+        SELECT rowid, snippet(reviews_fts, 0, '{_MARK_START}', '{_MARK_END}', '…', 12)
+        FROM reviews_fts
+        WHERE reviews_fts MATCH ? AND rowid IN (SELECT value FROM json_each(?))
+    """, (match, review_ids)).fetchall())
+
+    return [{
+        "hotel_id": row["hotel_id"],
+        "score": row["score"],
+        "snippet": highlight(hotel_snippets.get(row["hotel_id"])),
+        "review_snippet": highlight(review_snippets.get(row["review_id"]))
+    } for row in ranked]
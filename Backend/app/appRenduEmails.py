@@ -0,0 +1,154 @@
+"""
+===============================================================
+🎨 FICHIER appRenduEmails.py – Rendu des emails (templates compilés une fois)
+===============================================================
+
+Le webhook Stripe et l'annulation relisaient confirmation.html /
+cancelConfirmation.html sur le disque puis appelaient render_template_string :
+le template était analysé et compilé à nouveau à chaque paiement et à chaque
+annulation. La newsletter reconstruisait son HTML dans la route.
+
+- Un environnement Jinja dédié charge les templates de
+  Frontend/templates/email_templates une seule fois (compilés au démarrage
+  par warm_up(), puis gardés en mémoire sans vérification du fichier).
+  Le code compilé est aussi conservé sur disque (FileSystemBytecodeCache,
+  dossier temporaire du système) : un redémarrage ne recompile pas.
+- Chaque rendu produit les deux parties d'un email : HTML et texte brut.
+  Le texte vient du template <nom>.txt s'il existe, sinon il est déduit du
+  HTML rendu (titres, paragraphes, liens conservés).
+- render_batch(nom, contextes) rend une série de messages avec le même
+  template compilé.
+
+url_for('static', filename=...) reste utilisable dans ces templates : il
+produit une adresse absolue (PUBLIC_BASE_URL), seule utilisable dans un email.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appRenduEmails.py
+# =========================================
+
+# 1. 🔧 Chemins & réglages
+# 2. 📝 Partie texte (HTML → texte brut)
+# 3. 🎨 EmailRenderer (environnement Jinja, rendu simple et par lot)
+
+import os
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateNotFound, select_autoescape
+
+# =========================================
+# 1. 🔧 Chemins & réglages
+# =========================================
+EMAIL_TEMPLATE_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "Frontend", "templates", "email_templates"
+))
+
+# Adresse publique du site (liens et ressources statiques des emails)
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://127.0.0.1:5003")
+
+RenderedEmail = namedtuple("RenderedEmail", ["html", "text"])
+
+
+# =========================================
+# 2. 📝 Partie texte (HTML → texte brut)
+# =========================================
+_BLOCK_TAGS = {"p", "div", "br", "h1", "h2", "h3", "h4", "h5", "h6", "li", "tr", "header", "footer", "table", "ul", "ol"}
+_HIDDEN_TAGS = {"head", "style", "script", "title"}
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._hidden = 0
+        self._links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _HIDDEN_TAGS:
+            self._hidden += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+        elif tag == "a":
+            self._links.append(dict(attrs).get("href"))
+
+    def handle_endtag(self, tag):
+        if tag in _HIDDEN_TAGS:
+            self._hidden = max(0, self._hidden - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+        elif tag == "a" and self._links:
+            href = self._links.pop()
+            if href and not href.startswith("mailto:"):
+                self.parts.append(f" ({href})")
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self.parts.append(data)
+
+
+def html_to_text(html):
+    """Texte brut lisible d'un email HTML : un bloc par ligne, liens entre parenthèses."""
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(extractor.parts).split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip() + "\n"
+
+
+# =========================================
+# 3. 🎨 EmailRenderer
+# =========================================
+class EmailRenderer:
+    def __init__(self, template_dir=EMAIL_TEMPLATE_DIR, bytecode_dir=None, base_url=PUBLIC_BASE_URL):
+        self.base_url = base_url.rstrip("/")
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(["html"]),
+            bytecode_cache=FileSystemBytecodeCache(bytecode_dir),
+            auto_reload=False,  # Template compilé gardé en mémoire, fichier jamais relu
+            cache_size=-1,
+        )
+        self.env.globals["url_for"] = self._url_for
+        self._pairs = {}  # nom -> (template HTML, template texte ou None)
+
+    def _url_for(self, endpoint, filename=None, **values):
+        """url_for des templates Flask, limité à 'static' : adresse absolue."""
+        if endpoint != "static":
+            raise ValueError(f"url_for('{endpoint}') indisponible dans un email")
+        return f"{self.base_url}/static/{filename}"
+
+    def warm_up(self):
+        """Compile tous les templates du dossier (au démarrage) ; renvoie leurs noms."""
+        names = self.env.list_templates(extensions=("html", "txt"))
+        for name in names:
+            self.env.get_template(name)
+        return names
+
+    def _templates(self, name):
+        pair = self._pairs.get(name)
+        if pair is None:
+            try:
+                text = self.env.get_template(os.path.splitext(name)[0] + ".txt")
+            except TemplateNotFound:
+                text = None  # Absence mémorisée : pas de recherche sur disque à chaque rendu
+            pair = self._pairs[name] = (self.env.get_template(name), text)
+        return pair
+
+    def render(self, name, /, **context):
+        """RenderedEmail(html, text) du template `name` (ex. 'confirmation.html')."""
+        return self.render_batch(name, [context])[0]
+
+    def render_batch(self, name, contexts):
+        """Un RenderedEmail par contexte, tous rendus avec le même template compilé."""
+        html_template, text_template = self._templates(name)
+        rendered = []
+        for context in contexts:
+            html = html_template.render(context)
+            text = text_template.render(context) if text_template is not None else html_to_text(html)
+            rendered.append(RenderedEmail(html, text))
+        return rendered
+
+
+# Instance partagée par les routes
+email_renderer = EmailRenderer()
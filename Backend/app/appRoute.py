@@ -5,18 +5,20 @@
 # 1. 🚀 Initialisation & Configuration
 #    1.1. Import des modules nécessaires
 #    1.2. Chargement des variables d’environnement (.env)
-#    1.3. Définition du chemin absolu de la base de données
+#    1.3. Chemin absolu de la base de données (appConnexion.DB_PATH)
 #    1.4. Initialisation de l'application Flask
 #    1.5. Configuration SQLAlchemy
 #    1.6. Configuration Stripe
-#    1.7. Configuration Flask-Mail
+#    1.7. Configuration SMTP (MAIL_*)
 #    1.8. Initialisation manuelle SQLAlchemy
-#    1.9. Initialisation de Flask-Mail
+#    1.9. File d'envoi des emails (appEmails.queue_email, email_outbox) + rendu compilé (appRenduEmails)
 #    1.10. Initialisation des Blueprints (inscription)
 
 # 2. 🔧 Connexion à la base de données
-#    2.1. get_db_connection() → Ouverture
-#    2.2. close_db_connection() → Fermeture automatique
+#    2.1. get_db_connection() → Connexion du pool (appConnexion)
+#    2.2. init_db(app)           → Retour au pool en fin de requête
+#    2.3. run_write(job)         → Écritures confiées à l'écrivain unique (appEcriture)
+#    2.4. @conditional(policy)   → ETag / Last-Modified / 304 + corps compressés en cache (appCacheHttp) : 4.3, 7.1, 7.2, 7.5, 7.8
 
 # 3. 🌐 Pages HTML visibles
 #    3.1. /                      → Accueil (index.html)
@@ -42,10 +44,14 @@
 #    7.2. /hotels (GET)          → Liste complète des hôtels
 #    7.3. /recherche (POST)      → Recherche globale
 #    7.4. /filter_hotels (POST)  → Filtres avancés
-#    7.5. /get_reviews (GET)     → Avis d’un hôtel
+#    7.5. /get_reviews (GET)     → Page d’avis d’un hôtel {items, next_cursor, total}
 #    7.6. /get_hotel_name (GET)  → Nom d’un hôtel
 #    7.7. /get_price_per_night/<id> (GET) → Prix d’un hôtel
-#    7.8. /get_hotel_id (GET)    → ID d’un hôtel
+#    7.8. /api/hotels (GET)      → Pagination par curseur {items, next_cursor, total}
+#    7.9. /api/hotels/count (GET) → Nombre total d’hôtels (compteur en cache)
+#    7.10. /search/text (GET|POST) → Recherche plein texte (FTS5, BM25, extraits)
+#    7.11. /api/hotels/in-bounds (GET) → Marqueurs des hôtels visibles sur la carte (R*Tree)
+#    7.12. /api/hotels/clusters (GET)  → Regroupements de marqueurs par zoom (grille précalculée)
 
 # 8. 📦 Réservations & Stripe
 #    8.1. /api/reservations (POST)        → Réservation (désactivé)
@@ -78,18 +84,33 @@
 
 # 1.1. Import des modules nécessaires
 import os
-import sqlite3
 import stripe
 import time
-import traceback
 import logging
 import threading
-from flask import Flask, g, render_template, request, jsonify, redirect, url_for, flash, render_template_string
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, g
 from flask_cors import CORS
-from flask_mail import Mail, Message
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone
-from appInscription import inscription_bp, init_inscription_extensions
+from appConnexion import get_db_connection, init_db, DB_PATH
+from appEcriture import run_write, writer
+from appCacheHttp import conditional, data_version, init_compression
+from appAssets import init_assets
+from appEmails import init_outbox, queue_email, insert_email, outbox
+from appWebhookStripe import parse_event, stripe_events
+from appPasserelleStripe import stripe_gateway
+from appRenduEmails import email_renderer
+from appInscription import inscription_bp, init_inscription_extensions, session_required
+from appMotDePasse import password_hasher
+from appAvis import load_reviews_for_hotels, load_review_stats, load_review_page, normalize_review_sort
+from appCatalogue import catalog, LIST_FILTERS
+from appSerialisation import hotel_to_dict, hotel_to_pin, image_path, init_json
+from appDisponibilite import availability, record_stay, CONFIRMED_STATUSES
+from appPagination import encode_cursor, decode_cursor, parse_limit, InvalidCursor
+from appAutocompletion import CatalogAutocomplete
+from appRechercheTexte import search_text
+from appMigrations import migrate
+from appGeo import parse_bounds, hotel_ids_in_bounds, InvalidBounds, CatalogClusters
 
 # Charger les variables d’environnement
 load_dotenv("securite_mdp.env")
@@ -99,46 +120,52 @@ stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 endpoint_secret = os.getenv("STRIPE_WEBHOOK_SECRET")
 stripe_public_key = os.getenv("STRIPE_PUBLIC_KEY")
 
-# Chemin vers la base SQLite
-basedir = os.path.abspath(os.path.dirname(__file__))
-db_path = os.path.join(basedir, 'hotels.db')
+# Chemin vers la base SQLite (absolu, partagé par tous les modules)
+db_path = DB_PATH
 
 # Initialisation Flask
 app = Flask(__name__, static_folder="../../static", template_folder="../../Frontend/templates")
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "justdreams_secret_123")
 CORS(app)
+init_json(app)  # jsonify via orjson (si installé)
+init_compression(app)  # Réponses JSON volumineuses compressées (brotli / gzip selon Accept-Encoding)
+init_assets(app)  # JS / CSS versionnés servis par /assets (immutable), asset_url() dans les templates
 
-# Initialisation Flask-Mail
+# Configuration SMTP (utilisée par les threads d'envoi de la file email_outbox)
 app.config['MAIL_SERVER'] = 'smtp.gmail.com'
 app.config['MAIL_PORT'] = 587
 app.config['MAIL_USE_TLS'] = True
 app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
 app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_USERNAME')
-mail = Mail(app)
+init_outbox(app)  # Les routes mettent les emails en file (queue_email) ; envoi en arrière-plan
 
 # Initialisation extensions liées à l’inscription (SQLAlchemy uniquement pour appInscription)
 init_inscription_extensions(app)
 app.register_blueprint(inscription_bp)
 
+# Réponses conditionnelles (ETag) : une écriture validée par l'application invalide la version en mémoire
+writer.add_commit_listener(data_version.invalidate)
+
+# Index d'autocomplétion construit sur le catalogue d'hôtels en mémoire
+autocomplete_index = CatalogAutocomplete(catalog)
+
+# Regroupement des marqueurs de la carte par zoom, recalculé quand le catalogue change
+map_clusters = CatalogClusters(catalog)
+
 
 # =========================================
 # 2. 🔧 Connexion à la base de données
 # =========================================
 
-# 2.1. get_db_connection() → Ouverture
-def get_db_connection():
-    if not hasattr(g, 'sqlite_db'):  # Vérifier si la connexion à la DB existe déjà
-        g.sqlite_db = sqlite3.connect('hotels.db')  # Ouvrir une nouvelle connexion à la DB
-        g.sqlite_db.row_factory = sqlite3.Row  # Permet de récupérer les résultats sous forme de dictionnaire
-    return g.sqlite_db  # Retourner la connexion à la DB
+# 2.1. get_db_connection() → connexion prise dans le pool (WAL, PRAGMA, cache de requêtes),
+#      importée depuis appConnexion. Les routes ne la ferment pas : elle est réutilisée.
 
+# 2.2. Retour automatique de la connexion au pool à la fin de chaque requête
+init_db(app)
 
-# 2.2. close_db_connection() → Fermeture automatique
-@app.teardown_appcontext
-def close_db_connection(exception):
-    if hasattr(g, 'sqlite_db'):  # Vérifier si la connexion à la DB existe
-        g.sqlite_db.close()  # Fermer la connexion à la base de données
+# 2.3. run_write(job) → toutes les écritures passent par le thread écrivain unique
+#      (appEcriture) ; les routes ne font que lire avec get_db_connection().
 
 
 # =========================================
@@ -191,7 +218,7 @@ def contact():
 # 4.1. Affiche hotel.html avec les filtres et les avis passés depuis index.html
 @app.route('/hotel')
 def hotel():
-    hotel_id = request.args.get("hotel_id")
+    hotel_id = request.args.get("hotel_id", type=int)
     filters = {
         "destination": request.args.get("destination", ""),
         "start_date": request.args.get("start_date", ""),
@@ -204,22 +231,7 @@ def hotel():
     reviews = []
     if hotel_id:
         conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
-            FROM reviews r
-            JOIN user u ON r.user_id = u.id_user
-            WHERE r.hotel_id = ?
-            ORDER BY r.date_posted DESC
-        """, (hotel_id,))
-        reviews = [{
-            "first_name": row["first_name"],
-            "last_name": row["name"],
-            "rating": row["rating"],
-            "comment": row["comment"],
-            "date_posted": row["date_posted"]
-        } for row in cursor.fetchall()]
-        conn.close()
+        reviews = load_reviews_for_hotels(conn, [hotel_id])[hotel_id]
 
     print("📌 Filtres transmis à hotel.html :", filters)
 
@@ -241,94 +253,29 @@ def reservation():
         "lng": request.args.get("lng", type=float),
         "id": request.args.get("hotel_id")
     }
+    hotel_id = request.args.get("hotel_id", type=int)
     reviews = []
-    if hotel["id"]:
+    if hotel_id:
         conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
-            FROM reviews r
-            JOIN user u ON r.user_id = u.id_user
-            WHERE r.hotel_id = ?
-            ORDER BY r.date_posted DESC
-        """, (hotel["id"],))
-        reviews = [{
-            "first_name": row["first_name"],
-            "last_name": row["name"],
-            "rating": row["rating"],
-            "comment": row["comment"],
-            "date_posted": row["date_posted"]
-        } for row in cursor.fetchall()]
-        conn.close()
+        reviews = load_reviews_for_hotels(conn, [hotel_id])[hotel_id]
 
     return render_template('reservations.html', hotel=hotel, reviews=reviews)
 
 
 # 4.3. Affiche sur la page reservation un hotel par defaut (Le Parisien Luxe)
 @app.route("/api/default-hotel", methods=["GET"])
+@conditional("default_hotel")
 def get_default_hotel():
+    # ✅ Hôtel lu dans le catalogue en mémoire, même format que les marqueurs de la carte
     conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT h.*, c.name AS city_name
-        FROM hotels h
-        JOIN cities c ON h.city_id = c.id
-        WHERE h.name = 'Le Parisien Luxe'
-    """)
-    hotel = cursor.fetchone()
+    hotel = next((hotel for hotel in catalog.hotels(conn) if hotel.name == 'Le Parisien Luxe'), None)
 
     if not hotel:
         return jsonify({"error": "Hôtel par défaut non trouvé"}), 404
 
-    # 🔍 Récupérer les avis
-    cursor.execute("""
-        SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
-        FROM reviews r
-        JOIN user u ON r.user_id = u.id_user
-        WHERE r.hotel_id = ?
-        ORDER BY r.date_posted DESC
-    """, (hotel["id"],))
-    reviews = [{
-        "first_name": review["first_name"],
-        "last_name": review["name"],
-        "rating": review["rating"],
-        "comment": review["comment"],
-        "date_posted": review["date_posted"]
-    } for review in cursor.fetchall()]
-
-    # 🧩 Assemblage
-    result = {
-        "id": hotel["id"],
-        "name": hotel["name"],
-        "stars": hotel["stars"],
-        "rating": hotel["hotel_rating"],
-        "price": hotel["price_per_night"],
-        "address": hotel["address"],
-        "description": hotel["description"],
-        "latitude": hotel["latitude"],
-        "longitude": hotel["longitude"],
-        "image": f"/static/Image/{hotel['image_url']}" if hotel["image_url"] else "/static/Image/default.jpg",
-        "equipments": [
-            equip for equip in [
-                "Parking" if hotel["parking"] else None,
-                "Restaurant" if hotel["restaurant"] else None,
-                "Piscine" if hotel["piscine"] else None,
-                "Animaux admis" if hotel["pets_allowed"] else None,
-                "Salle de sport" if hotel["gym"] else None,
-                "Spa" if hotel["spa"] else None,
-                "Wi-Fi gratuit" if hotel["free_wifi"] else None,
-                "Climatisation" if hotel["air_conditioning"] else None,
-                "Borne recharge" if hotel["ev_charging"] else None,
-                "Accès PMR" if hotel["wheelchair_accessible"] else None,
-                "Machine à laver" if hotel["washing_machine"] else None,
-                "Kitchenette" if hotel["kitchenette"] else None
-            ] if equip is not None
-        ],
-        "reviews": reviews
-    }
+    result = hotel_to_pin(hotel)
+    result["reviews"] = [review._asdict() for review in hotel.reviews]
 
-    conn.close()
     return jsonify(result)
 
 
@@ -344,32 +291,20 @@ def subscribe():
         return redirect("/")
 
     try:
-        with sqlite3.connect("hotels.db") as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR IGNORE INTO newsletter_subscriptions (email) VALUES (?)",
-                (email,)
-            )
-            conn.commit()
-
-        # 💌 Email de confirmation
-        msg = Message(
+        run_write(lambda write_conn: write_conn.execute(
+            "INSERT OR IGNORE INTO newsletter_subscriptions (email) VALUES (?)",
+            (email,)
+        ))
+
+        # 💌 Email de confirmation (mis en file, envoyé en arrière-plan)
+        rendered = email_renderer.render("newsletter.html")
+        queue_email(
             subject="✅ Merci pour votre inscription à la newsletter JustDreams",
             recipients=[email],
-            html="""
-                <div style="font-family: Arial, sans-serif; padding: 20px;">
-                    <h2 style="color: #1a73e8;">Bienvenue dans l'univers JustDreams ✨</h2>
-                    <p>Merci pour votre inscription à notre newsletter !</p>
-                    <p>Vous recevrez bientôt des offres exclusives, des bons plans voyages et plein de surprises 🧳</p>
-                    <p>À très vite 🌍</p>
-                    <br>
-                    <p style="font-size: 14px; color: #555;">L’équipe JustDreams</p>
-                </div>
-            """,
+            body=rendered.text,
+            html=rendered.html,
             reply_to="support@justdreams06.com"
         )
-
-        mail.send(msg)
         flash("Inscription réussie. Un email de confirmation vous a été envoyé !", "success")
 
     except Exception as e:
@@ -397,25 +332,19 @@ def contact_post():
         if not all([first_name, last_name, email, phone, message]):
             raise ValueError("Tous les champs doivent être remplis")
 
-        # Envoi du mail au destinataire
-        msg = Message('Nouvelle demande de contact',
-                      recipients=['justdreams06@gmail.com'])
-        msg.body = f'Nom: {first_name} {last_name}\nEmail: {email}\nTéléphone: {phone}\nMessage: {message}\nObjet: {subject}'
-        mail.send(msg)
+        # Envoi du mail au destinataire (mis en file)
+        queue_email('Nouvelle demande de contact', ['justdreams06@gmail.com'],
+                    body=f'Nom: {first_name} {last_name}\nEmail: {email}\nTéléphone: {phone}\nMessage: {message}\nObjet: {subject}')
 
         # Enregistrement de la demande dans la base de données (table de contact)
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        run_write(lambda write_conn: write_conn.execute("""
             INSERT INTO contact_requests (first_name, last_name, email, phone, message, subject, status)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (first_name, last_name, email, phone, message, subject, 'pending'))
-        conn.commit()
+        """, (first_name, last_name, email, phone, message, subject, 'pending')))
 
         # Envoi de la réponse automatique à l'utilisateur avec le template HTML
-        auto_reply = Message('Merci pour votre message', recipients=[email])
-        auto_reply.html = render_template("email_templates/confirmationFormulaire.html", first_name=first_name)
-        mail.send(auto_reply)
+        rendered = email_renderer.render("confirmationFormulaire.html", first_name=first_name)
+        queue_email('Merci pour votre message', [email], body=rendered.text, html=rendered.html)
 
         # Utilisation de flash et redirection vers l'accueil avec un message
         flash("Votre message a été envoyé avec succès !", "success")
@@ -433,91 +362,30 @@ def contact_post():
 
 # 7.1. Autocomplétion pour villes, pays et continents sur toutes les pages
 @app.route("/autocomplete", methods=["GET"])
+@conditional("autocomplete")
 def autocomplete():
-    query = request.args.get("query", "").lower()
-    if not query:
+    query = request.args.get("query", "")
+    if not query.strip():
         return jsonify([])
+    limit = parse_limit(request.args.get("limit", 10), maximum=50)
 
+    # ✅ Index de préfixes en mémoire (sans accents ni casse), classé par nombre d'hôtels
     conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT DISTINCT name FROM cities WHERE LOWER(name) LIKE ?", (f"%{query}%",))
-    city_results = [row["name"] for row in cursor.fetchall()]
-
-    cursor.execute("SELECT DISTINCT name FROM countries WHERE LOWER(name) LIKE ?", (f"%{query}%",))
-    country_results = [row["name"] for row in cursor.fetchall()]
-
-    cursor.execute("SELECT DISTINCT continent FROM countries WHERE LOWER(continent) LIKE ?", (f"%{query}%",))
-    continent_results = [row["continent"] for row in cursor.fetchall()]
-
-    conn.close()
-    return jsonify(continent_results + country_results + city_results)
+    suggestions = autocomplete_index.search(conn, query, limit)
+    return jsonify(suggestions)
 
 
 # 7.2. Récupération complète des hôtels sur hotel.html
 @app.route('/hotels', methods=['GET'])
+@conditional("catalog")
 def get_hotels():
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-        SELECT hotels.*, cities.name AS city, hotels.address AS full_address, 
-               hotels.latitude, hotels.longitude
-        FROM hotels
-        JOIN cities ON hotels.city_id = cities.id
-        """)
-        hotels = []
-        for row in cursor.fetchall():
-            hotel_id = row["id"]
-
-            # ✅ Récupérer les avis pour chaque hôtel
-            cursor.execute("""
-            SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
-            FROM reviews r
-            JOIN user u ON r.user_id = u.id_user
-            WHERE r.hotel_id = ?
-            ORDER BY r.date_posted DESC
-            """, (hotel_id,))
-
-            reviews = [{
-                "first_name": review["first_name"],
-                "last_name": review["name"],
-                "rating": review["rating"],
-                "comment": review["comment"],
-                "date_posted": review["date_posted"]
-            } for review in cursor.fetchall()]
-
-            hotels.append ({
-                "id": row["id"],
-                "name": row["name"],
-                "stars": row["stars"],
-                "price_per_night": row["price_per_night"],
-                "hotel_rating": row["hotel_rating"],
-                "city": row["city"],
-                "address": row["full_address"] if row["full_address"] not in (None, "", "null") else "Adresse inconnue",
-                "description": row["description"],
-                "latitude": row["latitude"],
-                "longitude": row["longitude"],
-                "image": f"http://127.0.0.1:5003/static/Image/{row['image_url']}" if row["image_url"] else "http://127.0.0.1:5003/static/Image/default.jpg",
-                "equipments": [
-                    equip for equip in [
-                        "Parking" if row["parking"] else None,
-                        "Restaurant" if row["restaurant"] else None,
-                        "Piscine" if row["piscine"] else None,
-                        "Animaux admis" if row["pets_allowed"] else None,
-                        "Salle de sport" if row["gym"] else None,
-                        "Spa" if row["spa"] else None,
-                        "Wi-Fi gratuit" if row["free_wifi"] else None,
-                        "Climatisation" if row["air_conditioning"] else None,
-                        "Borne recharge" if row["ev_charging"] else None,
-                        "Accès PMR" if row["wheelchair_accessible"] else None,
-                        "Machine à laver" if row["washing_machine"] else None,
-                        "Kitchenette" if row["kitchenette"] else None
-                    ] if equip is not None  # ✅ Supprime les valeurs None
-                ],
-                "reviews": reviews  # ✅ Ajout des avis
-            })
+    # ✅ Hôtels servis depuis le catalogue en mémoire (reconstruit si la base a changé)
+    conn = get_db_connection()
+    hotels = [
+        hotel_to_dict(hotel, image_base="http://127.0.0.1:5003/static/Image/")
+        for hotel in catalog.hotels(conn)
+    ]
     print(f"📌 Nombre d'hôtels envoyés à `hotel.js`: {len(hotels)}")
-    conn.close()
     return jsonify(hotels)
 
 
@@ -551,24 +419,15 @@ def recherche_hotels():
         cursor = conn.cursor()
 
         query = """
-            SELECT hotels.*, cities.name AS city, countries.name AS country
+            SELECT hotels.id
             FROM hotels
             JOIN cities ON hotels.city_id = cities.id
             JOIN countries ON cities.country_id = countries.id
             WHERE hotels.adults_per_room >= ?
               AND hotels.children_per_room >= ?
               AND hotels.pets_allowed = ?
-              AND NOT EXISTS (
-                SELECT 1 FROM reservations res
-                WHERE res.hotel_id = hotels.id
-                  AND (
-                    (res.checkin <= ? AND res.checkout > ?)
-                    OR (res.checkin < ? AND res.checkout >= ?)
-                    OR (res.checkin >= ? AND res.checkout <= ?)
-                  )
-              )
         """
-        params = [adults, children, pets, end_date, start_date, end_date, start_date, start_date, end_date]
+        params = [adults, children, pets]
 
         if destination:
             query += " AND (cities.name LIKE ? OR countries.name LIKE ? OR countries.continent LIKE ?)"
@@ -579,66 +438,19 @@ def recherche_hotels():
         print("📌 Paramètres SQL :", params)
         print("🟢 ROUTE /recherche bien mise à jour")
         cursor.execute(query, params)
-        hotels = cursor.fetchall()
-
-        unique_hotels = {}  # ✅ Pour éviter les doublons
-
-        for hotel in hotels:
-            hotel_id = hotel["id"]
-
-            if hotel_id not in unique_hotels:
-                # ✅ Récupérer les avis
-                cursor.execute("""
-                    SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
-                    FROM reviews r
-                    JOIN user u ON r.user_id = u.id_user
-                    WHERE r.hotel_id = ?
-                    ORDER BY r.date_posted DESC
-                """, (hotel_id,))
-                reviews = [{
-                    "first_name": review["first_name"],
-                    "last_name": review["name"],
-                    "rating": review["rating"],
-                    "comment": review["comment"],
-                    "date_posted": review["date_posted"]
-                } for review in cursor.fetchall()]
-
-                unique_hotels[hotel_id] = {
-                    "id": hotel_id,
-                    "name": hotel["name"],
-                    "stars": hotel["stars"],
-                    "hotel_rating": hotel["hotel_rating"],
-                    "price_per_night": hotel["price_per_night"],
-                    "city": hotel["city"],
-                    "country": hotel["country"],
-                    "available_from": hotel["available_from"],
-                    "available_to": hotel["available_to"],
-                    "description": hotel["description"],
-                    "address": hotel["address"] if hotel["address"] not in (None, "", "null") else "Adresse inconnue",
-                    "latitude": hotel["latitude"],
-                    "longitude": hotel["longitude"],
-                    "image": f"/static/Image/{hotel['image_url']}" if hotel["image_url"] else "/static/Image/default.jpg",
-                    "equipments": [
-                        equip for equip in [
-                            "Parking" if hotel["parking"] else None,
-                            "Restaurant" if hotel["restaurant"] else None,
-                            "Piscine" if hotel["piscine"] else None,
-                            "Animaux admis" if hotel["pets_allowed"] else None,
-                            "Salle de sport" if hotel["gym"] else None,
-                            "Spa" if hotel["spa"] else None,
-                            "Wi-Fi gratuit" if hotel["free_wifi"] else None,
-                            "Climatisation" if hotel["air_conditioning"] else None,
-                            "Borne recharge" if hotel["ev_charging"] else None,
-                            "Accès PMR" if hotel["wheelchair_accessible"] else None,
-                            "Machine à laver" if hotel["washing_machine"] else None,
-                            "Kitchenette" if hotel["kitchenette"] else None
-                        ] if equip is not None
-                    ],
-                    "reviews": reviews
-                }
-
-        conn.close()
-        return jsonify(list(unique_hotels.values()))
+        hotel_ids = list(dict.fromkeys(row["id"] for row in cursor.fetchall()))  # ✅ Sans doublons, ordre conservé
+
+        # ✅ Au moins une chambre libre chaque nuit de [start_date, end_date) (index des nuits complètes)
+        availability.ensure_loaded(conn)
+        free_ids = set(availability.available_hotels(hotel_ids, start_date, end_date))
+
+        # ✅ Hôtels, avis et statistiques lus dans le catalogue en mémoire (format commun des listings)
+        hotels_by_id = catalog.get(conn).hotels_by_id
+        return jsonify([
+            hotel_to_dict(hotels_by_id[hotel_id])
+            for hotel_id in hotel_ids
+            if hotel_id in free_ids and hotel_id in hotels_by_id
+        ])
 
     except Exception as e:
         print("Erreur lors de l'exécution SQL :", str(e))
@@ -653,187 +465,9 @@ def filter_hotels():
     print("📌 Filtres reçus :", filters)  # Ajoute ce log pour voir ce qui arrive
 
     try:
-        filters = request.json
-        stars = filters.get('stars', [])
-        min_price = filters.get('min_price', None)  # Prix minimum
-        max_price = filters.get('max_price', None)  # Prix maximum
-        max_rooms = filters.get('max_rooms', None)
-        hotel_name = filters.get('hotel_name', None)
-        kitchenette = filters.get('kitchenette', None)
-        city_name = filters.get('city_name', None)  # Récupère le nom de la ville
-        parking = filters.get('parking', None)  # Récupération du filtre parking
-        restaurant = filters.get('restaurant', None)  # Récupération du filtre restaurant
-        piscine = filters.get('piscine', None)  # Récupération du filtre piscine
-        gym = filters.get('gym', None)
-        spa = filters.get('spa', None)
-        pets_allowed = filters.get('pets_allowed', None)
-        free_wifi = filters.get('free_wifi', None)
-        air_conditioning = filters.get('air_conditioning', None)
-        ev_charging = filters.get('ev_charging', None)
-        wheelchair_accessible = filters.get('wheelchair_accessible', None)
-        washing_machine = filters.get('washing_machine', None)
-        meal_plan = filters.get('meal_plan', [])
-        hotel_rating = filters.get('hotel_rating', [])
-
-        query = """
-        SELECT hotels.*, cities.name AS city 
-        FROM hotels
-        JOIN cities ON hotels.city_id = cities.id
-        """
-        params = []
-        conditions = []
-
-        if stars:
-            conditions.append(f"stars IN ({','.join(['?'] * len(stars))})")
-            params.extend(stars)
-
-        if min_price is not None:
-            conditions.append("price_per_night >= ?")
-            params.append(min_price)
-
-        if max_price is not None:
-            conditions.append("price_per_night <= ?")
-            params.append(max_price)
-
-        if max_rooms is not None:
-            conditions.append("rooms <= ?")
-            params.append(max_rooms)
-
-        if hotel_name:
-            conditions.append("hotels.name LIKE ?")
-            params.append(f"%{hotel_name}%")  # Recherche partielle
-
-        if kitchenette is not None:
-            conditions.append("hotels.kitchenette = ?")
-            params.append(kitchenette)
-
-        if city_name:
-            conditions.append("cities.name LIKE ?")  # Recherche partielle sur le nom de la ville
-            params.append(f"%{city_name}%")  
-        
-        if parking:  
-            conditions.append("hotels.parking = ?")
-            params.append(parking)
-
-        if restaurant:  
-            conditions.append("hotels.restaurant = ?")
-            params.append(restaurant)
-        
-        if piscine:  
-            conditions.append("hotels.piscine = ?")
-            params.append(piscine)
-        
-        if gym:  
-            conditions.append("hotels.gym = ?")
-            params.append(gym)
-
-        if spa:  
-            conditions.append("hotels.spa = ?")
-            params.append(spa)
-
-        if pets_allowed:  
-            conditions.append("hotels.pets_allowed = ?")
-            params.append(pets_allowed)
-        
-        if free_wifi:  
-            conditions.append("hotels.free_wifi = ?")
-            params.append(free_wifi)
-
-        if air_conditioning:  
-            conditions.append("hotels.air_conditioning = ?")
-            params.append(air_conditioning)
-
-        if ev_charging:  
-            conditions.append("hotels.ev_charging = ?")
-            params.append(ev_charging)
-        
-        if wheelchair_accessible:  
-            conditions.append("hotels.wheelchair_accessible = ?")
-            params.append(wheelchair_accessible)
-
-        if washing_machine:  
-            conditions.append("hotels.washing_machine = ?")
-            params.append(washing_machine)
-
-        if meal_plan:
-            conditions.append(f"hotels.meal_plan IN ({','.join(['?'] * len(meal_plan))})")
-            params.extend(meal_plan)
-
-        if hotel_rating:
-            try:
-                # ✅ Vérifier que hotel_rating est bien une liste et convertir en float
-                hotel_rating = [float(r) for r in hotel_rating if isinstance(r, (int, float, str)) and str(r).replace('.', '', 1).isdigit()]
-
-                if hotel_rating:
-                    # ✅ Filtrer les hôtels ayant une note supérieure ou égale à la plus basse note cochée
-                    conditions.append("hotels.hotel_rating >= ?")
-                    params.append(min(hotel_rating))
-            except ValueError:
-                print("⚠️ Erreur conversion hotel_rating :", hotel_rating)
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-
-        print("Requête SQL exécutée :", query)
-        print("Paramètres SQL :", params)
-        
-        with get_db_connection() as conn:
-            cursor = conn.execute(query, params)
-            hotels = cursor.fetchall()
-        
-        result = []
-        for hotel in hotels:
-            hotel_id = hotel["id"]
-
-            # ✅ Récupérer les avis pour chaque hôtel
-            cursor.execute("""
-            SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
-            FROM reviews r
-            JOIN user u ON r.user_id = u.id_user
-            WHERE r.hotel_id = ?
-            ORDER BY r.date_posted DESC
-            """, (hotel_id,))
-
-            reviews = [{
-                "first_name": review["first_name"],
-                "last_name": review["name"],
-                "rating": review["rating"],
-                "comment": review["comment"],
-                "date_posted": review["date_posted"]
-            } for review in cursor.fetchall()]
-
-            result.append({
-                "id": hotel["id"],
-                "name": hotel["name"],
-                "stars": hotel["stars"],
-                "price_per_night": hotel["price_per_night"],
-                "hotel_rating": hotel["hotel_rating"],
-                "city": hotel["city"],
-                "description":hotel["description"],
-                "address": hotel["address"] if hotel["address"] not in (None, "", "null") else "Adresse inconnue",
-                "latitude": hotel["latitude"],
-                "longitude": hotel["longitude"],
-                "image": f"/static/Image/{hotel['image_url']}" if hotel["image_url"] else "/static/Image/default.jpg",
-                "equipments": [
-                    equip for equip in [
-                        "Parking" if hotel["parking"] else None,
-                        "Restaurant" if hotel["restaurant"] else None,
-                        "Piscine" if hotel["piscine"] else None,
-                        "Animaux admis" if hotel["pets_allowed"] else None,
-                        "Salle de sport" if hotel["gym"] else None,
-                        "Spa" if hotel["spa"] else None,
-                        "Wi-Fi gratuit" if hotel["free_wifi"] else None,
-                        "Climatisation" if hotel["air_conditioning"] else None,
-                        "Borne recharge" if hotel["ev_charging"] else None,
-                        "Accès PMR" if hotel["wheelchair_accessible"] else None,
-                        "Machine à laver" if hotel["washing_machine"] else None,
-                        "Kitchenette" if hotel["kitchenette"] else None
-                    ] if equip is not None  # ✅ Supprime les valeurs None
-                ],
-                    "reviews": reviews  # ✅ Ajout des avis
-            })
-        
-        conn.close()
+        # ✅ Filtres appliqués en mémoire sur le catalogue (prix, équipements, notes, etc.)
+        conn = get_db_connection()
+        result = [hotel_to_dict(hotel) for hotel in catalog.filter_hotels(conn, filters)]
         return jsonify(result)
 
     except Exception as e:
@@ -841,49 +475,44 @@ def filter_hotels():
         return jsonify({'error': str(e)}), 500
 
 
-# 7.5. Récupération des avis d'un hôtel tries par note, date ou ordre alphabétique sur reservations.html
+# 7.5. Récupération des avis d'un hôtel tries par note ou par date sur reservations.html (pagination par curseur)
 @app.route('/get_reviews', methods=['GET'])
+@conditional("reviews")
 def get_reviews():
-    """Récupère les avis d'un hôtel donné, triés par date ou par note"""
-    hotel_id = request.args.get("hotel_id")
-    sort_by = request.args.get("sort_by", "date")  # Par défaut, trie par date
+    """Récupère une page d'avis d'un hôtel donné, triés par date ou par note"""
+    hotel_id = request.args.get("hotel_id", type=int)
+    sort_by = normalize_review_sort(request.args.get("sort_by", "date"))  # Par défaut, trie par date
+    limit = parse_limit(request.args.get("limit", 10))
 
     if not hotel_id:
         return jsonify({"error": "ID de l'hôtel manquant"}), 400
 
-    conn = get_db_connection()
-    conn.row_factory = sqlite3.Row  # ✅ Ajout de la row_factory ici
-    cursor = conn.cursor()
+    try:
+        position = decode_cursor(request.args.get("cursor"))
+        if position is not None and (position.get("sort") != sort_by or len(position["after"]) != 2):
+            raise InvalidCursor("Curseur invalide")
+        after = position["after"] if position else None
+    except (InvalidCursor, KeyError, TypeError):
+        return jsonify({"error": "Curseur invalide"}), 400
 
-    # ✅ Jointure entre reviews et user pour récupérer les noms
-    if sort_by == "note":
-        query = """
-        SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
-        FROM reviews r
-        JOIN user u ON r.user_id = u.id_user
-        WHERE r.hotel_id = ?
-        ORDER BY r.rating DESC
-        """
-    else:
-        query = """
-        SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
-        FROM reviews r
-        JOIN user u ON r.user_id = u.id_user
-        WHERE r.hotel_id = ?
-        ORDER BY r.date_posted DESC
-        """
+    conn = get_db_connection()
 
-    cursor.execute(query, (hotel_id,))
+    # ✅ Recherche dans l'index (hotel_id, date_posted DESC, id) ou (hotel_id, rating DESC, id)
+    rows, last_position = load_review_page(conn, hotel_id, sort_by, after, limit)
     reviews = [{
         "first_name": row["first_name"],
         "name": row["name"],
         "rating": row["rating"],
         "comment": row["comment"],
         "date_posted": row["date_posted"]
-    } for row in cursor.fetchall()]
-    
-    conn.close()
-    return jsonify(reviews)
+    } for row in rows]
+    total = load_review_stats(conn, [hotel_id])[hotel_id]["review_count"]
+
+    return jsonify({
+        "items": reviews,
+        "next_cursor": encode_cursor({"sort": sort_by, "after": last_position}) if last_position else None,
+        "total": total
+    })
 
 
 # 7.6. Récupération du nom d'un hôtel à partir de son ID sur paiement.html
@@ -897,7 +526,6 @@ def get_hotel_name():
     cursor = conn.cursor()
     cursor.execute("SELECT name FROM hotels WHERE id = ?", (hotel_id,))
     hotel = cursor.fetchone()
-    conn.close()
 
     if hotel:
         return jsonify({"name": hotel[0]})
@@ -912,82 +540,33 @@ def get_price_per_night(hotel_id):
     cursor = conn.cursor()
     cursor.execute("SELECT price_per_night FROM hotels WHERE id = ?", (hotel_id,))
     result = cursor.fetchone()
-    conn.close()
 
     if result:
         return jsonify({"price_per_night": result[0]})
     else:
         return jsonify({"error": "Hôtel non trouvé"}), 404
     
-# 7.8. Msie en place du chargement par pagination des hôtels
+# 7.8. Pagination par curseur des hôtels (keyset sur l'id) avec le total dans la même réponse
 @app.route("/api/hotels", methods=["GET"])
+@conditional("catalog")
 def get_hotels_paginated():
     try:
-        offset = int(request.args.get("offset", 0))
-        limit = int(request.args.get("limit", 10))
+        limit = parse_limit(request.args.get("limit", 10))
+        try:
+            position = decode_cursor(request.args.get("cursor"))
+            after_id = int(position["after"]) if position else None
+        except (InvalidCursor, KeyError, TypeError, ValueError):
+            return jsonify({"error": "Curseur invalide"}), 400
 
+        # ✅ Page découpée directement dans le catalogue en mémoire (recherche dichotomique sur l'id)
         conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT hotels.*, cities.name AS city
-            FROM hotels
-            JOIN cities ON hotels.city_id = cities.id
-            LIMIT ? OFFSET ?
-        """, (limit, offset))
-
-        hotels = []
-        for row in cursor.fetchall():
-            hotel_id = row["id"]
-
-            # ✅ Récupérer les avis pour chaque hôtel
-            cursor.execute("""
-                SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
-                FROM reviews r
-                JOIN user u ON r.user_id = u.id_user
-                WHERE r.hotel_id = ?
-                ORDER BY r.date_posted DESC
-            """, (hotel_id,))
-            reviews = [{
-                "first_name": review["first_name"],
-                "last_name": review["name"],
-                "rating": review["rating"],
-                "comment": review["comment"],
-                "date_posted": review["date_posted"]
-            } for review in cursor.fetchall()]
-
-            hotels.append({
-                "id": row["id"],
-                "name": row["name"],
-                "stars": row["stars"],
-                "price_per_night": row["price_per_night"],
-                "hotel_rating": row["hotel_rating"],
-                "city": row["city"],
-                "description": row["description"],
-                "address": row["address"] if row["address"] not in (None, "", "null") else "Adresse inconnue",
-                "latitude": row["latitude"],
-                "longitude": row["longitude"],
-                "image": f"/static/Image/{row['image_url']}" if row["image_url"] else "/static/Image/default.jpg",
-                "equipments": [
-                    equip for equip in [
-                        "Parking" if row["parking"] else None,
-                        "Restaurant" if row["restaurant"] else None,
-                        "Piscine" if row["piscine"] else None,
-                        "Animaux admis" if row["pets_allowed"] else None,
-                        "Salle de sport" if row["gym"] else None,
-                        "Spa" if row["spa"] else None,
-                        "Wi-Fi gratuit" if row["free_wifi"] else None,
-                        "Climatisation" if row["air_conditioning"] else None,
-                        "Borne recharge" if row["ev_charging"] else None,
-                        "Accès PMR" if row["wheelchair_accessible"] else None,
-                        "Machine à laver" if row["washing_machine"] else None,
-                        "Kitchenette" if row["kitchenette"] else None
-                    ] if equip is not None
-                ],
-                "reviews": reviews
-            })
+        page, last_id, total = catalog.page_after(conn, after_id, limit)
 
-        conn.close()
-        return jsonify(hotels)
+        return jsonify({
+            "items": [hotel_to_dict(hotel) for hotel in page],
+            "next_cursor": encode_cursor({"after": last_id}) if last_id is not None else None,
+            "total": total
+        })
 
     except Exception as e:
         print("❌ Erreur dans get_hotels_paginated :", e)
@@ -997,29 +576,135 @@ def get_hotels_paginated():
 @app.route("/api/hotels/count", methods=["GET"])
 def count_all_hotels():
     try:
+        # ✅ Compteur mis en cache par le catalogue (plus de COUNT(*) à chaque appel)
         conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM hotels")
-        total = cursor.fetchone()[0]
-        conn.close()
+        total = catalog.count(conn)
         return jsonify({"total": total})
     except Exception as e:
         print("❌ Erreur lors du comptage des hôtels :", e)
         return jsonify({"error": str(e)}), 500
 
 
+# 7.10. Recherche plein texte (nom, description, adresse, avis) combinable avec les filtres
+@app.route("/search/text", methods=["GET", "POST"])
+def search_hotels_text():
+    try:
+        params = request.get_json(silent=True)
+        if not params:
+            # GET : ?stars=4&stars=5 → ["4", "5"] (to_dict() ne garderait que "4")
+            params = request.args.to_dict()
+            params.update({key: request.args.getlist(key) for key in LIST_FILTERS if key in request.args})
+        text = params.get("q") or params.get("query") or ""
+        limit = parse_limit(params.get("limit", 20), default=20)
+        if not text.strip():
+            return jsonify([])
+
+        conn = get_db_connection()
+
+        # ✅ Filtres d'équipements / prix / étoiles appliqués sur le catalogue en mémoire
+        candidates = {hotel.id for hotel in catalog.filter_hotels(conn, params)}
+
+        # ✅ Disponibilité optionnelle sur [start_date, end_date)
+        if params.get("start_date") and params.get("end_date"):
+            try:
+                start_date = datetime.strptime(params["start_date"], "%Y-%m-%d").date()
+                end_date = datetime.strptime(params["end_date"], "%Y-%m-%d").date()
+            except ValueError:
+                return jsonify({"error": "Format de date invalide. Attendu: YYYY-MM-DD"}), 400
+            availability.ensure_loaded(conn)
+            candidates = set(availability.available_hotels(candidates, start_date, end_date))
+
+        matches = search_text(conn, text, limit, candidate_ids=candidates)
+        hotels_by_id = catalog.get(conn).hotels_by_id
+
+        results = []
+        for match in matches:
+            hotel = hotels_by_id.get(match["hotel_id"])
+            if hotel is None:
+                continue
+            result = hotel_to_dict(hotel)
+            result.update(score=match["score"], snippet=match["snippet"], review_snippet=match["review_snippet"])
+            results.append(result)
+        return jsonify(results)
+
+    except Exception as e:
+        print("❌ Erreur dans search_hotels_text :", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# 7.11. Hôtels dont la position est dans la zone affichée par la carte (south, west, north, east)
+@app.route("/api/hotels/in-bounds", methods=["GET"])
+def get_hotels_in_bounds():
+    try:
+        try:
+            south, west, north, east = parse_bounds(
+                request.args.get("south"), request.args.get("west"),
+                request.args.get("north"), request.args.get("east")
+            )
+        except InvalidBounds as e:
+            return jsonify({"error": str(e)}), 400
+        limit = parse_limit(request.args.get("limit", 500), default=500, maximum=2000)
+
+        conn = get_db_connection()
+
+        # ✅ Recherche dans l'index R*Tree, données du marqueur lues dans le catalogue en mémoire
+        # (limite appliquée dans SQLite : une zone très large ne sérialise pas tout le catalogue)
+        hotel_ids = hotel_ids_in_bounds(conn, south, west, north, east, limit)
+        hotels_by_id = catalog.get(conn).hotels_by_id
+
+        pins = [hotel_to_pin(hotels_by_id[hotel_id]) for hotel_id in hotel_ids if hotel_id in hotels_by_id]
+        return jsonify(pins)
+
+    except Exception as e:
+        print("❌ Erreur dans get_hotels_in_bounds :", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# 7.12. Regroupements de marqueurs (nombre d'hôtels + centre) pour un zoom et une zone de la carte
+@app.route("/api/hotels/clusters", methods=["GET"])
+def get_hotel_clusters():
+    try:
+        try:
+            south, west, north, east = parse_bounds(
+                request.args.get("south"), request.args.get("west"),
+                request.args.get("north"), request.args.get("east")
+            )
+            zoom = int(request.args.get("zoom"))
+        except InvalidBounds as e:
+            return jsonify({"error": str(e)}), 400
+        except (TypeError, ValueError):
+            return jsonify({"error": "Paramètre zoom requis (entier)"}), 400
+
+        # ✅ Cases précalculées pour chaque zoom : aucune requête SQL tant que le catalogue ne change pas
+        conn = get_db_connection()
+        clusters = map_clusters.get(conn).clusters(zoom, south, west, north, east)
+        hotels_by_id = catalog.get(conn).hotels_by_id
+
+        # Une case d'un seul hôtel est renvoyée avec les données de son marqueur
+        for cluster in clusters:
+            hotel_id = cluster.pop("hotel_id")
+            cluster["hotel"] = hotel_to_pin(hotels_by_id[hotel_id]) if hotel_id in hotels_by_id else None
+        return jsonify(clusters)
+
+    except Exception as e:
+        print("❌ Erreur dans get_hotel_clusters :", e)
+        return jsonify({"error": str(e)}), 500
+
+
 # =========================================
 # 8. 📦 Réservations & Stripe
 # =========================================
 
 # 8.1. Création d'un webhook Stripe  
+# Accusé de réception immédiat : signature vérifiée, événement enregistré une
+# seule fois (stripe_events), application par stripe_events en arrière-plan.
 @app.route("/stripe-webhook", methods=["POST"])
 def stripe_webhook():
     payload = request.data
     sig_header = request.headers.get('Stripe-Signature')
 
     try:
-        event = stripe.Webhook.construct_event(payload, sig_header, endpoint_secret)
+        event_id, event_type = parse_event(payload, sig_header, endpoint_secret)
     except ValueError as e:
         print("❌ Erreur payload webhook :", e)
         return "Invalid payload", 400
@@ -1027,104 +712,92 @@ def stripe_webhook():
         print("❌ Erreur signature webhook :", e)
         return "Invalid signature", 400
 
-    # 🎯 Paiement réussi
-    if event["type"] == "checkout.session.completed":
-        session = event["data"]["object"]
-        customer_id = session["customer"]
-        metadata = session.get("metadata", {})
-
-        print(f"✅ Paiement reçu pour customer_id : {customer_id}")
-        print("🧾 Metadata reçues :", metadata)
-
-        # ✅ Vérifie qu'on a bien les metadata attendues
-        if not metadata:
-            print("❌ Aucun metadata reçu dans la session Stripe.")
-            return jsonify({"error": "Metadata manquants dans le webhook Stripe"}), 400
-
+    if not stripe_events.receive(event_id, event_type, payload):
+        print(f"🔁 Événement Stripe déjà reçu : {event_id}")
+    return jsonify({'status': 'success'}), 200
+
+
+@stripe_events.prepare
+def prepare_stripe_events(conn):
+    availability.ensure_loaded(conn)  # Table d'occupation prête avant l'écriture
+    outbox.start()  # Table email_outbox prête, threads d'envoi lancés
+
+
+# 🎯 Paiement réussi : réservation, occupation et email de confirmation dans la
+# transaction qui marque l'événement traité (appliqué une seule fois)
+@stripe_events.handler("checkout.session.completed")
+def apply_checkout_completed(write_conn, session):
+    customer_id = session.get("customer")
+    metadata = session.get("metadata") or {}
+
+    print(f"✅ Paiement reçu pour customer_id : {customer_id}")
+    print("🧾 Metadata reçues :", metadata)
+
+    # ✅ Vérifie qu'on a bien les metadata attendues (sinon l'événement passe en 'failed')
+    if not metadata:
+        raise ValueError("Metadata manquants dans le webhook Stripe")
+
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    user_id_str = metadata.get("user_id", "")
+    user_id = int(user_id_str) if user_id_str.isdigit() else None
+
+    reservation_id = write_conn.execute("""
+        INSERT INTO reservations (
+            hotel_id, user_id, user_name, email, checkin, checkout, guests, adults, children, 
+            first_name, gender, phone, stripe_customer_id, status, created_at, total_price
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'paid', ?, ?)
+    """, (
+        metadata.get("hotel_id"),
+        user_id, 
+        metadata.get("user_name"),
+        metadata.get("email"),
+        metadata.get("checkin"),
+        metadata.get("checkout"),
+        metadata.get("guests"),
+        metadata.get("adults"),
+        metadata.get("children"),
+        metadata.get("first_name"),
+        metadata.get("gender"),
+        metadata.get("phone"),
+        customer_id,
+        now,
+        metadata.get("total_price")
+    )).lastrowid
+    # Dates illisibles : l'exception annule toute la transaction (réservation comprise), événement marqué 'failed'
+    record_stay(write_conn, metadata.get("hotel_id"), metadata.get("checkin"), metadata.get("checkout"))
+    print(f"💾 Réservation insérée en base (ID: {reservation_id})")
+
+    # Email : mis en file seulement si la réservation est validée
+    hotel = write_conn.execute("SELECT name FROM hotels WHERE id = ?", (metadata.get("hotel_id"),)).fetchone()
+    hotel_name = hotel[0] if hotel else "Votre hôtel"
+
+    rendered = email_renderer.render(
+        "confirmation.html",
+        first_name=metadata.get("first_name"),
+        hotel_name=hotel_name,
+        checkin=metadata.get("checkin"),
+        checkout=metadata.get("checkout"),
+        guests=metadata.get("guests"),
+        total_price=metadata.get("total_price")
+    )
+    print("📧 Mise en file du mail pour :", metadata.get("email"))
+    insert_email(
+        write_conn,
+        "🌟 Confirmation de votre réservation JustDreams",
+        [metadata.get("email")],
+        body=rendered.text,
+        html=rendered.html,
+        reply_to="support@justdreams06.com"  # 💌 Suggestion : adresse de réponse
+    )
+
+    def after_commit(conn):
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-
-            now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-
-            user_id_str = metadata.get("user_id", "")
-            
-            user_id = int(user_id_str) if user_id_str.isdigit() else None
-            print("👤 user_id reçu dans webhook :", user_id_str)
-
-            cursor.execute("""
-                INSERT INTO reservations (
-                    hotel_id, user_id, user_name, email, checkin, checkout, guests, adults, children, 
-                    first_name, gender, phone, stripe_customer_id, status, created_at, total_price
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'paid', ?, ?)
-            """, (
-                metadata.get("hotel_id"),
-                user_id, 
-                metadata.get("user_name"),
-                metadata.get("email"),
-                metadata.get("checkin"),
-                metadata.get("checkout"),
-                metadata.get("guests"),
-                metadata.get("adults"),
-                metadata.get("children"),
-                metadata.get("first_name"),
-                metadata.get("gender"),
-                metadata.get("phone"),
-                customer_id,
-                now,
-                metadata.get("total_price")
-            ))
-
-            conn.commit()
-            reservation_id = cursor.lastrowid
-            print(f"💾 Réservation insérée en base (ID: {reservation_id})")
-            print("📦 Détails de la réservation insérée :", metadata)
-
-            # Email
-            cursor.execute("SELECT name FROM hotels WHERE id = ?", (metadata.get("hotel_id"),))
-            hotel = cursor.fetchone()
-            hotel_name = hotel[0] if hotel else "Votre hôtel"
-            conn.close()
-
-            template_path = os.path.join(
-                os.path.dirname(__file__),
-                "..", "..", "Frontend", "templates", "email_templates", "confirmation.html"
-            )
-
-            with open(template_path, encoding="utf-8") as f:
-                html_template = f.read()
-
-            html_email = render_template_string(
-                html_template,
-                first_name=metadata.get("first_name"),
-                hotel_name=hotel_name,
-                checkin=metadata.get("checkin"),
-                checkout=metadata.get("checkout"),
-                guests=metadata.get("guests"),
-                total_price=metadata.get("total_price")
-            )
-
-            msg = Message(
-                "🌟 Confirmation de votre réservation JustDreams",
-                recipients=[metadata.get("email")],
-                html=html_email,
-                reply_to="support@justdreams06.com"  # 💌 Suggestion : adresse de réponse
-            )
+            availability.refresh_hotel(conn, metadata.get("hotel_id"))
+        except (TypeError, ValueError):
+            availability.invalidate()
+        outbox.notify()
 
-            print("📧 Envoi du mail à :", metadata.get("email"))
-            try:
-                mail.send(msg)
-                print("✅ Mail envoyé avec succès")
-            except Exception as e:
-                print("❌ Erreur lors de l’envoi du mail :", e)
-                traceback.print_exc()
-
-        except Exception as e:
-            print("❌ Erreur lors de l’insertion post-paiement :", e)
-            traceback.print_exc()
-        
-        return jsonify({'status': 'success'}), 200
-    return '', 200
+    return after_commit
  
 
 # 8.3. Crée une session de paiement Stripe
@@ -1155,37 +828,13 @@ def create_checkout_session():
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return jsonify({"error": "Hôtel introuvable"}), 404
 
-        cursor.execute("SELECT email, first_name, name, stripe_customer_id FROM user WHERE id_user = ?", (user_id,))
-        user_row = cursor.fetchone()
-
-        if not user_row:
-            conn.close()
+        # Client Stripe de l'utilisateur : cache en mémoire, sinon base, sinon création chez Stripe
+        customer_id = stripe_gateway.customer_for(conn, user_id)
+        if customer_id is None:
             return jsonify({"error": "Utilisateur introuvable"}), 404
-
-        email, first_name, name, stripe_customer_id = user_row
-
-        if stripe_customer_id:
-            customer_id = stripe_customer_id
-            print(f"✅ Client Stripe déjà existant : {customer_id}")
-        else:
-            print("➕ Création d’un nouveau client Stripe...")
-            customer = stripe.Customer.create(
-                email=email,
-                name=f"{first_name} {name}"
-            )
-            customer_id = customer.id
-            print(f"✅ Nouveau client Stripe créé : {customer_id}")
-
-            cursor.execute(
-                "UPDATE user SET stripe_customer_id = ? WHERE id_user = ?",
-                (customer_id, user_id)
-            )
-            conn.commit()
-
-        conn.close()
+        print(f"✅ Client Stripe : {customer_id}")
 
         # 🧾 Préparation des metadata
         metadata = {
@@ -1206,7 +855,7 @@ def create_checkout_session():
 
         print("🧾 Metadata envoyées à Stripe :", metadata)
 
-        checkout_session = stripe.checkout.Session.create(
+        checkout_session = stripe_gateway.create_checkout_session(
             payment_method_types=['card'],
             customer=customer_id,
             line_items=[{
@@ -1273,28 +922,27 @@ def cancel():
 # 10. 👤 Espace utilisateur
 # =========================================
 
+# Identité et rôle lus dans le jeton de session (g.session_user), sans requête sur user
+
 # 10.1. Récupération du rôle utilisateur
 @app.route("/api/user-role/<int:user_id>")
+@session_required
 def get_user_role(user_id):
-    with sqlite3.connect("hotels.db") as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT role FROM user WHERE id_user = ?", (user_id,))
-        row = cursor.fetchone()
-        if row:
-            return jsonify({"role": row[0]})
-        return jsonify({"role": "user"})
+    if g.session_user["id"] != user_id:
+        return jsonify({"error": "Action non autorisée"}), 403
+    return jsonify({"role": g.session_user["role"]})
 
 # 10.2. Récupération des réservations d'un utilisateur sur mesReservations.html
 @app.route("/api/mes-reservations/<int:user_id>")
+@session_required
 def get_user_reservations(user_id):
     print(f"🔎 Récupération des réservations pour user_id : {user_id}")
-    with sqlite3.connect("hotels.db") as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    is_admin = g.session_user["role"] == "admin"
+    if not is_admin and g.session_user["id"] != user_id:
+        return jsonify({"error": "Action non autorisée"}), 403
 
-        cursor.execute("SELECT role FROM user WHERE id_user = ?", (user_id,))
-        user_row = cursor.fetchone()
-        is_admin = user_row and user_row["role"] == "admin"
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
 
         if is_admin:
             cursor.execute("""
@@ -1317,12 +965,10 @@ def get_user_reservations(user_id):
 
         reservations = []
         for row in cursor.fetchall():
-            image_url = row["image_url"]
-            full_image_url = f"/static/Image/{image_url}" if image_url else "/static/Image/default.jpg"
             reservations.append({
                 "reservation_id": row["reservation_id"],
                 "hotel_name": row["hotel_name"],
-                "image_url": full_image_url,
+                "image_url": image_path(row["image_url"]),
                 "checkin": row["checkin"],
                 "checkout": row["checkout"],
                 "guests": row["guests"],
@@ -1337,21 +983,16 @@ def get_user_reservations(user_id):
 
 # 10.3. Annulation des réservations par l'utilisateur
 @app.route("/api/reservations/<int:reservation_id>", methods=["DELETE"])
+@session_required
 def cancel_reservation(reservation_id):
     try:
-        user_id = request.args.get("user_id", type=int)  # 🛡️ Récupère le user_id depuis l'URL (ex: ?user_id=2)
-        if not user_id:
-            return jsonify({"error": "Identifiant utilisateur requis"}), 400
+        # 🛡️ Utilisateur et rôle garantis par le jeton de session signé
+        user_id = g.session_user["id"]
+        is_admin = g.session_user["role"] == "admin"
 
-        with sqlite3.connect("hotels.db") as conn:
-            conn.row_factory = sqlite3.Row
+        with get_db_connection() as conn:
             cursor = conn.cursor()
 
-            # 🔍 Vérifie si l'utilisateur est admin
-            cursor.execute("SELECT role FROM user WHERE id_user = ?", (user_id,))
-            user = cursor.fetchone()
-            is_admin = user and user["role"] == "admin"
-
             # 🔍 Vérifie si la réservation existe et appartient bien à l’utilisateur
             cursor.execute("""
                 SELECT r.*, h.name AS hotel_name
@@ -1367,27 +1008,34 @@ def cancel_reservation(reservation_id):
             if not is_admin and reservation["user_id"] != user_id:
                 return jsonify({"error": "Action non autorisée"}), 403
 
-            # ✅ Annulation
+            # ✅ Annulation (via l'écrivain unique)
             now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute("""
-                UPDATE reservations
-                SET status = 'cancelled', cancelled_at = ?
-                WHERE id = ?
-            """, (now, reservation_id))
-            conn.commit()
+
+            def cancel(write_conn):
+                # Statut relu dans la transaction d'écriture : deux annulations simultanées
+                # ne libèrent les nuits qu'une seule fois
+                row = write_conn.execute("SELECT status FROM reservations WHERE id = ?", (reservation_id,)).fetchone()
+                if row is None or row["status"] == "cancelled":
+                    return
+                write_conn.execute("""
+                    UPDATE reservations
+                    SET status = 'cancelled', cancelled_at = ?
+                    WHERE id = ?
+                """, (now, reservation_id))
+
+                # 📆 Les nuits de la réservation annulée libèrent une chambre
+                if row["status"] in CONFIRMED_STATUSES:
+                    record_stay(write_conn, reservation["hotel_id"], reservation["checkin"], reservation["checkout"], delta=-1)
+
+            availability.ensure_loaded(conn)  # Table d'occupation prête avant l'écriture
+            run_write(cancel)
+            availability.refresh_hotel(conn, reservation["hotel_id"])
 
             first_name = reservation["first_name"] or "Client"
             email = reservation["email"] or "noreply@justdreams.fr"
 
-            template_path = os.path.join(
-                os.path.dirname(__file__),
-                "..", "..", "Frontend", "templates", "email_templates", "cancelConfirmation.html"
-            )
-            with open(template_path, encoding="utf-8") as f:
-                html_template = f.read()
-
-            html_email = render_template_string(
-                html_template,
+            rendered = email_renderer.render(
+                "cancelConfirmation.html",
                 first_name=first_name,
                 hotel_name=reservation["hotel_name"],
                 checkin=reservation["checkin"],
@@ -1397,16 +1045,16 @@ def cancel_reservation(reservation_id):
                 cancelled_at=now
             )
 
-            msg = Message(
-                subject="❌ Votre réservation JustDreams a été annulée",
-                recipients=[email],
-                html=html_email,
-                reply_to="support@justdreams06.com"
-            )
             try:
-                mail.send(msg)
+                queue_email(
+                    subject="❌ Votre réservation JustDreams a été annulée",
+                    recipients=[email],
+                    body=rendered.text,
+                    html=rendered.html,
+                    reply_to="support@justdreams06.com"
+                )
             except Exception as e:
-                print("❌ Erreur lors de l’envoi de l'email d'annulation :", e)
+                print("❌ Erreur lors de la mise en file de l'email d'annulation :", e)
 
             return jsonify({"message": "Réservation annulée"}), 200
 
@@ -1437,23 +1085,16 @@ def admin_clean_pending():
 # =========================================
 def clean_old_pending_reservations():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         time_limit = datetime.now(timezone.utc) - timedelta(hours=24)
         formatted_limit = time_limit.strftime("%Y-%m-%d %H:%M:%S")
 
         print(f"🧹 Suppression des réservations 'pending' avant : {formatted_limit}")
 
-        cursor.execute("""
+        deleted_rows = run_write(lambda write_conn: write_conn.execute("""
             DELETE FROM reservations 
             WHERE status = 'pending' AND created_at <= ?
-        """, (formatted_limit,))
-
-        conn.commit()
-        deleted_rows = cursor.rowcount
+        """, (formatted_limit,)).rowcount)
         print(f"✅ {deleted_rows} réservation(s) 'pending' supprimée(s)")
-        conn.close()
 
         return deleted_rows
 
@@ -1481,6 +1122,22 @@ def schedule_cleaning_task(interval_seconds=43200):
 # ============================
 # 🚀 Démarre le serveur Flask
 # ============================
+def warm_up_indexes():
+    """Applique les migrations, puis charge le catalogue, les index en mémoire et la disponibilité."""
+    with app.app_context():
+        conn = get_db_connection()
+        migrate(conn)  # Index et colonnes ajoutés depuis la création de hotels.db
+        autocomplete_index.get(conn)
+        map_clusters.get(conn)
+        availability.ensure_loaded(conn)
+    email_renderer.warm_up()  # Templates d'emails compilés une fois
+    outbox.start()  # Envoi des emails restés en file lors du dernier arrêt
+    stripe_events.start()  # Événements Stripe reçus mais pas encore appliqués
+    password_hasher.warm_up()  # Processus de hachage des mots de passe démarrés avant le premier login
+    print("🔥 Catalogue et index chargés en mémoire")
+
+
 if __name__ == '__main__':
+        warm_up_indexes()
         print("🚀 Flask démarre sur http://127.0.0.1:5003")
         app.run(host='0.0.0.0', port=5003, debug=True)
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+===============================================================
+🧾 FICHIER appSerialisation.py – Mise en forme JSON des hôtels
+===============================================================
+
+La transformation « hôtel → dictionnaire » (liste d'équipements en 12 lignes,
+adresse et image par défaut) était recopiée dans plusieurs routes avec des
+clés légèrement différentes.
+
+- Équipements : chaque hôtel porte un masque de bits `amenities` (un bit par
+  colonne d'équipement). Les libellés de chaque combinaison possible sont
+  calculés une seule fois dans une table de correspondance ; l'instantané du
+  catalogue y lit directement le tuple `equipments` de chaque hôtel.
+- Deux formats, pour tous les endpoints : hotel_to_dict (listings, recherche)
+  et hotel_to_pin (marqueurs de carte, hôtel par défaut).
+- Images : en plus de `image` (photo d'origine), les listings exposent
+  `image_srcset`, les variantes WebP / JPEG générées par appImages.
+- OrjsonProvider : fournisseur JSON de Flask basé sur orjson (jsonify
+  plusieurs fois plus rapide sur un gros catalogue). Sans orjson installé,
+  Flask garde son fournisseur standard.
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appSerialisation.py
+# =========================================
+
+# 1. 🏷️ Équipements (masque de bits + table des libellés)
+# 2. 🧩 Champs communs (adresse, image)
+# 3. 🏨 Formats JSON d'un hôtel
+# 4. ⚡ Fournisseur JSON orjson
+
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from appAvis import RATING_VALUES
+from appImages import variants
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle : pip install orjson
+    orjson = None
+
+# =========================================
+# 1. 🏷️ Équipements (masque de bits + table des libellés)
+# =========================================
+
+# Colonnes d'équipements et libellés affichés (dans l'ordre historique des listings) ;
+# la position dans ce tuple donne le bit de l'équipement dans le masque
+EQUIPMENT_LABELS = (
+    ("parking", "Parking"),
+    ("restaurant", "Restaurant"),
+    ("piscine", "Piscine"),
+    ("pets_allowed", "Animaux admis"),
+    ("gym", "Salle de sport"),
+    ("spa", "Spa"),
+    ("free_wifi", "Wi-Fi gratuit"),
+    ("air_conditioning", "Climatisation"),
+    ("ev_charging", "Borne recharge"),
+    ("wheelchair_accessible", "Accès PMR"),
+    ("washing_machine", "Machine à laver"),
+    ("kitchenette", "Kitchenette"),
+)
+EQUIPMENT_COLUMNS = tuple(column for column, _ in EQUIPMENT_LABELS)
+AMENITY_BITS = {column: 1 << position for position, column in enumerate(EQUIPMENT_COLUMNS)}
+
+# masque -> tuple des libellés (4096 combinaisons, calculées une fois au chargement)
+_LABELS_BY_MASK = tuple(
+    tuple(label for position, (_, label) in enumerate(EQUIPMENT_LABELS) if mask >> position & 1)
+    for mask in range(1 << len(EQUIPMENT_LABELS))
+)
+
+
+def amenity_mask(row):
+    """Masque de bits des équipements d'une ligne `hotels` (sqlite3.Row ou dictionnaire)."""
+    mask = 0
+    for column, bit in AMENITY_BITS.items():
+        if row[column]:
+            mask |= bit
+    return mask
+
+
+def amenity_labels(mask):
+    """Libellés des équipements du masque, dans l'ordre d'affichage (tuple partagé, à ne pas modifier)."""
+    return _LABELS_BY_MASK[mask]
+
+
+# =========================================
+# 2. 🧩 Champs communs (adresse, image)
+# =========================================
+IMAGE_BASE = "/static/Image/"
+DEFAULT_IMAGE = "default.jpg"
+
+
+def image_path(image_url, image_base=IMAGE_BASE):
+    return f"{image_base}{image_url or DEFAULT_IMAGE}"
+
+
+def image_srcset(image_url, image_base=IMAGE_BASE):
+    """Attributs srcset (WebP / JPEG) de l'image de l'hôtel, ou None si ses variantes n'ont pas été générées."""
+    return variants.srcset(image_url or DEFAULT_IMAGE, image_base)
+
+
+def display_address(address):
+    return address if address not in (None, "", "null") else "Adresse inconnue"
+
+
+# =========================================
+# 3. 🏨 Formats JSON d'un hôtel
+# =========================================
+def hotel_to_dict(hotel, image_base=IMAGE_BASE):
+    """Format des listings d'hôtels (/hotels, /api/hotels, /recherche, filtres, recherche texte)."""
+    return {
+        "id": hotel.id,
+        "name": hotel.name,
+        "stars": hotel.stars,
+        "price_per_night": hotel.price_per_night,
+        "hotel_rating": hotel.hotel_rating,
+        "city": hotel.city,
+        "country": hotel.country,
+        "available_from": hotel.available_from,
+        "available_to": hotel.available_to,
+        "description": hotel.description,
+        "address": display_address(hotel.address),
+        "latitude": hotel.latitude,
+        "longitude": hotel.longitude,
+        "image": image_path(hotel.image_url, image_base),
+        "image_srcset": image_srcset(hotel.image_url, image_base),
+        "equipments": list(hotel.equipments),
+        "reviews": [review._asdict() for review in hotel.reviews],
+        "review_count": hotel.review_count,
+        "average_rating": hotel.average_rating,
+        "rating_histogram": dict(zip((str(value) for value in RATING_VALUES), hotel.rating_histogram)),
+        "last_review_date": hotel.last_review_date
+    }
+
+
+def hotel_to_pin(hotel, image_base=IMAGE_BASE):
+    """Données d'un marqueur : position + champs transmis à la page de réservation au clic."""
+    return {
+        "id": hotel.id,
+        "name": hotel.name,
+        "latitude": hotel.latitude,
+        "longitude": hotel.longitude,
+        "stars": hotel.stars,
+        "rating": hotel.hotel_rating,
+        "price": hotel.price_per_night,
+        "address": display_address(hotel.address),
+        "description": hotel.description,
+        "image": image_path(hotel.image_url, image_base),
+        "equipments": list(hotel.equipments)
+    }
+
+
+# =========================================
+# 4. ⚡ Fournisseur JSON orjson
+# =========================================
+def _orjson_default(value):
+    """Types acceptés par le fournisseur standard de Flask mais pas nativement par orjson."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify / app.json via orjson : mêmes options (clés triées, clés non textuelles), sortie UTF-8."""
+
+    def _options(self, sort_keys):
+        options = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        sort_keys = kwargs.get("sort_keys", self.sort_keys)
+        return orjson.dumps(obj, default=_orjson_default, option=self._options(sort_keys)).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Octets produits directement par orjson (pas de passage par une chaîne Python)
+        body = orjson.dumps(obj, default=_orjson_default, option=self._options(self.sort_keys))
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Remplace le fournisseur JSON de l'application par OrjsonProvider si orjson est disponible."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    return app.json
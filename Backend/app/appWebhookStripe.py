@@ -0,0 +1,272 @@
+"""
+===============================================================
+💳 FICHIER appWebhookStripe.py – Événements Stripe (accusé rapide, application unique)
+===============================================================
+
+/stripe-webhook vérifiait la signature, insérait la réservation, cherchait le
+nom de l'hôtel, rendait le template et envoyait l'email avant de répondre.
+Stripe renvoie un événement quand la réponse tarde ; rien ne dédoublonnait
+par identifiant d'événement : un renvoi créait une deuxième réservation.
+
+- Réception : signature vérifiée, puis l'événement brut est enregistré dans
+  `stripe_events` (clé primaire = id de l'événement, INSERT OR IGNORE) et la
+  route répond 200 aussitôt. Un renvoi du même événement est ignoré.
+- Application : un thread (StripeEventProcessor) applique les événements en
+  attente. Chaque événement est traité dans UNE transaction de l'écrivain
+  unique : relecture du statut, écritures du gestionnaire (réservation,
+  occupation, email mis en file), puis statut 'processed'. Un événement déjà
+  appliqué n'est jamais rejoué, même après un arrêt brutal.
+- Échec : erreur SQLite temporaire (base verrouillée…) → nouvel essai
+  différé ; autre erreur (données invalides) ou MAX_EVENT_ATTEMPTS atteints →
+  statut 'failed' avec l'erreur (à corriger puis remettre en 'pending').
+- Type sans gestionnaire : statut 'ignored' (conservé pour audit).
+
+Gestionnaires : @stripe_events.handler("checkout.session.completed") sur une
+fonction (write_conn, objet) qui peut renvoyer une fonction after(conn) exécutée
+après validation (caches en mémoire, réveil de la file d'emails).
+"""
+
+# =========================================
+# 📚 SOMMAIRE DU FICHIER appWebhookStripe.py
+# =========================================
+
+# 1. 🔧 Réglages
+# 2. 🗄️ Table stripe_events (écritures exécutées par l'écrivain unique)
+# 3. 📥 Réception (signature + enregistrement)
+# 4. ⚙️ StripeEventProcessor (application unique en arrière-plan)
+# 5. 🌐 Processeur partagé de l'application
+
+import atexit
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import stripe
+from appConnexion import pool as connection_pool
+from appEcriture import writer as app_writer
+from appEmails import retry_delay
+
+# =========================================
+# 1. 🔧 Réglages
+# =========================================
+
+# Événements appliqués au plus par passage
+EVENT_BATCH = 20
+
+# Essais avant de passer un événement en 'failed' (erreurs SQLite temporaires)
+MAX_EVENT_ATTEMPTS = 5
+EVENT_BACKOFF_BASE = 2
+
+# Relecture de la table sans signal (nouveaux essais arrivés à échéance)
+POLL_INTERVAL = 5.0
+
+
+# =========================================
+# 2. 🗄️ Table stripe_events
+# =========================================
+def ensure_events_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stripe_events (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            received_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            processed_at TEXT
+        ) WITHOUT ROWID
+    """)
+    # Événements à appliquer : status = 'pending' AND next_attempt_at <= maintenant
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_stripe_events_due ON stripe_events(status, next_attempt_at)")
+
+
+def record_event(conn, event_id, event_type, payload):
+    """INSERT OR IGNORE de l'événement brut ; renvoie True s'il est nouveau, False pour un renvoi."""
+    return conn.execute("""
+        INSERT OR IGNORE INTO stripe_events (id, type, payload, next_attempt_at)
+        VALUES (?, ?, ?, ?)
+    """, (event_id, event_type, payload, time.time())).rowcount == 1
+
+
+def due_events(conn, now, limit):
+    return conn.execute("""
+        SELECT id, type, attempts FROM stripe_events
+        WHERE status = 'pending' AND next_attempt_at <= ?
+        ORDER BY next_attempt_at, received_at
+        LIMIT ?
+    """, (now, limit)).fetchall()
+
+
+def apply_event(conn, event_id, handler):
+    """
+    Applique l'événement s'il est encore en attente et le marque traité, dans
+    la même transaction. Renvoie la fonction after(conn) du gestionnaire (ou None).
+    """
+    row = conn.execute("SELECT status, payload FROM stripe_events WHERE id = ?", (event_id,)).fetchone()
+    if row is None or row["status"] != "pending":
+        return None  # Déjà appliqué (ou abandonné) : jamais rejoué
+
+    after = None
+    status = "ignored"
+    if handler is not None:
+        event = json.loads(row["payload"])
+        after = handler(conn, event["data"]["object"])
+        status = "processed"
+    conn.execute("""
+        UPDATE stripe_events
+        SET status = ?, attempts = attempts + 1, last_error = NULL, processed_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """, (status, event_id))
+    return after
+
+
+def mark_event_failed(conn, event_id, error, retry_at):
+    """Échec : nouvel essai à `retry_at`, ou 'failed' si `retry_at` vaut None."""
+    conn.execute("""
+        UPDATE stripe_events
+        SET status = ?, attempts = attempts + 1, last_error = ?, next_attempt_at = COALESCE(?, next_attempt_at)
+        WHERE id = ? AND status = 'pending'
+    """, ("failed" if retry_at is None else "pending", error, retry_at, event_id))
+
+
+# =========================================
+# 3. 📥 Réception (signature + enregistrement)
+# =========================================
+def parse_event(payload, sig_header, secret):
+    """
+    Vérifie la signature Stripe et renvoie (id, type) de l'événement.
+    Lève ValueError (corps invalide) ou stripe.error.SignatureVerificationError.
+    """
+    event = stripe.Webhook.construct_event(payload, sig_header, secret)
+    # Identifiant fourni par Stripe ; à défaut, empreinte du corps (même corps → même événement)
+    event_id = (event["id"] if "id" in event else None) or "sha256:" + hashlib.sha256(payload).hexdigest()
+    return event_id, event["type"]
+
+
+# =========================================
+# 4. ⚙️ StripeEventProcessor
+# =========================================
+class StripeEventProcessor:
+    def __init__(self, writer=app_writer, connections=connection_pool, max_attempts=MAX_EVENT_ATTEMPTS,
+                 backoff_base=EVENT_BACKOFF_BASE, poll_interval=POLL_INTERVAL):
+        self.writer = writer
+        self.connections = connections  # Pool fournissant la connexion de lecture des fonctions prepare / after
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.poll_interval = poll_interval
+        self._handlers = {}
+        self._prepare = []
+        self._table_ready = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._signal = 0
+        self._stopping = False
+
+    # ---------- Enregistrement des gestionnaires ----------
+    def handler(self, event_type):
+        """Décorateur : fonction (write_conn, objet de l'événement) appliquant un type d'événement."""
+        def register(fn):
+            self._handlers[event_type] = fn
+            return fn
+        return register
+
+    def prepare(self, fn):
+        """Décorateur : fonction (conn) appelée avant chaque lot (tables et caches prêts avant l'écriture)."""
+        self._prepare.append(fn)
+        return fn
+
+    # ---------- Cycle de vie ----------
+    def _ensure_table(self):
+        if not self._table_ready:
+            self.writer.execute(ensure_events_table)
+            self._table_ready = True
+
+    def start(self):
+        """Démarre le thread d'application (au premier appel seulement) ; il reprend les événements en attente."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._ensure_table()
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="stripe-events", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        if thread is not None:
+            thread.join()
+
+    # ---------- Réception ----------
+    def receive(self, event_id, event_type, payload):
+        """Enregistre l'événement (une seule fois par id) et réveille le thread ; renvoie False pour un renvoi."""
+        self._ensure_table()
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8")
+        created = self.writer.execute(record_event, event_id, event_type, payload)
+        self.start()
+        with self._wakeup:
+            self._signal += 1
+            self._wakeup.notify()
+        return created
+
+    # ---------- Application ----------
+    def _run(self):
+        while not self._stopping:
+            seen = self._signal
+            try:
+                applied = self.process_due()
+            except Exception as e:
+                print("❌ Événements Stripe :", e)
+                applied = 0
+            if applied:
+                continue
+            with self._wakeup:
+                if self._signal == seen and not self._stopping:
+                    self._wakeup.wait(self.poll_interval)
+
+    def process_due(self):
+        """Applique les événements à échéance ; renvoie leur nombre."""
+        rows = self.writer.execute(due_events, time.time(), EVENT_BATCH)
+        if not rows:
+            return 0
+        conn = self.connections.acquire()
+        try:
+            for prepare in self._prepare:
+                prepare(conn)
+            for row in rows:
+                self._apply(conn, row)
+        finally:
+            self.connections.release(conn)
+        return len(rows)
+
+    def _apply(self, conn, row):
+        try:
+            after = self.writer.execute(apply_event, row["id"], self._handlers.get(row["type"]))
+        except Exception as e:
+            attempts = row["attempts"] + 1
+            retry_at = None
+            if isinstance(e, sqlite3.OperationalError) and attempts < self.max_attempts:
+                retry_at = time.time() + retry_delay(attempts, self.backoff_base)
+            print(f"❌ Événement Stripe {row['id']} non appliqué (essai {attempts}) :", e)
+            self.writer.execute(mark_event_failed, row["id"], f"{type(e).__name__}: {e}", retry_at)
+            return
+        if after is not None:
+            try:
+                after(conn)
+            except Exception as e:
+                print(f"⚠️ Suite de l'événement Stripe {row['id']} :", e)
+
+
+# =========================================
+# 5. 🌐 Processeur partagé de l'application
+# =========================================
+stripe_events = StripeEventProcessor()
+atexit.register(stripe_events.close)  # Avant writer.close (ordre inverse d'enregistrement)
@@ -1,13 +1,17 @@
 # FONCTION PERMETTANT D'AJOUTER DES AVIS FACTICES DANS LA BASE DE DONNEES HOTELS.DB
 
-import sqlite3
+import os
+import sys
 import random
 from datetime import datetime, timedelta
 
+# Accès aux modules de Backend/app (connexion configurée à hotels.db)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from appConnexion import open_connection
+
 def ajouter_avis_fictifs():
     # Connexion unique à la base de données
-    conn = sqlite3.connect('hotels.db')
-    conn.row_factory = sqlite3.Row
+    conn = open_connection()
     cursor = conn.cursor()
 
     # Récupérer tous les utilisateurs
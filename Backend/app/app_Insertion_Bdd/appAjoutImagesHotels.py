@@ -1,15 +1,19 @@
 # FONCTION PERMETTANT D'AJOUTER DES IMAGES POUR CHAQUE HOTELS DANS LA BASE DE DONNEES HOTELS.DB
 # LES IMAGES SERONT AJOUTEES ALEATORIEMENT DANS LA TABLE HOTELS COLONNE IMAGE_URL
 
-import sqlite3
+import os
+import sys
 import random
 
+# Accès aux modules de Backend/app (connexion configurée à hotels.db)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from appConnexion import open_connection
+
 def assign_hotel_images():
     images = ["hotel1.jpg", "hotel2.jpg", "hotel3.jpg", "hotel4.jpg", "hotel5.jpg",
               "hotel6.jpg", "hotel7.jpg", "hotel8.jpg", "hotel9.jpg", "hotel10.jpg"]
 
-    conn = sqlite3.connect("hotels.db")
-    conn.row_factory = sqlite3.Row
+    conn = open_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT id FROM hotels")
@@ -1,11 +1,17 @@
-import sqlite3
+import os
+import sys
 import random
 import uuid
 from datetime import datetime, timedelta
 
+# Accès aux modules de Backend/app (connexion, occupation des hôtels, version du catalogue)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from appConnexion import open_connection
+from appCatalogue import bump_catalog_version
+from appDisponibilite import rebuild_occupancy
+
 def ajouter_reservations_fictives(nombre=500):
-    db_path = "hotels.db"
-    conn = sqlite3.connect(db_path)
+    conn = open_connection()
     cursor = conn.cursor()
 
     cursor.execute("PRAGMA foreign_keys = ON;")
@@ -69,6 +75,11 @@ def ajouter_reservations_fictives(nombre=500):
     """, reservations_to_insert)
 
     conn.commit()
+
+    # 📆 Recalcul de l'occupation par nuit et signal au serveur pour recharger ses index
+    rebuild_occupancy(conn)
+    conn.commit()
+    bump_catalog_version(conn)
     conn.close()
 
     print(f"✅ {nombre} réservations factices ont été ajoutées avec succès.")
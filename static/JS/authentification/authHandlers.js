@@ -91,6 +91,7 @@ export async function submitLogin(event) {
         if (response.ok) {
             const userData = await response.json();
             alert('Connexion réussie !');
+            localStorage.setItem("session_token", userData.token); // 🎫 Jeton signé envoyé aux routes de l'espace utilisateur
 
             // ✅ Affichage des infos utilisateur
             if (userData.first_name && userData.name) {
@@ -180,6 +181,7 @@ export async function submitRegister(event) {
         if (response.ok) {
             const userData = await response.json();
             alert('Inscription réussie ! Un e-mail de bienvenue a été envoyé à ' + formData.email);
+            localStorage.setItem("session_token", userData.token);
 
             // ✅ Affichage des infos utilisateur
             if (userData.first_name && userData.name) {
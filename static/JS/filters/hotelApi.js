@@ -46,15 +46,16 @@ export async function fetchAllHotelsAPI() {
     return response.json();
 }
 
-// 📡 API : Récupère les hôtels selon filtres spécifiques (pagination)
-export async function fetchHotelsPaginated(offset = 0, limit = 10) {
+// 📡 API : Récupère une page d'hôtels ({ items, next_cursor, total }) à partir d'un curseur
+export async function fetchHotelsPaginated(cursor = null, limit = 10) {
     try {
-        const response = await fetch(`/api/hotels?offset=${offset}&limit=${limit}`);
+        const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+        const response = await fetch(`/api/hotels?limit=${limit}${cursorParam}`);
         if (!response.ok) throw new Error("Erreur lors du chargement des hôtels paginés");
         return await response.json();
     } catch (error) {
         console.error("❌ Erreur fetchHotelsPaginated:", error);
-        return [];
+        return { items: [], next_cursor: null, total: 0 };
     }
 }
 
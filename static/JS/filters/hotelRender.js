@@ -28,6 +28,12 @@
 // - Plus sécurisé : ne passe plus les avis en URL,
 // - Compatible avec tous les filtres (spécifiques ou globaux).
 //
+// 🖼️ Images :
+// - `hotelImageHtml(hotel)` : <picture> avec les variantes WebP / JPEG
+//   (`hotel.image_srcset`, générées par appImages.py) ; le navigateur
+//   télécharge la plus petite largeur suffisante pour la vignette.
+//   Sans variantes, retombe sur l'image d'origine (`hotel.image`).
+//
 // 📦 Utilisé dans :
 // - `hotel.js`, après un appel API pour afficher les résultats.
 //
@@ -40,6 +46,25 @@ let hotelRenderIndex = 0;
 const HOTELS_PER_PAGE = 10;
 let isFilterMode = false; // ← mode filtrage actif
 
+// Largeur affichée de la vignette (colonne image de la carte)
+const HOTEL_IMAGE_SIZES = "(max-width: 768px) 100vw, 33vw";
+
+function hotelImageHtml(hotel) {
+    const src = hotel.image || "/static/Image/default.jpg";
+    const style = 'class="img-fluid rounded mb-2" style="max-height: 200px; width: 100%; object-fit: cover;"';
+    const variants = hotel.image_srcset;
+    if (!variants) {
+        return `<img src="${src}" loading="lazy" ${style}>`;
+    }
+    return `
+                <picture>
+                    <source type="image/webp" srcset="${variants.webp}" sizes="${HOTEL_IMAGE_SIZES}">
+                    <img src="${src}" srcset="${variants.jpeg}" sizes="${HOTEL_IMAGE_SIZES}"
+                         width="${variants.width}" height="${variants.height}" loading="lazy" decoding="async"
+                         ${style}>
+                </picture>`;
+}
+
 export function resetHotelCache(hotels) {
     isFilterMode = true;
     hotelCache = hotels;
@@ -119,9 +144,7 @@ export function renderHotelsWithReviews(hotels, isFiltered = false) {
                 <p><strong>Équipements :</strong> ${hotel.equipments?.join(", ") || "Aucun équipement"}</p>
             </div>
             <div class="hotel-img-container">
-                <img src="${hotel.image || "/static/Image/default.jpg"}" 
-                     class="img-fluid rounded mb-2" 
-                     style="max-height: 200px; width: 100%; object-fit: cover;">
+                ${hotelImageHtml(hotel)}
             </div>
             <div class="hotel-action">
                 <a href="${reservationLink}" class="reserve-button">Réserver</a>
@@ -191,9 +214,7 @@ export function renderAllFilteredHotels(hotels) {
                 <p><strong>Équipements :</strong> ${hotel.equipments?.join(", ") || "Aucun équipement"}</p>
             </div>
             <div class="hotel-img-container">
-                <img src="${hotel.image || "/static/Image/default.jpg"}" 
-                     class="img-fluid rounded mb-2" 
-                     style="max-height: 200px; width: 100%; object-fit: cover;">
+                ${hotelImageHtml(hotel)}
             </div>
             <div class="hotel-action">
                 <a href="${reservationLink}" class="reserve-button">Réserver</a>
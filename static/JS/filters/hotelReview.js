@@ -11,7 +11,7 @@
 // 🔧 Fonctionnalité :
 // - `fetchHotelReviews(hotelId)`
 //   → Envoie une requête GET vers `/get_reviews?hotel_id=...&sort_by=date`
-//   → Tente de parser la réponse JSON
+//   → Tente de parser la réponse JSON (page `{items, next_cursor, total}`)
 //   → Retourne la liste des avis sous forme **de chaîne JSON**
 //     (utile auparavant pour l’insérer dans l’URL)
 //
@@ -33,8 +33,8 @@ export async function fetchHotelReviews(hotelId, sortBy = "date") {
         const response = await fetch(`/get_reviews?hotel_id=${hotelId}&sort_by=${sortBy}`);
         if (!response.ok) throw new Error(`Erreur API : ${response.statusText}`);
 
-        const reviews = await response.json();
-        return reviews;  // ✅ Retourne un tableau JS directement
+        const page = await response.json();
+        return page.items;  // ✅ Retourne le tableau d'avis de la 1re page ({items, next_cursor, total})
     } catch (error) {
         console.error("❌ Erreur lors du chargement des avis :", error);
         return [];  // ✅ Fallback sécurisé
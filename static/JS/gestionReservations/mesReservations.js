@@ -31,9 +31,24 @@
 // - Interaction fluide sans rechargement serveur
 // - Code simple à maintenir
 //
-// ⚠️ Nécessite que l’utilisateur soit connecté (`user_id` dans localStorage)
+// ⚠️ Nécessite que l’utilisateur soit connecté (`user_id` et `session_token` dans localStorage)
+//   → le jeton est envoyé dans l’en-tête `Authorization` ; réponse 401 = session expirée
 // =============================================================
 
+// 🎫 En-tête d'authentification (jeton délivré par /login)
+function authHeaders() {
+    return { "Authorization": `Bearer ${localStorage.getItem("session_token") || ""}` };
+}
+
+// 🔒 Session expirée ou absente : reconnexion nécessaire
+function sessionExpired(response) {
+    if (response.status !== 401) return false;
+    alert("Votre session a expiré, veuillez vous reconnecter.");
+    localStorage.clear();
+    window.location.href = "/";
+    return true;
+}
+
 document.addEventListener("DOMContentLoaded", async () => {
     const showCancelledCheckbox = document.getElementById("show-cancelled");
     const backBtn = document.getElementById("back-home");
@@ -80,14 +95,16 @@ document.addEventListener("DOMContentLoaded", async () => {
 
         let isAdmin = false;
         try {
-            const roleRes = await fetch(`/api/user-role/${userId}`);
+            const roleRes = await fetch(`/api/user-role/${userId}`, { headers: authHeaders() });
+            if (sessionExpired(roleRes)) return;
             const roleData = await roleRes.json();
             isAdmin = roleData.role === "admin";
         } catch (err) {
             console.error("Erreur récupération du rôle :", err);
         }
 
-        const response = await fetch(`/api/mes-reservations/${userId}`);
+        const response = await fetch(`/api/mes-reservations/${userId}`, { headers: authHeaders() });
+        if (sessionExpired(response)) return;
         const reservations = await response.json();
 
         // Affiche la barre de recherche uniquement si admin
@@ -170,9 +187,11 @@ document.addEventListener("DOMContentLoaded", async () => {
 
 async function cancelReservation(reservationId, userId) {
     if (confirm("❌ Voulez-vous vraiment annuler cette réservation ?")) {
-        const res = await fetch(`/api/reservations/${reservationId}?user_id=${userId}`, {
-            method: "DELETE"
+        const res = await fetch(`/api/reservations/${reservationId}`, {
+            method: "DELETE",
+            headers: authHeaders()
         });
+        if (sessionExpired(res)) return;
         if (res.ok) {
             alert("Réservation annulée !");
             location.reload();
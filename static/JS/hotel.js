@@ -126,8 +126,7 @@ document.getElementById("search-form").addEventListener("submit", function (even
     .then(async hotels => {
         renderAllFilteredHotels(hotels);  // ⬅️ Important pour tout afficher d’un coup
         try {
-            const response = await fetch("/api/hotels/count");
-            const total = (await response.json()).total;
+            const total = await getTotalHotels();
             updateDisplayedHotelCount(hotels.length, total, true);
         } catch (e) {
         }
@@ -169,8 +168,7 @@ async function fetchFilteredHotelsFromURL() {
         renderAllFilteredHotels(hotels);
     
         try {
-            const response = await fetch("/api/hotels/count");
-            const total = (await response.json()).total;
+            const total = await getTotalHotels();
             updateDisplayedHotelCount(hotels.length, total, true);
         } catch (e) {
             console.error("❌ Erreur récupération total dans fetchFilteredHotelsFromURL :", e);
@@ -200,8 +198,7 @@ async function applyFilters() {
     await fetchHotels(filters, async (hotels) => {
         renderAllFilteredHotels(hotels);
         try {
-            const response = await fetch("/api/hotels/count");
-            const total = (await response.json()).total;
+            const total = await getTotalHotels();
             updateDisplayedHotelCount(hotels.length, total, true);
         } catch (e) {
             console.error("❌ Erreur récupération total après filtres :", e);
@@ -228,7 +225,8 @@ function resetFilters() {
     isFiltering = false;
     isFilterProcessing = false;
     isGlobalSearchActive = false;
-    offset = 0;
+    nextCursor = null;
+    displayedCount = 0;
 
     clearHotelFilterMode(); // ⬅️ remet le mode normal (chargement via API)
 
@@ -249,12 +247,7 @@ function resetFilters() {
     const countDisplay = document.getElementById("hotel-count");
     if (countDisplay) countDisplay.textContent = "";
 
-    loadMoreHotels(); // ✅ recharge à partir de offset=0 avec limit=10
-
-    fetch("/api/hotels/count")
-        .then(res => res.json())
-        .then(data => updateDisplayedHotelCount(10, data.total)) // ← on affiche 10/106
-        .catch(err => console.error("❌ Erreur mise à jour compteur après reset :", err));
+    loadMoreHotels(); // ✅ recharge la première page (le total arrive avec la page)
 }
 
 function updateHotelCountDisplay(count) {
@@ -277,10 +270,21 @@ function updateDisplayedHotelCount(displayed, total, isFilter = false) {
 // ============================
 // 8. 🚀 Initialisation DOM
 // ============================
-let offset = 0;
+let nextCursor = null;     // Curseur opaque renvoyé par /api/hotels pour la page suivante
+let displayedCount = 0;
+let totalHotels = null;    // Total renvoyé avec chaque page (évite les appels à /api/hotels/count)
 const limit = 10;
 let isLoading = false;
 
+// Total des hôtels : valeur déjà reçue avec une page, sinon un seul appel au compteur
+async function getTotalHotels() {
+    if (totalHotels === null) {
+        const response = await fetch("/api/hotels/count");
+        totalHotels = (await response.json()).total;
+    }
+    return totalHotels;
+}
+
 async function loadMoreHotels() {
     if (isLoading) return;
     isLoading = true;
@@ -292,23 +296,21 @@ async function loadMoreHotels() {
     }
 
     try {
-        const response = await fetch(`/api/hotels?offset=${offset}&limit=${limit}`);
-        const hotels = await response.json();
+        const cursorParam = nextCursor ? `&cursor=${encodeURIComponent(nextCursor)}` : "";
+        const response = await fetch(`/api/hotels?limit=${limit}${cursorParam}`);
+        const page = await response.json();
+        const hotels = page.items || [];
+        totalHotels = page.total;
 
         if (hotels.length > 0) {
             renderHotelsWithReviews(hotels, false);
-            document.getElementById("load-more-btn").style.display = "block";
-            offset += hotels.length;
+            displayedCount += hotels.length;
+            nextCursor = page.next_cursor;
 
-            // Appel pour récupérer le nombre total d’hôtels
-            const countResponse = await fetch("/api/hotels/count");
-            const countData = await countResponse.json();
-            const total = countData.total;
-
-            updateDisplayedHotelCount(offset, total);
-        } else {
-            document.getElementById("load-more-btn").style.display = "none";
+            updateDisplayedHotelCount(displayedCount, totalHotels);
         }
+        // ✅ Plus de bouton quand le serveur n'envoie pas de curseur suivant
+        document.getElementById("load-more-btn").style.display = page.next_cursor ? "block" : "none";
     } catch (error) {
         console.error("❌ Erreur lors du chargement paginé :", error);
     } finally {
@@ -320,24 +322,11 @@ async function loadMoreHotels() {
 document.addEventListener("DOMContentLoaded", () => {
     checkLoginOnLoad();
 
-    function displayTotalHotelCount() {
-        fetch("/api/hotels/count")
-            .then(res => res.json())
-            .then(data => {
-                const countDisplay = document.getElementById("hotel-count");
-                if (countDisplay) {
-                    countDisplay.textContent = `${data.total} hôtels trouvés`;
-                }
-            })
-            .catch(err => console.error("❌ Erreur comptage total hôtels :", err));
-    }
-
     const filters = getURLParams();
     if (filters.destination || filters.start_date) {
         fetchFilteredHotelsFromURL();
     } else {
-        displayTotalHotelCount();
-        loadMoreHotels(); // ✅ Appel unique pour lazy loading
+        loadMoreHotels(); // ✅ Appel unique pour lazy loading (le total arrive avec la page)
     }
 
     document.getElementById("load-more-btn").addEventListener("click", loadMoreHotels);
@@ -49,7 +49,7 @@ JS/
 import { getParamsAndReviews } from './reservations/urlUtils.js';
 import { initReservations } from './reservations/reservationInit.js';
 import { displayReviews } from './reservations/reviewManager.js';
-import { setupReviewSorting } from './reservations/reservationReview.js';
+import { setupPagedReviews } from './reservations/reservationReview.js';
 import { loadReviews } from './reservations/reviewLoader.js';
 import {
     createMap,
@@ -134,12 +134,10 @@ document.addEventListener("DOMContentLoaded", async () => {
     // 2.2 ✉️ Validation email / téléphone
     validateEmailPhoneFields();
 
-    // 2.3 📝 Avis (API) triés par note
+    // 2.3 📝 Avis (API) triés par note, chargés page par page
     const hotelId = params.get("hotel_id");
     if (hotelId) {
-        const apiReviews = await loadReviews(hotelId, "rating");
-        displayReviews(apiReviews);
-        setupReviewSorting(apiReviews);
+        await setupPagedReviews(hotelId, "note");
     }
 
     // 2.4 🏨 Hôtel + Carte
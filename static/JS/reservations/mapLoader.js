@@ -1,20 +1,22 @@
 // =============================================================
 // 📁 mapLoader.js
 // -------------------------------------------------------------
-// Ce fichier gère le chargement dynamique de tous les hôtels
-// depuis l'API `/hotels` et leur affichage sur la carte à l’aide
+// Ce fichier gère le chargement des hôtels visibles sur la carte
+// depuis l'API `/api/hotels/clusters` et leur affichage à l’aide
 // de la fonction `addHotelMarker()` provenant de `reservationMap.js`.
 //
 // 🎯 Objectif :
-// Afficher automatiquement tous les hôtels disponibles sur la carte
-// avec une animation progressive pour éviter une surcharge visuelle,
-// et connecter chaque marqueur à deux fonctions externes :
-// `updateHotelInfo` (mise à jour des infos) et `loadReviews` (chargement des avis).
+// N'afficher que la zone visible de la carte, avec des hôtels regroupés
+// côté serveur selon le niveau de zoom (une bulle avec le nombre d'hôtels),
+// recharger la zone après chaque déplacement / zoom, et connecter chaque
+// marqueur à deux fonctions externes : `updateHotelInfo` (mise à jour des
+// infos) et `loadReviews` (chargement des avis).
 //
 // 🔧 Fonctionnalités :
-// - Requête `fetch` vers l’API `/hotels`.
-// - Filtrage des hôtels valides (avec latitude/longitude).
-// - Ajout progressif des marqueurs avec `setTimeout` pour fluidifier le rendu.
+// - Requête `fetch` vers `/api/hotels/clusters?zoom=&south=&west=&north=&east=`.
+// - Un hôtel seul dans sa case → marqueur classique, plusieurs → bulle cliquable (zoom).
+// - Rechargement après l'événement `moveend` (avec un court délai).
+// - Les réponses arrivées après un nouveau déplacement sont ignorées.
 // - Affichage de logs utiles et gestion des erreurs en console.
 //
 // 🧩 Dépendance :
@@ -29,31 +31,95 @@
 import { addHotelMarker } from './reservationMap.js';
 import { getParamsAndReviews } from './urlUtils.js';
 
+const MOVE_DEBOUNCE_MS = 250;
+const CLUSTER_ZOOM_STEP = 2;
+let markersLayer = null;
+let moveTimer = null;
+let lastRequestId = 0;
+
 /**
- * Charge dynamiquement tous les hôtels depuis l'API et les affiche sur la carte.
- * @param {Function} updateHotelInfo - Fonction à appeler au clic sur un marqueur.
- * @param {Function} loadReviews - Fonction à appeler pour charger les avis.
+ * Construit l'URL de l'API pour la zone et le zoom actuellement affichés.
+ * @param {L.Map} map - Carte Leaflet.
  */
-export function initReservationMap(updateHotelInfo, loadReviews) {
-    const { params } = getParamsAndReviews();
-    const currentHotelId = params.get("hotel_id");
+function buildClustersUrl(map) {
+    const bounds = map.getBounds();
+    const params = new URLSearchParams({
+        zoom: map.getZoom(),
+        south: Math.max(bounds.getSouth(), -90),
+        west: L.Util.wrapNum(bounds.getWest(), [-180, 180], true),
+        north: Math.min(bounds.getNorth(), 90),
+        east: L.Util.wrapNum(bounds.getEast(), [-180, 180], true)
+    });
+    // Zone plus large que le globe : toutes les longitudes
+    if (bounds.getEast() - bounds.getWest() >= 360) {
+        params.set("west", -180);
+        params.set("east", 180);
+    }
+    return `/api/hotels/clusters?${params.toString()}`;
+}
 
-    fetch("/hotels")
+/**
+ * Bulle affichant le nombre d'hôtels regroupés ; un clic zoome sur le groupe.
+ */
+function addClusterMarker(cluster) {
+    const size = cluster.count < 10 ? 34 : cluster.count < 100 ? 42 : 50;
+    const icon = L.divIcon({
+        html: `<span>${cluster.count}</span>`,
+        className: "hotel-cluster",
+        iconSize: [size, size]
+    });
+
+    L.marker([cluster.latitude, cluster.longitude], { icon })
+        .addTo(markersLayer)
+        .on("click", () => {
+            window.map.setView([cluster.latitude, cluster.longitude], window.map.getZoom() + CLUSTER_ZOOM_STEP);
+        });
+}
+
+/**
+ * Charge les regroupements de la zone visible et remplace les marqueurs affichés.
+ */
+function loadVisibleHotels(currentHotelId, updateHotelInfo, loadReviews) {
+    const requestId = ++lastRequestId;
+
+    fetch(buildClustersUrl(window.map))
         .then(response => response.json())
-        .then(hotels => {
-            console.log("📌 Hôtels récupérés :", hotels);
-            if (!hotels.length) return console.warn("⚠️ Aucun hôtel trouvé.");
-
-            hotels.forEach((hotel, index) => {
-                setTimeout(() => {
-                    if (hotel.latitude && hotel.longitude) {
-                        const isSelected = hotel.id.toString() === currentHotelId;
-                        addHotelMarker(hotel, updateHotelInfo, loadReviews, isSelected);
-                    }
-                }, index * 50); // ⏳ Évite surcharge de la carte
+        .then(clusters => {
+            if (requestId !== lastRequestId) return;  // ⏭️ Réponse d'une ancienne position de la carte
+            if (!Array.isArray(clusters)) return console.warn("⚠️ Réponse inattendue :", clusters);
+            console.log(`📌 ${clusters.length} marqueur(s) dans la zone visible`);
+
+            markersLayer.clearLayers();
+            clusters.forEach(cluster => {
+                if (cluster.hotel) {
+                    const isSelected = cluster.hotel.id.toString() === currentHotelId;
+                    addHotelMarker(cluster.hotel, updateHotelInfo, loadReviews, isSelected, markersLayer);
+                } else {
+                    addClusterMarker(cluster);
+                }
             });
         })
         .catch(error => {
             console.error("❌ Erreur lors du chargement des hôtels :", error);
         });
 }
+
+/**
+ * Affiche les hôtels de la zone visible et les recharge à chaque déplacement de la carte.
+ * @param {Function} updateHotelInfo - Fonction à appeler au clic sur un marqueur.
+ * @param {Function} loadReviews - Fonction à appeler pour charger les avis.
+ */
+export function initReservationMap(updateHotelInfo, loadReviews) {
+    if (!window.map) return console.warn("⚠️ Carte non initialisée.");
+
+    const { params } = getParamsAndReviews();
+    const currentHotelId = params.get("hotel_id");
+
+    if (!markersLayer) markersLayer = L.layerGroup().addTo(window.map);
+    loadVisibleHotels(currentHotelId, updateHotelInfo, loadReviews);
+
+    window.map.on("moveend", () => {
+        clearTimeout(moveTimer);
+        moveTimer = setTimeout(() => loadVisibleHotels(currentHotelId, updateHotelInfo, loadReviews), MOVE_DEBOUNCE_MS);
+    });
+}
@@ -14,18 +14,14 @@
 // - Vérifie si la carte (`window.map`) existe déjà ; sinon, elle est créée.
 // - Ajoute un marqueur pour l’hôtel passé en paramètre.
 // - Attache une fonction au clic sur ce marqueur :
-//     → Charge les avis de l’hôtel (`loadReviews`)
-//     → Met à jour l’objet `hotel` avec ses avis
 //     → Met à jour dynamiquement l’URL (`updateHotelInURL`)
 //     → Met à jour l’affichage des infos (`updateHotelInfo`)
-//     → Affiche les avis (`displayReviews`) et active le tri (`setupReviewSorting`)
+//     → Charge et affiche les avis page par page, triés par l'API (`setupPagedReviews`)
 //
 // 🧩 Dépendances :
 // - `updateHotelInURL` depuis `reservation.js`
 // - `createMap`, `addHotelMarker`, `updateHotelInfo` depuis `reservationMap.js`
-// - `loadReviews` depuis `reviewLoader.js`
-// - `displayReviews` depuis `reviewManager.js`
-// - `setupReviewSorting` depuis `reservationReview.js`
+// - `setupPagedReviews` depuis `reservationReview.js`
 //
 // ✅ Utilisé pour initialiser la vue complète d’un hôtel (carte + infos + avis)
 // =============================================================
@@ -34,9 +30,7 @@
 
 import { updateHotelInURL } from '../reservation.js';
 import { createMap, addHotelMarker, updateHotelInfo } from './reservationMap.js'; 
-import { loadReviews } from "./reviewLoader.js";
-import { displayReviews } from './reviewManager.js';
-import { setupReviewSorting } from './reservationReview.js';
+import { setupPagedReviews } from './reservationReview.js';
 
 
 export function initReservations(hotel) {
@@ -45,12 +39,10 @@ export function initReservations(hotel) {
         createMap(hotel.latitude, hotel.longitude);
     }
     addHotelMarker(hotel, async (selectedHotel) => {
-        const reviews = await loadReviews(selectedHotel.id, "note");
-        selectedHotel.reviews = reviews;                     
+        selectedHotel.reviews = [];
         updateHotelInURL(selectedHotel);                          
         updateHotelInfo(selectedHotel);
-        displayReviews(reviews); 
-        setupReviewSorting(reviews); 
+        await setupPagedReviews(selectedHotel.id, "note");
         //location.reload();  // recharge propre avec les bons paramètres
     });
 }
\ No newline at end of file
@@ -101,14 +101,15 @@ export function createMap(lat, lng) {
 }
 
 
-export function addHotelMarker(hotel, onClickCallback = null, loadReviewsCallback = null, isSelected = false) {
+export function addHotelMarker(hotel, onClickCallback = null, loadReviewsCallback = null, isSelected = false, layer = null) {
     if (!window.map) return;
 
     const icon = isSelected ? redIcon : blueIcon;
 
     // Ne supprime pas les marqueurs existants, juste ajouter un nouveau marqueur
+    // (dans `layer` si fourni, pour pouvoir le retirer quand la carte est rechargée)
     const marker = L.marker([hotel.latitude, hotel.longitude], { icon })
-        .addTo(window.map)
+        .addTo(layer || window.map)
         .bindPopup(`<strong>${hotel.name}</strong><br>${hotel.address}`)
         .on("click", () => {
             console.log("🖱️ Clic sur : ", hotel.name);
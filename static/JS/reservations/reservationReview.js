@@ -15,10 +15,14 @@
 // - Utilise la fonction `sortReviewsOnly()` pour trier les avis.
 // - Utilise la fonction `displayReviews()` pour afficher la liste
 //   des avis triés.
+// - `setupPagedReviews(hotelId)` : tri par date / note fait par l'API
+//   (`/get_reviews`, index SQLite) et bouton "Voir plus d'avis" qui
+//   charge la page suivante avec le curseur `next_cursor`.
 //
 // 🧩 Dépendances :
 // - `sortReviewsOnly` (depuis `reviewSorter.js`)
 // - `displayReviews` (depuis `reviewManager.js`)
+// - `loadReviewsPage` (depuis `reviewLoader.js`)
 //
 // ⚠️ Les éléments HTML correspondants aux boutons doivent avoir
 //    les IDs : `sort-by-date`, `sort-by-rating`, `sort-by-name`.
@@ -31,6 +35,7 @@
 
 import { sortReviewsOnly } from './reviewSorter.js';
 import { displayReviews } from './reviewManager.js';
+import { loadReviewsPage, REVIEWS_PAGE_SIZE } from './reviewLoader.js';
 
 /**
  * Attache les écouteurs de tri sur les boutons "Trier par ..."
@@ -52,3 +57,57 @@ export function setupReviewSorting(reviews) {
         displayReviews(sorted);
     });
 }
+
+
+/**
+ * Avis paginés par l'API : les tris "date" et "note" rechargent la première page
+ * depuis le serveur, "Voir plus d'avis" ajoute la page suivante (curseur).
+ * Le tri par nom reste local aux avis déjà chargés.
+ * @param {number} hotelId
+ * @param {string} [sortBy="note"] - Tri initial : "date" ou "note".
+ */
+export async function setupPagedReviews(hotelId, sortBy = "note") {
+    const state = { sortBy, cursor: null, items: [], loading: false };
+
+    const loadMoreButton = document.getElementById("load-more-reviews") || document.createElement("button");
+    loadMoreButton.id = "load-more-reviews";
+    loadMoreButton.textContent = "⬇️ Voir plus d'avis";
+    document.querySelector(".reviews-section")?.appendChild(loadMoreButton);
+
+    async function loadPage(reset) {
+        if (state.loading) return;
+        state.loading = true;
+        if (reset) {
+            state.cursor = null;
+            state.items = [];
+        }
+
+        const page = await loadReviewsPage(hotelId, state.sortBy, state.cursor);
+        state.items = state.items.concat(page.items);
+        state.cursor = page.next_cursor;
+        state.loading = false;
+
+        const lastPage = Math.max(1, Math.ceil(state.items.length / REVIEWS_PAGE_SIZE));
+        displayReviews(state.items, { attachSortButtons: false, page: reset ? 1 : lastPage });
+        loadMoreButton.style.display = state.cursor ? "" : "none";
+    }
+
+    document.getElementById("sort-by-date")?.addEventListener("click", () => {
+        state.sortBy = "date";
+        loadPage(true);
+    });
+
+    document.getElementById("sort-by-rating")?.addEventListener("click", () => {
+        state.sortBy = "note";
+        loadPage(true);
+    });
+
+    document.getElementById("sort-by-name")?.addEventListener("click", () => {
+        const sorted = sortReviewsOnly(state.items, "name");
+        displayReviews(sorted, { attachSortButtons: false, page: 1 });
+    });
+
+    loadMoreButton.addEventListener("click", () => loadPage(false));
+
+    await loadPage(true);
+}
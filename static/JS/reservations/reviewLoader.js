@@ -12,15 +12,17 @@
 //
 // 🔧 Fonctionnalités :
 // - Envoie une requête `fetch` vers l’endpoint `/get_reviews` avec
-//   l’ID de l’hôtel et un critère de tri facultatif (`sortBy`).
-// - Parse la réponse JSON et retourne un tableau d’avis.
+//   l’ID de l’hôtel, un critère de tri (`sortBy` : "date" ou "note"),
+//   une taille de page (`limit`) et le curseur de la page suivante.
+// - `loadReviewsPage()` retourne `{ items, next_cursor, total }`.
+// - `loadReviews()` retourne directement le tableau d’avis de la 1re page.
 // - Affiche les avis dans la console pour débogage.
 // - Gère les erreurs HTTP et réseau avec un fallback propre.
 //
 // 🧩 Dépendance :
 // - `displayReviews` est importé mais **non utilisé ici** (peut être retiré).
 //
-// 📦 Retour : un tableau d’objets `reviews` ou un tableau vide en cas d’échec.
+// 📦 Retour : une page d’avis (ou une page vide en cas d’échec).
 // =============================================================
 
 
@@ -28,24 +30,41 @@
 // 📡 reviewLoader.js
 // ============================
 
+export const REVIEWS_PAGE_SIZE = 10;
+
 /**
- * Charge les avis d’un hôtel donné via l’API backend.
+ * Charge une page d’avis d’un hôtel via l’API backend (pagination par curseur).
  * @param {number} hotelId - Identifiant de l’hôtel à interroger.
- * @param {string} [sortBy="date"] - Critère de tri (par défaut : "date").
- * @returns {Promise<Array>} - Tableau d’avis ou tableau vide en cas d’erreur.
+ * @param {string} [sortBy="date"] - Critère de tri : "date" ou "note".
+ * @param {string|null} [cursor=null] - Curseur `next_cursor` de la page précédente.
+ * @param {number} [limit=REVIEWS_PAGE_SIZE] - Nombre d’avis par page.
+ * @returns {Promise<{items: Array, next_cursor: string|null, total: number}>}
  */
-
-export async function loadReviews(hotelId, sortBy = "date") {
+export async function loadReviewsPage(hotelId, sortBy = "date", cursor = null, limit = REVIEWS_PAGE_SIZE) {
     console.log(`📡 Chargement des avis pour l'hôtel ID: ${hotelId} avec tri: ${sortBy}`);
 
+    const params = new URLSearchParams({ hotel_id: hotelId, sort_by: sortBy, limit });
+    if (cursor) params.set("cursor", cursor);
+
     try {
-        const response = await fetch(`/get_reviews?hotel_id=${hotelId}&sort_by=${sortBy}`);
+        const response = await fetch(`/get_reviews?${params.toString()}`);
         if (!response.ok) throw new Error("Erreur HTTP : " + response.status);
-        const reviews = await response.json();
-        console.log("✅ Avis récupérés depuis l'API :", reviews);
-        return reviews;  // ✅ on retourne les avis !
+        const page = await response.json();
+        console.log("✅ Avis récupérés depuis l'API :", page.items);
+        return page;
     } catch (error) {
         console.error("❌ Erreur lors du chargement des avis :", error);
-        return []; // ✅ retourne un tableau vide en cas d'erreur
+        return { items: [], next_cursor: null, total: 0 }; // ✅ page vide en cas d'erreur
     }
-}
\ No newline at end of file
+}
+
+/**
+ * Charge la première page d’avis d’un hôtel.
+ * @param {number} hotelId - Identifiant de l’hôtel à interroger.
+ * @param {string} [sortBy="date"] - Critère de tri (par défaut : "date").
+ * @returns {Promise<Array>} - Tableau d’avis ou tableau vide en cas d’erreur.
+ */
+export async function loadReviews(hotelId, sortBy = "date") {
+    const page = await loadReviewsPage(hotelId, sortBy);
+    return page.items;  // ✅ on retourne les avis !
+}
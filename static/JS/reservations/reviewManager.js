@@ -14,6 +14,8 @@
 //   → Affiche les avis dans une grille HTML paginée.
 //   → Crée dynamiquement les boutons de tri (date, note, nom).
 //   → Insère les boutons de pagination si nécessaire.
+//   → Option `attachSortButtons: false` quand le tri est fait par l'API
+//     (voir `setupPagedReviews()` dans `reservationReview.js`).
 //
 // - `sortReviews(reviews, criterion)` :
 //   → Trie les avis selon le critère spécifié ("date", "rating", "name").
@@ -54,8 +56,12 @@ const reviewsPerPage = 10;
 /**
  * Affiche les avis dans le conteneur HTML avec pagination et tri
  * @param {Array} reviews 
+ * @param {Object} [options]
+ * @param {boolean} [options.attachSortButtons=true] - Tri local au clic (désactivé quand le tri est fait par l'API).
+ * @param {number} [options.page] - Page à afficher (ex. dernière page après "Voir plus d'avis").
  */
-export function displayReviews(reviews) {
+export function displayReviews(reviews, { attachSortButtons = true, page } = {}) {
+    if (page) currentPage = page;
     const reviewsContainer = document.getElementById("reviews-list");
     let paginationContainer = document.querySelector(".review-pagination");
     let filtersContainer = document.querySelector(".review-filters");
@@ -122,13 +128,13 @@ export function displayReviews(reviews) {
             if (currentPage === i) button.classList.add("active");
             button.addEventListener("click", () => {
                 currentPage = i;
-                displayReviews(reviews);
+                displayReviews(reviews, { attachSortButtons: false });
             });
             paginationContainer.appendChild(button);
         }
     }
 
-    setupSortButtons(reviews);
+    if (attachSortButtons) setupSortButtons(reviews);
 }
 
 
@@ -0,0 +1,80 @@
+import gzip
+import os
+import pytest
+from flask import Flask, render_template_string
+from appAssets import build_assets, init_assets, IMMUTABLE_CACHE
+
+def write(root, path, text):
+    full = os.path.join(root, *path.split("/"))
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w", encoding="utf-8") as f:
+        f.write(text)
+
+@pytest.fixture
+def static_dir(tmp_path):
+    """Arborescence static/ minimale : un point d'entrée, un cycle d'imports et une feuille CSS avec image."""
+    root = str(tmp_path)
+    write(root, "JS/page.js", "import { a } from './lib/a.js';\nconst c = await import(\"/stripe_config.js\");\n")
+    write(root, "JS/lib/a.js", "import { b } from './b.js';\nexport const a = 1;\n")
+    write(root, "JS/lib/b.js", "import { a } from './a.js';\nimport { u } from '../../JS/util.js';\nexport const b = 2;\n")
+    write(root, "JS/util.js", "export const u = 'x'.repeat(2000);\n")
+    write(root, "CSS/page.css", "body { background: url(\"../Image/fond.png\"); }\n.i { background: url(data:image/png;base64,AA); }\n")
+    return root
+
+def test_build_fingerprints_and_rewrites_imports(static_dir):
+    """Noms versionnés, imports réécrits (cycle compris), url() CSS absolues, variantes .gz."""
+    manifest = build_assets(static_dir)
+    dist = os.path.join(static_dir, "dist")
+
+    page, a, b = (manifest[f"JS/{name}"]["file"] for name in ("page.js", "lib/a.js", "lib/b.js"))
+    assert page.startswith("JS/page.") and page != "JS/page.js"
+    assert a.split(".")[-2] == b.split(".")[-2]  # Modules en cycle : même empreinte
+    assert manifest["JS/page.js"]["imports"] == [a, b, manifest["JS/util.js"]["file"]]
+
+    with open(os.path.join(dist, page), encoding="utf-8") as f:
+        text = f.read()
+    assert f"'./{a[3:]}'" in text and '"/stripe_config.js"' in text
+    with open(os.path.join(dist, b), encoding="utf-8") as f:
+        text = f.read()
+    assert f"'../{manifest['JS/util.js']['file'][3:]}'" in text
+
+    with open(os.path.join(dist, manifest["CSS/page.css"]["file"]), encoding="utf-8") as f:
+        css = f.read()
+    assert 'url("/static/Image/fond.png")' in css and "url(data:image/png;base64,AA)" in css
+    with open(os.path.join(dist, page), "rb") as f, gzip.open(os.path.join(dist, page + ".gz")) as g:
+        assert f.read() == g.read()
+
+def test_fingerprint_follows_dependency_changes(static_dir):
+    """Modifier une dépendance change le nom de tous les modules qui l'importent (directement ou non)."""
+    before = build_assets(static_dir)
+    write(static_dir, "JS/util.js", "export const u = 'y';\n")
+    after = build_assets(static_dir)
+    for name in ("JS/util.js", "JS/lib/a.js", "JS/lib/b.js", "JS/page.js"):
+        assert before[name]["file"] != after[name]["file"]
+    assert before["CSS/page.css"] == after["CSS/page.css"]
+
+def test_assets_are_served_immutable_and_precompressed(static_dir):
+    """Fonctions Jinja et route /assets : Cache-Control immutable, variante gzip selon Accept-Encoding."""
+    manifest = build_assets(static_dir)
+    app = Flask(__name__, static_folder=static_dir, static_url_path="/static")
+    init_assets(app, os.path.join(static_dir, "dist"))
+    client = app.test_client()
+
+    with app.test_request_context():
+        html = render_template_string("{{ asset_url('JS/page.js') }}|{{ asset_preloads('JS/page.js') }}")
+        assert render_template_string("{{ asset_url('JS/absent.js') }}") == "/static/JS/absent.js"
+    url = f"/assets/{manifest['JS/page.js']['file']}"
+    assert html.startswith(url + "|")
+    assert html.count('rel="modulepreload"') == 4
+
+    util = f"/assets/{manifest['JS/util.js']['file']}"
+    plain = client.get(util)
+    assert plain.status_code == 200 and "Content-Encoding" not in plain.headers
+    assert plain.headers["Cache-Control"] == IMMUTABLE_CACHE
+
+    compressed = client.get(util, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.mimetype == "text/javascript"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert gzip.decompress(compressed.data) == plain.data
+    assert client.get("/assets/manifest.json").status_code == 404
@@ -0,0 +1,30 @@
+from appAutocompletion import AutocompleteIndex, fold
+
+def test_fold_removes_accents_case_and_hyphens():
+    """La normalisation ignore accents, casse et tirets."""
+    assert fold("São Paulo") == "sao paulo"
+    assert fold("Nouvelle-Zélande") == "nouvelle zelande"
+
+def test_search_is_accent_insensitive_and_ranked_by_hotel_count():
+    """Les suggestions sont trouvées sans accents et classées par nombre d'hôtels."""
+    index = AutocompleteIndex([("city", "Séville", 2), ("city", "Santiago", 5), ("city", "São Paulo", 3),
+                               ("continent", "Europe", 40)])
+
+    assert index.search("seville") == ["Séville"]
+    assert index.search("s") == ["Santiago", "São Paulo", "Séville"]
+    assert index.search("s", limit=1) == ["Santiago"]
+
+def test_search_matches_word_starts():
+    """Chaque début de mot est indexé ('york' trouve 'New York')."""
+    index = AutocompleteIndex([("city", "New York", 3), ("city", "Rio de Janeiro", 2)])
+
+    assert index.search("york") == ["New York"]
+    assert index.search("janeiro") == ["Rio de Janeiro"]
+    assert index.search("ork") == []
+
+def test_city_and_country_with_same_name_keep_separate_counts():
+    """Une ville et un pays de même nom sont deux suggestions, classées chacune par son nombre d'hôtels."""
+    index = AutocompleteIndex([("city", "Luxembourg", 1), ("country", "Luxembourg", 4), ("city", "Lyon", 3)])
+
+    assert index.search("lu") == ["Luxembourg", "Luxembourg"]
+    assert index.search("l") == ["Luxembourg", "Lyon", "Luxembourg"]
@@ -0,0 +1,79 @@
+import sqlite3
+import pytest
+from appAvis import (load_reviews_for_hotels, ensure_review_stats, load_review_stats, rebuild_review_stats,
+                    load_review_page)
+
+@pytest.fixture
+def conn():
+    """Fixture créant une base SQLite en mémoire avec quelques avis."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE user (id_user INTEGER PRIMARY KEY, name TEXT, first_name TEXT);
+        CREATE TABLE reviews (id INTEGER PRIMARY KEY AUTOINCREMENT, hotel_id INTEGER, user_id INTEGER,
+                              rating INTEGER, comment TEXT, date_posted DATE);
+        INSERT INTO user VALUES (1, 'Doe', 'John');
+        INSERT INTO reviews (hotel_id, user_id, rating, comment, date_posted) VALUES
+            (1, 1, 8, 'Ancien', '2025-01-01'),
+            (1, 1, 9, 'Récent', '2025-03-01'),
+            (2, 1, 10, 'Parfait', '2025-02-01');
+    """)
+    yield conn
+    conn.close()
+
+def test_load_reviews_groups_by_hotel(conn):
+    """Les avis sont regroupés par hôtel et triés du plus récent au plus ancien."""
+    reviews = load_reviews_for_hotels(conn, [1, 2, 3])
+
+    assert [r["comment"] for r in reviews[1]] == ["Récent", "Ancien"]
+    assert reviews[2][0]["last_name"] == "Doe"
+    assert reviews[3] == []  # Hôtel sans avis
+
+def test_load_reviews_uses_chunked_queries(conn):
+    """Le nombre de requêtes dépend du nombre de paquets, pas du nombre d'hôtels."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+
+    load_reviews_for_hotels(conn, list(range(1, 11)), chunk_size=4)
+
+    assert len([s for s in statements if "FROM reviews" in s]) == 3
+
+def test_review_stats_are_backfilled_on_creation(conn):
+    """Les avis existants sont agrégés à la création de la table ; un hôtel sans avis a des valeurs vides."""
+    ensure_review_stats(conn)
+    stats = load_review_stats(conn, [1, 3])
+
+    assert stats[1]["review_count"] == 2
+    assert stats[1]["average_rating"] == 8.5
+    assert stats[1]["rating_histogram"] == {"7": 0, "8": 1, "9": 1, "10": 0}
+    assert stats[1]["last_review_date"] == "2025-03-01"
+    assert stats[3]["review_count"] == 0 and stats[3]["average_rating"] is None
+
+def test_review_stats_follow_insert_update_delete(conn):
+    """Les triggers maintiennent les agrégats identiques à un recalcul complet."""
+    ensure_review_stats(conn)
+    conn.execute("INSERT INTO reviews (hotel_id, user_id, rating, comment, date_posted) VALUES (2, 1, 7, 'Moyen', '2025-04-01')")
+    conn.execute("UPDATE reviews SET hotel_id = 2, rating = 10 WHERE comment = 'Récent'")
+    conn.execute("DELETE FROM reviews WHERE comment = 'Ancien'")
+    maintained = load_review_stats(conn)
+
+    assert maintained[1]["review_count"] == 0 and maintained[1]["last_review_date"] is None
+    assert maintained[2]["rating_histogram"] == {"7": 1, "8": 0, "9": 0, "10": 2}
+
+    rebuild_review_stats(conn)
+    assert load_review_stats(conn, [2]) == {2: maintained[2]}
+
+def test_review_pages_follow_the_cursor_without_gaps(conn):
+    """Les pages successives (tri par note, nombreux ex-aequo) couvrent tous les avis une seule fois."""
+    conn.executemany("INSERT INTO reviews (hotel_id, user_id, rating, comment, date_posted) VALUES (3, 1, ?, ?, ?)",
+                     [(7 + i % 4, f"Avis {i}", f"2025-01-{1 + i % 28:02d}") for i in range(25)])
+
+    seen, position = [], None
+    while True:
+        rows, position = load_review_page(conn, 3, "note", position, limit=4)
+        seen += [(row["rating"], row["id"]) for row in rows]
+        if position is None:
+            break
+
+    assert len(seen) == 25
+    assert seen == sorted(seen, key=lambda item: (-item[0], item[1]))
@@ -0,0 +1,118 @@
+import gzip
+import sqlite3
+import pytest
+from flask import Flask, jsonify
+import appCacheHttp
+from appCatalogue import ensure_catalog_version
+from appCacheHttp import DataVersion, ResponseCache, conditional, CACHE_POLICIES, MIN_COMPRESS_SIZE
+
+@pytest.fixture
+def conn():
+    """Fixture créant une base en mémoire avec une table d'hôtels suivie par catalog_version."""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute("CREATE TABLE hotels (id INTEGER PRIMARY KEY, name TEXT)")
+    for table in ("cities", "countries", "reviews"):
+        conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY)")
+    ensure_catalog_version(conn)  # Migration 11
+    conn.commit()
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def client(conn, monkeypatch):
+    """Application minimale : une route conditionnelle qui compte ses appels et ses requêtes SQL."""
+    version = DataVersion(connect=lambda: conn, interval=3600)
+    monkeypatch.setattr(appCacheHttp, "data_version", version)
+    monkeypatch.setattr(appCacheHttp, "response_cache", ResponseCache())
+    statements = []
+    conn.set_trace_callback(statements.append)
+
+    app = Flask(__name__)
+    calls = []
+
+    @app.route("/hotels")
+    @conditional("catalog")
+    def hotels():
+        calls.append(1)
+        return jsonify([row[0] for row in conn.execute("SELECT name FROM hotels")])
+
+    client = app.test_client()
+    client.calls, client.statements, client.version = calls, statements, version
+    return client
+
+def test_second_request_is_answered_with_304_without_sql(client):
+    """Avec l'ETag de la première réponse, la route n'est pas exécutée et aucune requête SQL n'est lancée."""
+    first = client.get("/hotels")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == CACHE_POLICIES["catalog"]
+    assert first.headers["Last-Modified"]
+    etag = first.headers["ETag"]
+
+    client.statements.clear()
+    second = client.get("/hotels", headers={"If-None-Match": etag})
+    assert second.status_code == 304 and second.data == b""
+    assert second.headers["ETag"] == etag
+    assert client.statements == [] and len(client.calls) == 1
+
+    since = client.get("/hotels", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+def test_etag_changes_with_data_version_and_parameters(client, conn):
+    """Une écriture (trigger catalog_version) ou d'autres paramètres donnent un nouvel ETag."""
+    etag = client.get("/hotels").headers["ETag"]
+    assert client.get("/hotels?page=2").headers["ETag"] != etag
+
+    conn.execute("INSERT INTO hotels (name) VALUES ('Le Parisien Luxe')")
+    conn.commit()
+    client.version.invalidate()  # Appelé par l'écrivain unique après chaque validation
+
+    response = client.get("/hotels", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json == ["Le Parisien Luxe"]
+    assert response.headers["ETag"] != etag
+
+def test_compressed_body_is_cached_with_its_etag(client, conn):
+    """Le corps gzip est calculé une fois par ETag, puis resservi sans rappeler la route."""
+    conn.executemany("INSERT INTO hotels (name) VALUES (?)", [(f"Hôtel {i}",) for i in range(200)])
+    conn.commit()
+    client.version.invalidate()
+
+    plain = client.get("/hotels")
+    assert len(plain.data) >= MIN_COMPRESS_SIZE and "Content-Encoding" not in plain.headers
+
+    first = client.get("/hotels", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["Vary"]
+    assert gzip.decompress(first.data) == plain.data
+    assert first.headers["ETag"] != plain.headers["ETag"]
+
+    second = client.get("/hotels", headers={"Accept-Encoding": "gzip"})
+    assert second.data == first.data and second.headers["ETag"] == first.headers["ETag"]
+    assert len(client.calls) == 2  # Une exécution par encodage, aucune pour la requête répétée
+
+def test_brotli_is_preferred_when_available(client, conn):
+    """Avec brotli installé, 'br' est choisi quand le client l'accepte."""
+    brotli = pytest.importorskip("brotli")
+    conn.executemany("INSERT INTO hotels (name) VALUES (?)", [(f"Hôtel {i}",) for i in range(200)])
+    conn.commit()
+    client.version.invalidate()
+
+    response = client.get("/hotels", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.data) == client.get("/hotels").data
+
+def test_same_second_write_is_not_answered_with_304(client, conn):
+    """Deux versions vues dans la même seconde : la date de l'ancienne ne donne pas de 304 pour la nouvelle."""
+    first = client.get("/hotels")
+    conn.execute("INSERT INTO hotels (name) VALUES ('Le Parisien Luxe')")
+    conn.commit()
+    client.version.invalidate()
+
+    response = client.get("/hotels", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert response.status_code == 200 and response.json == ["Le Parisien Luxe"]
+    assert response.last_modified > first.last_modified
+
+    # Avec un ETag, If-Modified-Since est ignoré
+    stale = client.get("/hotels", headers={"If-None-Match": first.headers["ETag"],
+                                           "If-Modified-Since": response.headers["Last-Modified"]})
+    assert stale.status_code == 200
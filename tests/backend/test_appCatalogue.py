@@ -0,0 +1,84 @@
+import sqlite3
+import pytest
+from appAvis import ensure_review_stats
+from appCatalogue import HotelCatalog, ensure_catalog_version
+
+@pytest.fixture
+def conn():
+    """Fixture créant une base SQLite en mémoire avec un hôtel et un avis."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE countries (id INTEGER PRIMARY KEY, name TEXT, continent TEXT);
+        CREATE TABLE cities (id INTEGER PRIMARY KEY, name TEXT, country_id INTEGER);
+        CREATE TABLE hotels (id INTEGER PRIMARY KEY, name TEXT, city_id INTEGER, stars INTEGER, rooms INTEGER,
+            adults_per_room INTEGER, children_per_room INTEGER, pets_allowed INTEGER, parking INTEGER,
+            restaurant INTEGER, piscine INTEGER, spa INTEGER, gym INTEGER, price_per_night REAL,
+            free_wifi INTEGER, ev_charging INTEGER, wheelchair_accessible INTEGER, air_conditioning INTEGER,
+            washing_machine INTEGER, meal_plan TEXT, kitchenette INTEGER, hotel_rating REAL, address TEXT,
+            description TEXT, latitude REAL, longitude REAL, available_from DATE, available_to DATE, image_url TEXT);
+        CREATE TABLE user (id_user INTEGER PRIMARY KEY, name TEXT, first_name TEXT);
+        CREATE TABLE reviews (id INTEGER PRIMARY KEY, hotel_id INTEGER, user_id INTEGER, rating INTEGER,
+            comment TEXT, date_posted DATE);
+        INSERT INTO countries VALUES (1, 'France', 'Europe');
+        INSERT INTO cities VALUES (1, 'Paris', 1);
+        INSERT INTO user VALUES (1, 'Doe', 'John');
+        INSERT INTO hotels VALUES (1, 'Le Parisien Luxe', 1, 5, 12, 3, 0, 1, 1, 1, 1, 1, 1, 450,
+            1, 0, 0, 1, 0, 'Petit-déjeuner', 0, 9.2, '1 rue de Rivoli', 'Luxe', 48.85, 2.35,
+            '2025-01-01', '2025-12-31', 'hotel1.jpg');
+        INSERT INTO reviews VALUES (1, 1, 1, 9, 'Parfait', '2025-02-01');
+    """)
+    ensure_catalog_version(conn)  # Migration 11
+    ensure_review_stats(conn)  # Migration 7
+    yield conn
+    conn.close()
+
+def test_catalog_loads_records(conn):
+    """Le catalogue charge les hôtels avec leurs équipements et leurs avis."""
+    hotel = HotelCatalog().hotels(conn)[0]
+
+    assert hotel.city == "Paris" and hotel.country == "France"
+    assert "Piscine" in hotel.equipments and "Kitchenette" not in hotel.equipments
+    assert hotel.review_count == 1 and hotel.reviews[0].last_name == "Doe"
+
+def test_catalog_rebuilds_when_version_changes(conn):
+    """Une écriture sur hotels (trigger) invalide l'instantané courant."""
+    catalog = HotelCatalog()
+    first = catalog.get(conn)
+    assert catalog.get(conn) is first  # Pas de reconstruction sans écriture
+
+    conn.execute("UPDATE hotels SET price_per_night = 300 WHERE id = 1")
+    conn.commit()
+
+    second = catalog.get(conn)
+    assert second is not first
+    assert second.hotels[0].price_per_night == 300
+
+def test_catalog_filters_in_memory(conn):
+    """Les filtres de /filter_hotels sont appliqués sur les enregistrements en mémoire."""
+    catalog = HotelCatalog()
+
+    assert len(catalog.filter_hotels(conn, {"stars": [5], "piscine": True, "max_price": 500})) == 1
+    assert catalog.filter_hotels(conn, {"kitchenette": 1}) == []
+    assert catalog.filter_hotels(conn, {"city_name": "lyon"}) == []
+
+def test_catalog_keyset_pagination(conn):
+    """La pagination par curseur renvoie la page suivante, le total et s'arrête en fin de liste."""
+    conn.execute("""INSERT INTO hotels (id, name, city_id, stars, rooms, pets_allowed, parking, restaurant, piscine, spa, gym,
+                    kitchenette, address, description) SELECT 2, 'Hôtel de Ville', 1, 3, 8, 0, 0, 1, 0, 0, 0, 0, 'a', 'd'""")
+    conn.commit()
+    catalog = HotelCatalog()
+
+    items, last_id, total = catalog.page_after(conn, None, 1)
+    assert [h.id for h in items] == [1] and last_id == 1 and total == 2
+
+    items, last_id, total = catalog.page_after(conn, last_id, 1)
+    assert [h.id for h in items] == [2] and last_id is None
+
+def test_cursor_round_trip():
+    """Un curseur encodé se décode à l'identique ; un curseur corrompu est refusé."""
+    from appPagination import encode_cursor, decode_cursor, InvalidCursor
+
+    assert decode_cursor(encode_cursor({"after": 42})) == {"after": 42}
+    with pytest.raises(InvalidCursor):
+        decode_cursor("pas-un-curseur")
@@ -0,0 +1,71 @@
+import threading
+import pytest
+from appConnexion import ConnectionPool, open_connection
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Fixture fournissant le chemin d'une base temporaire contenant une table simple."""
+    path = str(tmp_path / "hotels.db")
+    conn = open_connection(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, label TEXT)")
+    conn.commit()
+    conn.close()
+    return path
+
+def test_open_connection_applies_pragmas(db_path):
+    """Chaque connexion ouverte est en WAL, synchronous=NORMAL, avec un délai d'attente sur verrou."""
+    conn = open_connection(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    assert conn.execute("SELECT 1 AS one").fetchone()["one"] == 1
+    conn.close()
+
+def test_pool_reuses_connection_in_thread_and_after_release(db_path):
+    """Les appels imbriqués partagent la connexion du thread, qui resert une fois rendue au pool."""
+    pool = ConnectionPool(db_path)
+    outer = pool.acquire()
+    assert pool.acquire() is outer
+    pool.release(outer)
+    pool.release(outer)
+
+    assert pool.acquire() is outer
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(pool.acquire()))
+    thread.start()
+    thread.join()
+    assert other[0] is not outer
+    pool.close_all()
+
+def test_release_rolls_back_open_transaction(db_path):
+    """Une écriture non validée n'est pas conservée par la connexion rendue au pool."""
+    pool = ConnectionPool(db_path)
+    conn = pool.acquire()
+    conn.execute("INSERT INTO items (label) VALUES ('oubliée')")
+    pool.release(conn)
+
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+    pool.close_all()
+
+def test_pool_keeps_at_most_max_idle_connections(db_path):
+    """Au-delà de max_idle, les connexions rendues sont fermées."""
+    pool = ConnectionPool(db_path, max_idle=1)
+
+    def hold(barrier):
+        conn = pool.acquire()
+        barrier.wait()  # Les deux threads tiennent chacun une connexion
+        pool.release(conn)
+
+    barrier = threading.Barrier(2)
+    threads = [threading.Thread(target=hold, args=(barrier,)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(pool._idle) == 1
+    pool.close_all()
+    assert pool._idle == []
@@ -0,0 +1,67 @@
+import sqlite3
+import pytest
+from appCatalogue import ensure_catalog_version
+from appDisponibilite import AvailabilityIndex, ensure_occupancy_table, rebuild_occupancy, record_stay
+
+@pytest.fixture
+def conn():
+    """Fixture créant une base en mémoire : hôtel 1 (2 chambres), hôtel 2 (1 chambre)."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE countries (id INTEGER PRIMARY KEY);
+        CREATE TABLE cities (id INTEGER PRIMARY KEY);
+        CREATE TABLE reviews (id INTEGER PRIMARY KEY);
+        CREATE TABLE hotels (id INTEGER PRIMARY KEY, rooms INTEGER);
+        CREATE TABLE reservations (id INTEGER PRIMARY KEY, hotel_id INTEGER, checkin TEXT, checkout TEXT, status TEXT);
+        INSERT INTO hotels VALUES (1, 2), (2, 1);
+        INSERT INTO reservations VALUES (1, 1, '2025-05-01', '2025-05-05', 'paid');
+        INSERT INTO reservations VALUES (2, 1, '2025-05-04', '2025-05-08', 'confirmed');
+        INSERT INTO reservations VALUES (3, 1, '2025-05-04', '2025-05-06', 'pending');
+        INSERT INTO reservations VALUES (4, 2, '2025-05-01', '2025-05-10', 'cancelled');
+    """)
+    ensure_occupancy_table(conn)  # Migration 10
+    rebuild_occupancy(conn)
+    ensure_catalog_version(conn)  # Migration 11
+    yield conn
+    conn.close()
+
+def test_hotel_is_full_only_when_all_rooms_are_booked(conn):
+    """L'hôtel 1 n'est complet que la nuit du 4 mai (2 réservations confirmées pour 2 chambres)."""
+    index = AvailabilityIndex()
+    index.ensure_loaded(conn)
+
+    assert not index.is_available(1, "2025-05-03", "2025-05-06")
+    assert index.is_available(1, "2025-05-01", "2025-05-04")  # Une chambre reste libre
+    assert index.is_available(1, "2025-05-05", "2025-05-08")  # Départ le 5 : la nuit du 4 n'est pas incluse
+
+def test_cancelled_and_pending_reservations_are_ignored(conn):
+    """Seules les réservations payées ou confirmées occupent une chambre."""
+    index = AvailabilityIndex()
+    index.ensure_loaded(conn)
+
+    assert index.available_hotels([1, 2], "2025-05-02", "2025-05-03") == [1, 2]
+
+def test_occupancy_follows_insert_and_cancel(conn):
+    """record_stay + refresh_hotel suivent une réservation puis son annulation."""
+    index = AvailabilityIndex()
+    index.ensure_loaded(conn)
+
+    record_stay(conn, 2, "2025-06-01", "2025-06-03")
+    index.refresh_hotel(conn, 2)
+    assert not index.is_available(2, "2025-06-02", "2025-06-04")
+
+    record_stay(conn, 2, "2025-06-01", "2025-06-03", delta=-1)
+    index.refresh_hotel(conn, 2)
+    assert index.is_available(2, "2025-06-02", "2025-06-04")
+
+def test_cancel_without_occupancy_row_does_not_go_negative(conn):
+    """Annuler un séjour absent de la table d'occupation ne crée pas de compteur négatif qui masquerait une réservation."""
+    index = AvailabilityIndex()
+    index.ensure_loaded(conn)
+
+    record_stay(conn, 2, "2025-07-01", "2025-07-03", delta=-1)
+    assert conn.execute("SELECT COUNT(*) FROM hotel_occupancy WHERE hotel_id = 2").fetchone()[0] == 0
+
+    record_stay(conn, 2, "2025-07-01", "2025-07-03")
+    index.refresh_hotel(conn, 2)
+    assert not index.is_available(2, "2025-07-01", "2025-07-02")
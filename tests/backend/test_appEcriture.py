@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+import pytest
+from appConnexion import open_connection
+from appEcriture import SingleWriter
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Fixture fournissant une base temporaire avec une table à libellé unique."""
+    path = str(tmp_path / "hotels.db")
+    conn = open_connection(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, label TEXT UNIQUE)")
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+def writer(db_path):
+    writer = SingleWriter(db_path)
+    yield writer
+    writer.close()
+
+def insert(conn, label):
+    return conn.execute("INSERT INTO items (label) VALUES (?)", (label,)).lastrowid
+
+def labels(db_path):
+    conn = open_connection(db_path)
+    rows = [row["label"] for row in conn.execute("SELECT label FROM items ORDER BY id")]
+    conn.close()
+    return rows
+
+def test_execute_returns_job_result_after_commit(writer, db_path):
+    """Le résultat de l'écriture est renvoyé une fois validé : une autre connexion le voit."""
+    assert writer.execute(insert, "a") == 1
+    assert labels(db_path) == ["a"]
+
+def test_pending_writes_are_group_committed(writer, db_path):
+    """Les écritures en attente pendant une transaction sont validées ensemble dans la suivante."""
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(conn):
+        started.set()
+        release.wait()
+        return insert(conn, "first")
+
+    first = writer.submit(blocking)
+    started.wait()
+    futures = [writer.submit(insert, f"item {i}") for i in range(10)]
+    release.set()
+
+    assert first.result(timeout=5) == 1
+    assert [future.result(timeout=5) for future in futures] == list(range(2, 12))
+    assert writer.batch_count == 2
+
+def test_failing_job_is_rolled_back_alone(writer, db_path):
+    """Une écriture en erreur est annulée et reçoit l'exception, les autres du lot sont validées."""
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(conn):
+        started.set()
+        release.wait()
+        return insert(conn, "a")
+
+    def insert_then_fail(conn):
+        insert(conn, "partielle")
+        return insert(conn, "a")  # Libellé déjà utilisé
+
+    first = writer.submit(blocking)
+    started.wait()
+    failing = writer.submit(insert_then_fail)
+    last = writer.submit(insert, "b")
+    release.set()
+
+    first.result(timeout=5)
+    with pytest.raises(sqlite3.IntegrityError):
+        failing.result(timeout=5)
+    last.result(timeout=5)
+    assert labels(db_path) == ["a", "b"]
+    assert writer.batch_count == 2
+
+def test_readers_are_not_blocked_during_a_write(writer, db_path):
+    """En WAL, une connexion de lecture lit l'état validé pendant qu'une écriture est en cours."""
+    writer.execute(insert, "a")
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(conn):
+        insert(conn, "b")
+        started.set()
+        release.wait()
+
+    pending = writer.submit(blocking)
+    started.wait()
+    try:
+        assert labels(db_path) == ["a"]
+    finally:
+        release.set()
+    pending.result(timeout=5)
+    assert labels(db_path) == ["a", "b"]
+
+def test_failing_commit_listener_does_not_stop_the_writer(writer, db_path):
+    """Un écouteur en erreur n'empêche ni les autres écouteurs, ni la résolution des Futures, ni les lots suivants."""
+    calls = []
+    def broken():
+        calls.append("broken")
+        raise RuntimeError("cache indisponible")
+    writer.add_commit_listener(broken)
+    writer.add_commit_listener(lambda: calls.append("ok"))
+
+    assert writer.execute(insert, "a") == 1
+    assert writer.execute(insert, "b") == 2
+    assert calls == ["broken", "ok", "broken", "ok"]
+    assert labels(db_path) == ["a", "b"]
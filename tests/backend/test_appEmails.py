@@ -0,0 +1,130 @@
+import socket
+import time
+import pytest
+from appConnexion import open_connection
+from appEcriture import SingleWriter
+from appEmails import EmailOutbox, SmtpSender, ensure_outbox_table, insert_email, claim_due, retry_delay
+
+aiosmtpd = pytest.importorskip("aiosmtpd.controller")
+
+class Handler:
+    """Serveur SMTP local : enregistre les messages reçus ; peut refuser des destinataires ou échouer N fois."""
+
+    def __init__(self):
+        self.messages = []
+        self.temporary_failures = 0
+        self.refused = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused:
+            return "550 Adresse inconnue"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.temporary_failures:
+            self.temporary_failures -= 1
+            return "451 Réessayez plus tard"
+        self.messages.append(envelope)
+        return "250 OK"
+
+@pytest.fixture
+def smtp():
+    handler = Handler()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        handler.port = probe.getsockname()[1]
+    controller = aiosmtpd.Controller(handler, hostname="127.0.0.1", port=handler.port)
+    controller.start()
+    yield handler
+    controller.stop()
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "hotels.db")
+    conn = open_connection(path)
+    ensure_outbox_table(conn)
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+def outbox(db_path, smtp):
+    """File d'envoi isolée : écrivain sur la base temporaire, SMTP local, nouveaux essais immédiats."""
+    writer = SingleWriter(db_path)
+    senders = []
+
+    def sender_factory():
+        senders.append(SmtpSender("127.0.0.1", smtp.port))
+        return senders[-1]
+
+    outbox = EmailOutbox(writer=writer, sender_factory=sender_factory, workers=1,
+                         max_attempts=3, backoff_base=0, poll_interval=0.05)
+    outbox.default_sender = "noreply@justdreams.fr"
+    outbox.senders = senders
+    yield outbox
+    outbox.close()
+    writer.close()
+
+def statuses(db_path):
+    conn = open_connection(db_path)
+    rows = {row["id"]: (row["status"], row["attempts"], row["last_error"]) for row in conn.execute("SELECT * FROM email_outbox")}
+    conn.close()
+    return rows
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "délai dépassé"
+        time.sleep(0.02)
+
+def test_queued_emails_are_sent_over_one_persistent_connection(outbox, smtp, db_path):
+    """enqueue répond sans attendre le SMTP ; tous les messages passent par la même connexion."""
+    ids = [outbox.enqueue(f"Message {i}", [f"client{i}@example.com"], body="Bonjour", html="<p>Bonjour</p>")
+           for i in range(20)]
+
+    wait_until(lambda: len(smtp.messages) == 20)
+    wait_until(lambda: all(status == "sent" for status, _, _ in statuses(db_path).values()))
+    assert sorted(statuses(db_path)) == ids
+    assert [sender.connections for sender in outbox.senders] == [1]
+
+    first = smtp.messages[0]
+    assert first.mail_from == "noreply@justdreams.fr" and first.rcpt_tos == ["client0@example.com"]
+    assert b"multipart/alternative" in first.content and b"<p>Bonjour</p>" in first.content
+
+def test_temporary_failure_is_retried(outbox, smtp, db_path):
+    """Un refus temporaire (4xx) est suivi d'un nouvel essai qui réussit."""
+    smtp.temporary_failures = 1
+    email_id = outbox.enqueue("Confirmation", ["client@example.com"], body="Réservation confirmée")
+    wait_until(lambda: statuses(db_path)[email_id][0] == "sent")
+    assert statuses(db_path)[email_id] == ("sent", 2, None)
+    assert len(smtp.messages) == 1
+
+def test_failures_end_in_dead_letter(outbox, smtp, db_path):
+    """Destinataire refusé : 'dead' dès le premier essai ; échecs temporaires répétés : 'dead' après max_attempts."""
+    smtp.refused.add("inconnu@example.com")
+    refused = outbox.enqueue("Bienvenue", ["inconnu@example.com"], body="Bonjour")
+    wait_until(lambda: statuses(db_path)[refused][0] == "dead")
+    status, attempts, error = statuses(db_path)[refused]
+    assert attempts == 1 and error.startswith("SMTPRecipientsRefused")
+
+    smtp.temporary_failures = 10
+    failing = outbox.enqueue("Annulation", ["client@example.com"], body="Réservation annulée")
+    wait_until(lambda: statuses(db_path)[failing][0] == "dead")
+    assert statuses(db_path)[failing][1] == 3
+    assert "451" in statuses(db_path)[failing][2]
+
+def test_claim_leases_messages_until_expiry(db_path):
+    """Un message pris n'est plus proposé avant l'expiration de son bail, puis redevient disponible."""
+    conn = open_connection(db_path)
+    email_id = insert_email(conn, "Test", ["a@example.com"], body="x")
+    now = time.time()
+    assert [row["id"] for row in claim_due(conn, 10, now, lease=60)] == [email_id]
+    assert claim_due(conn, 10, now + 30) == []
+    assert [row["id"] for row in claim_due(conn, 10, now + 61)] == [email_id]
+    conn.close()
+
+def test_retry_delay_grows_exponentially_with_cap():
+    assert 24 <= retry_delay(1, base=30) <= 36
+    assert 96 <= retry_delay(3, base=30) <= 144
+    assert retry_delay(20, base=30, maximum=3600) <= 3600 * 1.2
@@ -0,0 +1,79 @@
+import sqlite3
+import pytest
+from collections import namedtuple
+from appGeo import ensure_geo_index, hotel_ids_in_bounds, parse_bounds, InvalidBounds, ClusterGrid, mercator_cell
+
+@pytest.fixture
+def conn():
+    """Fixture créant une base en mémoire avec trois hôtels (dont un sans coordonnées) et l'index R*Tree."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE hotels (id INTEGER PRIMARY KEY, name TEXT, latitude REAL, longitude REAL);
+        INSERT INTO hotels VALUES (1, 'Le Parisien Luxe', 48.8566, 2.3522);
+        INSERT INTO hotels VALUES (2, 'Nice Riviera Palace', 43.7102, 7.2620);
+        INSERT INTO hotels VALUES (3, 'Hôtel sans adresse', NULL, NULL);
+    """)
+    ensure_geo_index(conn)
+    yield conn
+    conn.close()
+
+def test_existing_hotels_are_indexed(conn):
+    """Les hôtels déjà géolocalisés sont trouvés ; ceux sans coordonnées sont ignorés."""
+    assert hotel_ids_in_bounds(conn, 48, 2, 49, 3) == [1]
+    assert hotel_ids_in_bounds(conn, 40, -10, 52, 10) == [1, 2]
+
+def test_triggers_follow_coordinate_updates(conn):
+    """Insertion, mise à jour des coordonnées (géocodage) et suppression sont répercutées."""
+    conn.execute("UPDATE hotels SET latitude = 43.6, longitude = 1.44 WHERE id = 3")
+    conn.execute("INSERT INTO hotels VALUES (4, 'Fidji Lagoon', -17.7, 178.0)")
+    conn.execute("DELETE FROM hotels WHERE id = 2")
+
+    assert hotel_ids_in_bounds(conn, 40, -10, 52, 10) == [1, 3]
+    assert hotel_ids_in_bounds(conn, -20, 170, -15, 179) == [4]
+
+def test_bounds_crossing_the_antimeridian(conn):
+    """Une zone avec west > east couvre les deux côtés de la longitude 180."""
+    conn.execute("INSERT INTO hotels VALUES (4, 'Fidji Lagoon', -17.7, 178.0)")
+    conn.execute("INSERT INTO hotels VALUES (5, 'Samoa Beach', -13.8, -171.7)")
+
+    assert hotel_ids_in_bounds(conn, -20, 170, -10, -170) == [4, 5]
+    assert hotel_ids_in_bounds(conn, -20, 170, -10, -170, limit=1) == [4]
+
+def test_limit_is_applied_in_the_query(conn):
+    """Zone très large : seuls les `limit` premiers hôtels (par identifiant) sont renvoyés."""
+    conn.executemany("INSERT INTO hotels VALUES (?, 'Hôtel', 45.0, 5.0)", [(i,) for i in range(10, 60)])
+
+    assert hotel_ids_in_bounds(conn, -90, -180, 90, 180, limit=3) == [1, 2, 10]
+    assert len(hotel_ids_in_bounds(conn, -90, -180, 90, 180)) == 52
+
+def test_invalid_bounds_are_rejected():
+    """Valeurs manquantes, non numériques ou hors limites → InvalidBounds."""
+    assert parse_bounds("1", "2", "3", "4") == (1.0, 2.0, 3.0, 4.0)
+    for bounds in ((None, 2, 3, 4), ("abc", 2, 3, 4), (50, 2, 40, 4), (1, 2, 3, 200)):
+        with pytest.raises(InvalidBounds):
+            parse_bounds(*bounds)
+
+Point = namedtuple("Point", ["id", "latitude", "longitude"])
+
+def test_clusters_merge_at_low_zoom_and_split_when_zooming_in():
+    """Deux hôtels parisiens forment un seul groupe au zoom 6, deux marqueurs au zoom 14."""
+    grid = ClusterGrid([
+        Point(1, 48.8566, 2.3522), Point(2, 48.8600, 2.3400),
+        Point(3, 43.7102, 7.2620), Point(4, None, None)
+    ])
+
+    world = grid.clusters(6, -85, -180, 85, 180)
+    paris = [c for c in world if c["count"] == 2]
+    assert sum(c["count"] for c in world) == 3
+    assert len(paris) == 1 and paris[0]["hotel_id"] is None
+    assert paris[0]["latitude"] == pytest.approx((48.8566 + 48.86) / 2)
+
+    city = grid.clusters(14, 48.8, 2.2, 48.9, 2.5)
+    assert sorted(c["hotel_id"] for c in city) == [1, 2]
+
+def test_mercator_cells_are_nested_between_zoom_levels():
+    """La case d'un point au zoom z contient ses cases au zoom z + 1 (décalage d'un bit)."""
+    for zoom in range(0, 18):
+        x, y = mercator_cell(48.8566, 2.3522, zoom + 1)
+        assert (x >> 1, y >> 1) == mercator_cell(48.8566, 2.3522, zoom)
@@ -0,0 +1,70 @@
+import os
+import sqlite3
+import pytest
+from appImages import build_variants, referenced_images, target_widths, variant_name, ImageVariants, VARIANTS_FOLDER
+import appSerialisation
+from test_appSerialisation import make_hotel
+
+Image = pytest.importorskip("PIL.Image")
+
+@pytest.fixture
+def image_dir(tmp_path):
+    """static/Image minimal : une grande photo d'hôtel, une petite image et un avatar PNG (transparence)."""
+    root = tmp_path / "Image"
+    (root / "avatars").mkdir(parents=True)
+    Image.new("RGB", (2000, 1000), (200, 30, 30)).save(root / "hotel1.jpg")
+    Image.new("RGB", (500, 400), (30, 200, 30)).save(root / "petit.jpg")
+    Image.new("RGBA", (400, 400), (0, 0, 255, 128)).save(root / "avatars" / "remy.png")
+    return str(root)
+
+def test_target_widths_never_upscale():
+    """Largeurs standard inférieures à l'original, plus l'original s'il est plus petit que la plus grande."""
+    assert target_widths(5760) == [320, 640, 1024, 1600]
+    assert target_widths(500) == [320, 500]
+    assert target_widths(200) == [200]
+
+def test_referenced_images_lists_hotels_and_avatars(image_dir):
+    """Images de hotels.image_url (sans doublon ni valeur vide), images supplémentaires et avatars."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE hotels (id INTEGER PRIMARY KEY, image_url TEXT)")
+    conn.executemany("INSERT INTO hotels (image_url) VALUES (?)", [("hotel1.jpg",), ("hotel1.jpg",), (None,), ("",)])
+    assert referenced_images(conn, image_dir, extra_images=("petit.jpg",)) == ["avatars/remy.png", "hotel1.jpg", "petit.jpg"]
+
+def test_build_variants_and_srcset(image_dir):
+    """WebP + JPEG par largeur, dimensions respectées, manifest relu pour produire les srcset."""
+    manifest = build_variants(["hotel1.jpg", "petit.jpg", "avatars/remy.png", "absente.jpg"], image_dir)
+    assert set(manifest) == {"hotel1.jpg", "petit.jpg", "avatars/remy.png"}
+    assert manifest["hotel1.jpg"] == {"width": 2000, "height": 1000, "widths": [320, 640, 1024, 1600]}
+
+    with Image.open(os.path.join(image_dir, VARIANTS_FOLDER, "hotel1-640.webp")) as variant:
+        assert variant.format == "WEBP" and variant.size == (640, 320)
+    with Image.open(os.path.join(image_dir, *variant_name("avatars/remy.png", 320, "jpg").split("/"))) as variant:
+        assert variant.format == "JPEG" and variant.mode == "RGB"
+
+    srcset = ImageVariants(image_dir).srcset("petit.jpg", "/static/Image/")
+    assert srcset == {
+        "webp": "/static/Image/variants/petit-320.webp 320w, /static/Image/variants/petit-500.webp 500w",
+        "jpeg": "/static/Image/variants/petit-320.jpg 320w, /static/Image/variants/petit-500.jpg 500w",
+        "width": 500, "height": 400
+    }
+    assert ImageVariants(image_dir).srcset("inconnue.jpg", "/static/Image/") is None
+
+def test_up_to_date_variants_are_not_regenerated(image_dir):
+    """Une seconde construction conserve les fichiers existants (construction incrémentale)."""
+    build_variants(["hotel1.jpg"], image_dir)
+    path = os.path.join(image_dir, VARIANTS_FOLDER, "hotel1-320.webp")
+    os.utime(path, (1e10, 1e10))
+    build_variants(["hotel1.jpg"], image_dir)
+    assert os.path.getmtime(path) == 1e10
+
+def test_listing_exposes_srcset(image_dir, monkeypatch):
+    """hotel_to_dict ajoute image_srcset (None tant que les variantes n'existent pas)."""
+    variants = ImageVariants(image_dir)
+    monkeypatch.setattr(appSerialisation, "variants", variants)
+    assert appSerialisation.hotel_to_dict(make_hotel(image_url="hotel1.jpg"))["image_srcset"] is None
+
+    build_variants(["hotel1.jpg"], image_dir)
+    variants.reload()
+    listing = appSerialisation.hotel_to_dict(make_hotel(image_url="hotel1.jpg"))
+    assert listing["image"] == "/static/Image/hotel1.jpg"
+    assert listing["image_srcset"]["webp"].endswith("/static/Image/variants/hotel1-1600.webp 1600w")
@@ -0,0 +1,47 @@
+import pytest
+from flask import Flask, g, jsonify
+import appInscription
+from appInscription import (inscription_bp, issue_session_token, read_session_token, generate_reset_token,
+                            session_required)
+
+@pytest.fixture
+def client():
+    """Application minimale : blueprint (vérification du jeton avant chaque requête) + route protégée."""
+    app = Flask(__name__)
+    app.register_blueprint(inscription_bp)
+
+    @app.route("/moi")
+    @session_required
+    def moi():
+        return jsonify(g.session_user)
+
+    return app.test_client()
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def test_token_carries_user_id_and_role(client):
+    token = issue_session_token(7, "admin")
+    assert read_session_token(token) == {"id": 7, "role": "admin"}
+    assert read_session_token(issue_session_token(8, None)) == {"id": 8, "role": "user"}
+
+    response = client.get("/moi", headers=bearer(token))
+    assert response.status_code == 200
+    assert response.get_json() == {"id": 7, "role": "admin"}
+
+def test_missing_tampered_or_foreign_tokens_are_rejected(client):
+    """Sans jeton, jeton modifié ou jeton de réinitialisation de mot de passe : 401."""
+    token = issue_session_token(7, "user")
+    payload, signature = token.rsplit(".", 1)
+    forged = issue_session_token(7, "admin").rsplit(".", 1)[0] + "." + signature
+
+    assert client.get("/moi").status_code == 401
+    assert client.get("/moi", headers={"Authorization": token}).status_code == 401
+    assert client.get("/moi", headers=bearer(forged)).status_code == 401
+    assert client.get("/moi", headers=bearer(generate_reset_token("client@example.com"))).status_code == 401
+
+def test_expired_token_is_rejected(client, monkeypatch):
+    token = issue_session_token(7, "user")
+    monkeypatch.setattr(appInscription, "SESSION_TOKEN_MAX_AGE", -1)
+    assert read_session_token(token) is None
+    assert client.get("/moi", headers=bearer(token)).status_code == 401
@@ -0,0 +1,156 @@
+import sqlite3
+import pytest
+from appMigrations import MIGRATIONS, Migration, migrate, get_schema_version
+from appCatalogue import get_catalog_version
+from appDisponibilite import AvailabilityIndex
+from appAvis import load_review_page, load_reviews_for_hotels, load_review_stats
+from appGeo import hotel_ids_in_bounds
+from appRechercheTexte import search_text
+
+@pytest.fixture
+def conn():
+    """Fixture créant une base en mémoire avec les tables utilisées par les requêtes des routes."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE user (id_user INTEGER NOT NULL PRIMARY KEY, name TEXT, first_name TEXT, role TEXT);
+        CREATE TABLE countries (id INTEGER PRIMARY KEY, name TEXT, continent TEXT);
+        CREATE TABLE cities (id INTEGER PRIMARY KEY, name TEXT, country_id INTEGER);
+        CREATE TABLE hotels (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, image_url TEXT, description TEXT,
+                             address TEXT, latitude REAL, longitude REAL);
+        CREATE TABLE reviews (id INTEGER PRIMARY KEY AUTOINCREMENT, hotel_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+                              rating INTEGER NOT NULL, comment TEXT, date_posted DATE DEFAULT CURRENT_DATE);
+        CREATE TABLE reservations (id INTEGER PRIMARY KEY AUTOINCREMENT, hotel_id INTEGER NOT NULL, user_id INTEGER,
+                                   created_at DATETIME, checkin TEXT NOT NULL, checkout TEXT NOT NULL, guests INTEGER,
+                                   total_price REAL, first_name TEXT, user_name TEXT, status TEXT DEFAULT 'pending');
+    """)
+    yield conn
+    conn.close()
+
+def query_plan(conn, sql, params=()):
+    return " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+def test_migrate_records_versions_and_is_idempotent(conn):
+    """Toutes les migrations sont appliquées une fois, dans l'ordre, et enregistrées dans schema_version."""
+    assert get_schema_version(conn) == 0
+    assert migrate(conn) == [m.version for m in MIGRATIONS]
+    assert migrate(conn) == []
+    assert get_schema_version(conn) == MIGRATIONS[-1].version
+
+def test_failed_migration_is_rolled_back(conn):
+    """Une migration en erreur n'est pas enregistrée et ne laisse aucune modification."""
+    def broken(conn):
+        conn.execute("CREATE INDEX idx_tmp ON reviews(rating)")
+        conn.execute("CREATE INDEX idx_bad ON missing_table(x)")
+
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(conn, migrations=[Migration(99, "Cassée", broken)])
+
+    assert get_schema_version(conn) == 0
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_tmp'").fetchone() is None
+
+def test_migration_1_reservations_by_hotel_and_dates(conn):
+    """Séjours d'un hôtel qui recoupent une période : recherche sur idx_reservations_hotel_dates, conservé par toute la série."""
+    migrate(conn)
+    plan = query_plan(conn, """
+        SELECT 1 FROM reservations
+        WHERE hotel_id = ? AND checkin < ? AND checkout > ? AND status IN ('paid', 'confirmed')
+    """, (1, "2025-05-05", "2025-05-01"))
+    assert "USING INDEX idx_reservations_hotel_dates (hotel_id=? AND checkin<?)" in plan
+
+def test_migration_2_user_reservations(conn):
+    """/api/mes-reservations/<user_id> : index utilisateur + date d'arrivée, sans tri temporaire."""
+    migrate(conn, target=2)
+    plan = query_plan(conn, """
+        SELECT r.id AS reservation_id, r.user_id, h.name AS hotel_name, h.image_url,
+        r.checkin, r.checkout, r.guests, r.total_price, r.status
+        FROM reservations r
+        JOIN hotels h ON r.hotel_id = h.id
+        WHERE r.user_id = ?
+        ORDER BY r.checkin DESC
+    """, (1,))
+    assert "USING INDEX idx_reservations_user_checkin (user_id=?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_migration_3_pending_cleanup_and_confirmed_stays(conn):
+    """Nettoyage des 'pending' et lecture des séjours confirmés : index statut + date de création."""
+    migrate(conn, target=3)
+    cleanup = query_plan(conn, "DELETE FROM reservations WHERE status = 'pending' AND created_at <= ?", ("2025-01-01",))
+    confirmed = query_plan(conn, "SELECT hotel_id, checkin, checkout FROM reservations WHERE status IN ('paid', 'confirmed')")
+    assert "USING INDEX idx_reservations_status_created (status=? AND created_at<?)" in cleanup
+    assert "USING INDEX idx_reservations_status_created (status=?)" in confirmed
+
+def test_migration_4_reviews_by_hotel(conn):
+    """Avis d'un hôtel (pages de /get_reviews, listings, page de réservation) : index par hôtel, sans tri temporaire."""
+    migrate(conn, target=4)
+    conn.execute("INSERT INTO user VALUES (1, 'Doe', 'John', 'user')")
+    conn.executemany("INSERT INTO reviews (hotel_id, user_id, rating, comment) VALUES (1, 1, ?, 'ok')", [(7,), (9,), (9,)])
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    for sort_by in ("date", "note"):
+        _, position = load_review_page(conn, 1, sort_by, limit=1)
+        load_review_page(conn, 1, sort_by, position, limit=1)
+    load_reviews_for_hotels(conn, [1, 2])
+    conn.set_trace_callback(None)
+    statements.append("""
+        SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
+        FROM reviews r JOIN user u ON r.user_id = u.id_user
+        WHERE r.hotel_id = 1 ORDER BY r.date_posted DESC
+    """)
+
+    for statement in statements:
+        plan = query_plan(conn, statement)
+        assert "USING INDEX idx_reviews_hotel_" in plan
+        assert "TEMP B-TREE" not in plan
+
+def test_migration_7_review_stats_backfilled_then_maintained(conn):
+    """Statistiques d'avis : calculées à partir des avis existants par la migration, puis tenues à jour par les triggers."""
+    conn.execute("INSERT INTO reviews (hotel_id, user_id, rating, comment) VALUES (1, 1, 8, 'ok')")
+    migrate(conn, target=7)
+    assert load_review_stats(conn, [1])[1]["review_count"] == 1
+
+    conn.execute("INSERT INTO reviews (hotel_id, user_id, rating, comment) VALUES (1, 1, 10, 'ok')")
+    assert load_review_stats(conn, [1])[1]["average_rating"] == 9
+
+def test_migration_8_text_search_indexes_existing_rows(conn):
+    """Recherche plein texte : hôtels et avis existants indexés par la migration, nouveaux avis par les triggers."""
+    conn.execute("INSERT INTO hotels (name, description, address) VALUES ('Le Parisien Luxe', 'Vue sur la Seine', 'Paris')")
+    migrate(conn, target=8)
+    assert [r["hotel_id"] for r in search_text(conn, "seine")] == [1]
+
+    conn.execute("INSERT INTO reviews (hotel_id, user_id, rating, comment) VALUES (1, 1, 9, 'Spa relaxant')")
+    assert [r["hotel_id"] for r in search_text(conn, "relaxant")] == [1]
+
+def test_migration_9_geo_index_covers_existing_hotels(conn):
+    """Index spatial : hôtels géolocalisés indexés par la migration, nouvelles positions par les triggers."""
+    conn.execute("INSERT INTO hotels (name, latitude, longitude) VALUES ('Le Parisien Luxe', 48.8566, 2.3522)")
+    migrate(conn, target=9)
+    assert hotel_ids_in_bounds(conn, 48, 2, 49, 3) == [1]
+
+    conn.execute("INSERT INTO hotels (name, latitude, longitude) VALUES ('Nice Riviera Palace', 43.7102, 7.2620)")
+    assert hotel_ids_in_bounds(conn, 40, -10, 52, 10) == [1, 2]
+
+def test_migration_10_occupancy_rebuilt_from_existing_reservations(conn):
+    """Occupation par nuit : calculée à partir des réservations payées existantes, même si la table existait vide."""
+    conn.executescript("""
+        ALTER TABLE hotels ADD COLUMN rooms INTEGER;
+        CREATE TABLE hotel_occupancy (hotel_id INTEGER NOT NULL, night TEXT NOT NULL, booked INTEGER NOT NULL DEFAULT 0,
+                                      PRIMARY KEY (hotel_id, night)) WITHOUT ROWID;
+        INSERT INTO hotels (name, rooms) VALUES ('Le Parisien Luxe', 1);
+        INSERT INTO reservations (hotel_id, checkin, checkout, status) VALUES (1, '2025-05-01', '2025-05-03', 'paid');
+    """)
+    migrate(conn, target=11)
+    index = AvailabilityIndex()
+    index.ensure_loaded(conn)
+
+    assert not index.is_available(1, "2025-05-02", "2025-05-03")
+    assert index.is_available(1, "2025-05-03", "2025-05-04")
+
+def test_migration_11_catalog_version_counts_writes(conn):
+    """Version du catalogue : table et triggers créés par la migration, incrémentée à chaque écriture suivie."""
+    migrate(conn, target=11)
+    before = get_catalog_version(conn)
+    conn.execute("INSERT INTO hotels (name) VALUES ('Le Parisien Luxe')")
+    conn.execute("INSERT INTO cities (name) VALUES ('Paris')")
+    assert get_catalog_version(conn) == before + 2
@@ -0,0 +1,72 @@
+import os
+import signal
+import bcrypt
+import pytest
+from appMotDePasse import PasswordHasher, PasswordHasherBusy, MAX_PENDING_PER_WORKER, hash_rounds
+
+@pytest.fixture(scope="module")
+def hasher():
+    """Deux processus de calcul, coût minimal (4) pour des tests rapides."""
+    hasher = PasswordHasher(rounds=4, workers=2, queue_timeout=0.05)
+    hasher.warm_up()
+    yield hasher
+    hasher.close()
+
+def test_hashing_runs_in_worker_processes(hasher):
+    assert hasher._run(os.getpid) != os.getpid()
+    hashed = hasher.hash("motdepasse")
+    assert hashed.startswith("$2b$04$")
+    assert hasher.verify("motdepasse", hashed) == (True, None)
+    assert hasher.verify("mauvais", hashed) == (False, None)
+    assert hasher.verify("motdepasse", "pas-un-hash") == (False, None)
+    assert hasher.verify("", hashed) == (False, None)
+
+def test_login_rehashes_to_current_cost(hasher):
+    """Hash enregistré avec un autre coût : nouveau hash renvoyé au coût actuel, lui-même stable."""
+    old = bcrypt.hashpw(b"motdepasse", bcrypt.gensalt(5)).decode()
+    valid, new_hash = hasher.verify("motdepasse", old)
+    assert valid and hash_rounds(new_hash) == 4
+    assert hasher.verify("motdepasse", new_hash) == (True, None)
+    assert hasher.verify("mauvais", old) == (False, None)
+
+def test_existing_flask_bcrypt_hashes_still_verify(hasher):
+    """Hashes Flask-Bcrypt existants (y compris mots de passe de plus de 72 octets, tronqués par bcrypt)."""
+    long_password = "é" * 50
+    stored = bcrypt.hashpw(long_password.encode()[:72], bcrypt.gensalt(4)).decode()
+    assert hasher.verify(long_password, stored) == (True, None)
+
+def test_full_queue_raises_busy(hasher):
+    taken = [hasher._slots.acquire(blocking=False) for _ in range(2 * MAX_PENDING_PER_WORKER)]
+    try:
+        assert all(taken)
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("motdepasse")
+    finally:
+        for _ in taken:
+            hasher._slots.release()
+    assert hasher.hash("motdepasse")
+
+def start_nested_pool():
+    """Exécutée dans un processus du pool : ce que ferait un module principal réimporté qui demande un hachage."""
+    nested = PasswordHasher(rounds=4, workers=2)
+    return nested._executor(), nested._run(os.getpid) == os.getpid(), nested.verify("x", nested.hash("x"))
+
+def test_no_pool_is_created_inside_a_worker(hasher):
+    """Un processus de calcul ne crée jamais son propre pool : le calcul y est fait sur place."""
+    assert hasher._run(start_nested_pool) == (None, True, (True, None))
+
+def test_inline_mode_without_workers():
+    hasher = PasswordHasher(rounds=4, workers=0)
+    assert hasher._run(os.getpid) == os.getpid()
+    assert hasher.verify("x", hasher.hash("x")) == (True, None)
+
+def test_killed_worker_is_replaced():
+    """Processus de calcul tué : le pool est remplacé et le calcul aboutit."""
+    hasher = PasswordHasher(rounds=4, workers=1)
+    try:
+        hasher.warm_up()
+        for pid in list(hasher._pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        assert hasher.verify("x", hasher.hash("x")) == (True, None)
+    finally:
+        hasher.close()
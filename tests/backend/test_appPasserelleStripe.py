@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+import time
+import pytest
+import stripe
+from appConnexion import open_connection
+from appEcriture import SingleWriter
+from appPasserelleStripe import StripeGateway, is_retryable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from stripe_stub import StripeStub
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "hotels.db")
+    conn = open_connection(path)
+    conn.execute("CREATE TABLE user (id_user INTEGER PRIMARY KEY, email TEXT, first_name TEXT, name TEXT, "
+                 "stripe_customer_id TEXT DEFAULT NULL)")
+    conn.executemany("INSERT INTO user (id_user, email, first_name, name) VALUES (?, ?, ?, ?)",
+                     [(i, f"client{i}@example.com", f"Prénom{i}", f"Nom{i}") for i in range(1, 6)])
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+def stub():
+    with StripeStub(stall_seconds=1.0) as stub:
+        yield stub
+
+@pytest.fixture
+def gateway(db_path, stub):
+    writer = SingleWriter(db_path)
+    gateway = StripeGateway(api_key="sk_test_stub", api_base=stub.url, connect_timeout=1, read_timeout=0.3,
+                            retry_base=0.01, retry_max=0.05, writer=writer)
+    yield gateway
+    gateway.close()
+    writer.close()
+
+@pytest.fixture
+def conn(db_path):
+    conn = open_connection(db_path)
+    yield conn
+    conn.close()
+
+def checkout(gateway, customer_id):
+    return gateway.create_checkout_session(customer=customer_id, mode="payment",
+                                           success_url="http://127.0.0.1:5003/success")
+
+def test_customer_is_created_once_then_served_from_cache(gateway, stub, conn):
+    """Premier paiement : client créé et enregistré ; ensuite ni appel Stripe ni requête SQL ; une connexion HTTP."""
+    customer_id = gateway.customer_for(conn, "1")
+    assert customer_id == "cus_stub_1"
+    assert conn.execute("SELECT stripe_customer_id FROM user WHERE id_user = 1").fetchone()[0] == "cus_stub_1"
+
+    conn.execute("UPDATE user SET stripe_customer_id = 'modifié' WHERE id_user = 1")
+    for _ in range(5):
+        assert gateway.customer_for(conn, 1) == "cus_stub_1"
+        assert checkout(gateway, customer_id).url.startswith("https://checkout.stripe.com/")
+    assert [path for path, _, _ in stub.requests].count("/v1/customers") == 1
+    assert stub.connections == 1
+
+    assert gateway.customer_for(conn, 99) is None
+    gateway.forget_customer(1)
+    assert gateway.customer_for(conn, 1) == "modifié"
+
+def test_concurrent_payments_create_a_single_customer(gateway, stub, db_path):
+    stub.delay = 0.05
+    results = []
+
+    def pay():
+        own = open_connection(db_path)
+        results.append(gateway.customer_for(own, 2))
+        own.close()
+
+    threads = [threading.Thread(target=pay) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert set(results) == {"cus_stub_1"}
+    assert len(stub.requests) == 1
+
+def test_transient_failures_are_retried_with_the_same_idempotency_key(gateway, stub, conn):
+    """500 puis réponse bloquée au-delà du délai de lecture : nouvel essai, un seul client chez Stripe."""
+    stub.fail_next = 1
+    stub.stall_next = 1
+    started = time.monotonic()
+    assert gateway.customer_for(conn, 3) == "cus_stub_1"
+    assert time.monotonic() - started < 1.0  # Pas d'attente de la réponse bloquée
+    keys = [key for _, _, key in stub.requests]
+    assert len(keys) == 3 and len(set(keys)) == 1
+
+def test_retries_are_bounded(gateway, stub):
+    stub.stall_next = 10
+    started = time.monotonic()
+    with pytest.raises(stripe.error.APIConnectionError):
+        checkout(gateway, "cus_x")
+    assert len(stub.requests) == 3  # Premier appel + MAX_RETRIES
+    assert time.monotonic() - started < 1.5
+
+def test_permanent_errors_are_not_retried(gateway, stub):
+    with pytest.raises(stripe.error.InvalidRequestError):
+        gateway.call(lambda client: client.v1.products.create, {"name": "Hôtel"})
+    assert len(stub.requests) == 1
+    assert not is_retryable(stripe.error.CardError("Carte refusée", None, "card_declined"))
+    assert is_retryable(stripe.error.APIError("Erreur", http_status=503))
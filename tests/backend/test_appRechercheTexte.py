@@ -0,0 +1,66 @@
+import sqlite3
+import pytest
+from appRechercheTexte import build_match_query, ensure_text_search, search_text
+
+@pytest.fixture
+def conn():
+    """Fixture créant une base en mémoire avec deux hôtels, un avis et les tables FTS5."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE hotels (id INTEGER PRIMARY KEY, name TEXT, description TEXT, address TEXT);
+        CREATE TABLE reviews (id INTEGER PRIMARY KEY, hotel_id INTEGER, comment TEXT);
+        INSERT INTO hotels VALUES (1, 'Le Parisien Luxe', 'Suite avec vue sur la Seine', 'Paris');
+        INSERT INTO hotels VALUES (2, 'Nice Riviera Palace', 'Piscine à débordement', 'Nice');
+        INSERT INTO reviews VALUES (1, 1, 'Le spa est incroyable, très relaxant.');
+    """)
+    ensure_text_search(conn)
+    yield conn
+    conn.close()
+
+def test_search_ranks_hotels_and_highlights_matches(conn):
+    """Les hôtels existants sont indexés et les termes trouvés sont surlignés."""
+    results = search_text(conn, "piscine")
+
+    assert [r["hotel_id"] for r in results] == [2]
+    assert "<mark>Piscine</mark>" in results[0]["snippet"]
+
+def test_search_uses_review_text_and_ignores_accents(conn):
+    """Un mot présent uniquement dans un avis remonte l'hôtel, sans tenir compte des accents."""
+    assert [r["hotel_id"] for r in search_text(conn, "relaxant")] == [1]
+    assert [r["hotel_id"] for r in search_text(conn, "debordement")] == [2]
+
+def test_triggers_keep_index_in_sync(conn):
+    """Les triggers répercutent les mises à jour et suppressions dans l'index."""
+    conn.execute("UPDATE hotels SET description = 'Vue sur la Tour Eiffel' WHERE id = 1")
+    conn.execute("DELETE FROM hotels WHERE id = 2")
+
+    assert [r["hotel_id"] for r in search_text(conn, "eiffel")] == [1]
+    assert search_text(conn, "piscine") == []
+
+def test_candidate_filter_and_unsafe_input(conn):
+    """Les résultats sont restreints aux candidats ; la saisie ne peut pas injecter d'opérateurs FTS5."""
+    assert search_text(conn, "piscine", candidate_ids={1}) == []
+    assert build_match_query('spa" OR (') == '"spa"* "OR"*'
+
+def test_snippets_are_html_escaped(conn):
+    """Le texte des hôtels et des avis est échappé : seules les balises <mark> sont ajoutées."""
+    conn.execute("INSERT INTO hotels VALUES (3, 'Spa <script>alert(1)</script>', 'Calme & détente', 'Lyon')")
+    conn.execute("INSERT INTO reviews VALUES (2, 3, '<img src=x onerror=alert(1)> Spa génial')")
+    result = search_text(conn, "spa", candidate_ids={3})[0]
+
+    assert "<script>" not in result["snippet"] and "&lt;script&gt;" in result["snippet"]
+    assert "<mark>Spa</mark>" in result["snippet"]
+    assert result["review_snippet"].startswith("&lt;img src=x onerror=alert(1)&gt; <mark>Spa</mark>")
+
+def test_limit_and_candidates_keep_best_ranked_hotels(conn):
+    """Limite et candidats appliqués dans SQLite : même classement que sans limite, meilleur avis par hôtel."""
+    conn.executemany("INSERT INTO hotels VALUES (?, ?, 'Hôtel avec spa', 'Lyon')", [(i, f"Hôtel {i}") for i in range(3, 30)])
+    conn.executemany("INSERT INTO reviews (hotel_id, comment) VALUES (?, 'Spa correct')", [(i,) for i in range(3, 30)])
+    everything = search_text(conn, "spa", limit=100)
+
+    assert search_text(conn, "spa", limit=5) == everything[:5]
+    assert search_text(conn, "spa", limit=5, candidate_ids={1, 7, 8}) == [r for r in everything if r["hotel_id"] in {1, 7, 8}]
+    assert search_text(conn, "spa", candidate_ids=set()) == []
+    assert len(everything) == 28
+    assert "<mark>spa</mark> est incroyable" in next(r for r in everything if r["hotel_id"] == 1)["review_snippet"]
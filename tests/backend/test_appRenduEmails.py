@@ -0,0 +1,53 @@
+import os
+import pytest
+from jinja2 import FileSystemLoader
+from appRenduEmails import EmailRenderer, EMAIL_TEMPLATE_DIR, html_to_text
+
+@pytest.fixture
+def renderer(tmp_path):
+    return EmailRenderer(bytecode_dir=str(tmp_path), base_url="https://justdreams.fr/")
+
+def test_all_templates_compile_with_bytecode_cache(renderer, tmp_path):
+    """warm_up compile chaque template du dossier et écrit leur code compilé dans le cache sur disque."""
+    names = renderer.warm_up()
+    assert {"confirmation.html", "cancelConfirmation.html", "confirmationFormulaire.html", "newsletter.html"} <= set(names)
+    assert len(os.listdir(tmp_path)) == len(names)
+
+def test_render_produces_html_and_text_parts(renderer):
+    """Variables échappées dans le HTML, partie texte lisible, adresses statiques absolues."""
+    rendered = renderer.render("confirmation.html", first_name="<Léa>", hotel_name="Le Parisien Luxe",
+                               checkin="2025-07-01", checkout="2025-07-04", guests=2, total_price=1350)
+    assert "&lt;Léa&gt;" in rendered.html
+    assert 'href="https://justdreams.fr/static/CSS/confirmation.css"' in rendered.html
+    assert "Merci pour votre réservation, <Léa> !" in rendered.text
+    assert "Dates : du 2025-07-01 au 2025-07-04" in rendered.text
+    assert "Voir ma réservation (http://127.0.0.1:5003)" in rendered.text
+    assert "<" not in rendered.text.replace("<Léa>", "")
+
+def test_batch_reuses_one_compiled_template(renderer, monkeypatch):
+    """Un lot de messages ne lit et ne compile le template qu'une fois."""
+    loads = []
+    get_source = FileSystemLoader.get_source
+    monkeypatch.setattr(FileSystemLoader, "get_source",
+                        lambda self, env, name: loads.append(name) or get_source(self, env, name))
+
+    contexts = [{"first_name": f"Client {i}"} for i in range(50)]
+    rendered = renderer.render_batch("confirmationFormulaire.html", contexts)
+    renderer.render("confirmationFormulaire.html", first_name="Encore")
+    assert [r.text.splitlines()[0] for r in rendered[:2]] == ["🌟 Merci pour votre demande, Client 0 !",
+                                                             "🌟 Merci pour votre demande, Client 1 !"]
+    assert loads.count("confirmationFormulaire.html") == 1
+
+def test_text_template_takes_precedence(tmp_path):
+    """Un template <nom>.txt remplace le texte déduit du HTML."""
+    (tmp_path / "bienvenue.html").write_text("<p>Bonjour {{ name }}</p>", encoding="utf-8")
+    (tmp_path / "bienvenue.txt").write_text("Salut {{ name }} & bienvenue", encoding="utf-8")
+    rendered = EmailRenderer(template_dir=str(tmp_path), bytecode_dir=str(tmp_path)).render("bienvenue.html", name="A&B")
+    assert rendered.html == "<p>Bonjour A&amp;B</p>"
+    assert rendered.text == "Salut A&B & bienvenue"
+
+def test_html_to_text_skips_head_and_keeps_blocks():
+    assert html_to_text("<html><head><title>T</title><style>p{}</style></head>"
+                        "<body><h1>Titre</h1><p>Un  <b>mot</b></p><br><a href='mailto:x@y'>x@y</a></body></html>") \
+        == "Titre\n\nUn mot\n\nx@y\n"
+    assert EMAIL_TEMPLATE_DIR.endswith(os.path.join("templates", "email_templates"))
@@ -1,16 +1,60 @@
 import pytest
+import appConnexion
+import appInscription
+import appRoute
+from appCatalogue import HotelCatalog
+from appConnexion import ConnectionPool, open_connection
+from appInscription import issue_session_token
+from appMigrations import migrate
 from appRoute import app
 
 @pytest.fixture
-def client():
-    """Fixture pour créer un client de test Flask."""
+def client(tmp_path, monkeypatch):
+    """Fixture pour créer un client de test Flask, sur une base temporaire migrée (deux hôtels, une réservation de l'utilisateur 1)."""
+    path = str(tmp_path / "hotels.db")
+    conn = open_connection(path)
+    conn.executescript("""
+        CREATE TABLE countries (id INTEGER PRIMARY KEY, name TEXT, continent TEXT);
+        CREATE TABLE cities (id INTEGER PRIMARY KEY, name TEXT, country_id INTEGER);
+        CREATE TABLE hotels (id INTEGER PRIMARY KEY, name TEXT, city_id INTEGER, stars INTEGER, rooms INTEGER,
+            adults_per_room INTEGER, children_per_room INTEGER, pets_allowed INTEGER, parking INTEGER,
+            restaurant INTEGER, piscine INTEGER, spa INTEGER, gym INTEGER, price_per_night REAL,
+            free_wifi INTEGER, ev_charging INTEGER, wheelchair_accessible INTEGER, air_conditioning INTEGER,
+            washing_machine INTEGER, meal_plan TEXT, kitchenette INTEGER, hotel_rating REAL, address TEXT,
+            description TEXT, latitude REAL, longitude REAL, available_from DATE, available_to DATE, image_url TEXT);
+        CREATE TABLE user (id_user INTEGER PRIMARY KEY, name TEXT, first_name TEXT);
+        CREATE TABLE reviews (id INTEGER PRIMARY KEY, hotel_id INTEGER, user_id INTEGER, rating INTEGER,
+            comment TEXT, date_posted DATE);
+        CREATE TABLE reservations (id INTEGER PRIMARY KEY, user_id INTEGER, hotel_id INTEGER, checkin TEXT,
+                                   checkout TEXT, guests INTEGER, total_price REAL, first_name TEXT,
+                                   user_name TEXT, status TEXT, created_at TEXT);
+        INSERT INTO countries VALUES (1, 'France', 'Europe');
+        INSERT INTO cities VALUES (1, 'Paris', 1), (2, 'Nice', 1);
+        INSERT INTO hotels VALUES (1, 'Le Parisien Luxe', 1, 5, 12, 3, 0, 1, 1, 1, 1, 1, 1, 450,
+            1, 0, 0, 1, 0, 'breakfast', 0, 8.6, '1 rue de Rivoli', 'Spa et vue sur la Seine', 48.85, 2.35,
+            '2025-01-01', '2026-12-31', 'paris.jpg');
+        INSERT INTO hotels VALUES (2, 'Nice Riviera Palace', 2, 4, 8, 2, 1, 0, 1, 1, 1, 1, 0, 300,
+            1, 0, 0, 1, 0, 'half_board', 0, 9.1, '2 promenade des Anglais', 'Spa face à la mer', 43.70, 7.26,
+            '2025-01-01', '2026-12-31', 'nice.jpg');
+        INSERT INTO reservations VALUES (1, 1, 1, '2026-11-02', '2026-11-05', 2, 450, 'Jean', 'Dupont', 'confirmed',
+                                         '2026-10-01 10:00:00');
+    """)
+    migrate(conn)
+    conn.close()
+    monkeypatch.setattr(appConnexion, "pool", ConnectionPool(path))
+    monkeypatch.setattr(appRoute, "catalog", HotelCatalog())
     with app.test_client() as client:
         yield client
+    appConnexion.pool.close_all()
+
+def bearer(user_id, role="user"):
+    """En-tête Authorization avec un jeton de session signé (comme après /login)."""
+    return {"Authorization": f"Bearer {issue_session_token(user_id, role)}"}
 
 def test_get_user_reservations(client):
     """Test pour vérifier la récupération des réservations d'un utilisateur."""
     # Assumer que l'utilisateur avec ID 1 existe et a des réservations
-    response = client.get('/api/mes-reservations/1')
+    response = client.get('/api/mes-reservations/1', headers=bearer(1))
     
     # Vérifier le statut de la réponse
     assert response.status_code == 200
@@ -20,3 +64,34 @@ def test_get_user_reservations(client):
     assert isinstance(reservations, list)  # Doit être une liste
     if len(reservations) > 0:
         assert 'hotel_name' in reservations[0]  # Vérifier qu'un champ spécifique existe
+
+def test_get_user_reservations_without_token(client):
+    """Sans jeton de session : 401."""
+    assert client.get('/api/mes-reservations/1').status_code == 401
+
+def test_get_user_reservations_with_bad_or_expired_token(client, monkeypatch):
+    """Jeton illisible ou expiré : 401."""
+    response = client.get('/api/mes-reservations/1', headers={"Authorization": "Bearer pas-un-jeton"})
+    assert response.status_code == 401
+
+    headers = bearer(1)
+    monkeypatch.setattr(appInscription, "SESSION_TOKEN_MAX_AGE", -1)
+    assert client.get('/api/mes-reservations/1', headers=headers).status_code == 401
+
+def test_get_other_user_reservations_is_forbidden(client):
+    """Jeton valide d'un autre utilisateur : 403 (un administrateur y a accès)."""
+    assert client.get('/api/mes-reservations/1', headers=bearer(2)).status_code == 403
+    assert client.get('/api/mes-reservations/1', headers=bearer(2, "admin")).status_code == 200
+
+def test_search_text_get_filters(client):
+    """GET /search/text : filtres à choix multiples lus comme des listes, pas caractère par caractère."""
+    def hotel_ids(query):
+        response = client.get(f"/search/text?q=spa&{query}")
+        assert response.status_code == 200
+        return sorted(hotel["id"] for hotel in response.get_json())
+
+    assert hotel_ids("meal_plan=breakfast") == [1]
+    assert hotel_ids("stars=4&stars=5") == [1, 2]
+    assert hotel_ids("stars=45") == []
+    assert hotel_ids("hotel_rating=9") == [2]
+    assert hotel_ids("hotel_rating=8.5") == [1, 2]
@@ -0,0 +1,63 @@
+import json
+from decimal import Decimal
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from appCatalogue import HotelRecord
+from appSerialisation import (EQUIPMENT_COLUMNS, EQUIPMENT_LABELS, AMENITY_BITS, amenity_mask, amenity_labels,
+                              hotel_to_dict, hotel_to_pin, init_json, OrjsonProvider)
+
+def make_hotel(**overrides):
+    """Enregistrement d'hôtel minimal (avec piscine et Wi-Fi, sans adresse ni image)."""
+    flags = {column: 0 for column in EQUIPMENT_COLUMNS}
+    flags.update(piscine=1, free_wifi=1)
+    mask = amenity_mask(flags)
+    fields = dict(
+        id=1, name="Le Parisien Luxe", city_id=1, city="Paris", country="France", continent="Europe",
+        stars=5, rooms=12, adults_per_room=3, children_per_room=0, price_per_night=450.0,
+        hotel_rating=9.2, meal_plan="Petit-déjeuner", address="null", description="Luxe",
+        latitude=48.85, longitude=2.35, image_url=None, available_from="2025-01-01", available_to="2025-12-31",
+        **flags, amenities=mask, equipments=amenity_labels(mask), reviews=(), review_count=0,
+        average_rating=None, rating_histogram=(0, 0, 0, 0), last_review_date=None,
+    )
+    fields.update(overrides)
+    return HotelRecord(**fields)
+
+def test_amenity_mask_decodes_to_labels_in_display_order():
+    """Chaque combinaison d'équipements se relit dans l'ordre historique des listings."""
+    row = {column: 1 for column in EQUIPMENT_COLUMNS}
+    assert amenity_labels(amenity_mask(row)) == tuple(label for _, label in EQUIPMENT_LABELS)
+
+    row = {column: 0 for column in EQUIPMENT_COLUMNS}
+    row.update(kitchenette=1, parking=1)
+    mask = amenity_mask(row)
+    assert mask == AMENITY_BITS["parking"] | AMENITY_BITS["kitchenette"]
+    assert amenity_labels(mask) == ("Parking", "Kitchenette")
+    assert amenity_labels(0) == ()
+
+def test_hotel_formats_share_fallbacks():
+    """Listing et marqueur utilisent les mêmes valeurs par défaut (adresse, image) et équipements."""
+    hotel = make_hotel()
+    listing, pin = hotel_to_dict(hotel), hotel_to_pin(hotel)
+
+    for result in (listing, pin):
+        assert result["address"] == "Adresse inconnue"
+        assert result["image"] == "/static/Image/default.jpg"
+        assert result["equipments"] == ["Piscine", "Wi-Fi gratuit"]
+    assert listing["rating_histogram"] == {"7": 0, "8": 0, "9": 0, "10": 0}
+    assert pin["price"] == 450.0 and pin["rating"] == 9.2
+    assert hotel_to_dict(make_hotel(image_url="hotel1.jpg"), image_base="http://h/")["image"] == "http://h/hotel1.jpg"
+
+def test_orjson_provider_matches_default_provider():
+    """jsonify via orjson produit le même JSON (clés triées) que le fournisseur standard de Flask."""
+    pytest.importorskip("orjson")
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    assert isinstance(init_json(app), OrjsonProvider)
+
+    payload = {"b": [hotel_to_dict(make_hotel())], "a": "Séville", "price": Decimal("12.50")}
+    with app.app_context():
+        body = app.json.response(payload).get_data()
+    assert json.loads(body) == json.loads(default.dumps(payload))
+    assert list(json.loads(body)) == ["a", "b", "price"]
+    assert app.json.loads(app.json.dumps({7: 1})) == {"7": 1}
@@ -0,0 +1,157 @@
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+import pytest
+import stripe
+from flask import Flask, request
+from appConnexion import ConnectionPool, open_connection
+from appEcriture import SingleWriter
+from appWebhookStripe import StripeEventProcessor, ensure_events_table, parse_event
+
+SECRET = "whsec_test"
+
+class FakeStripe:
+    """Flux d'événements Stripe local : corps JSON signés comme par Stripe (en-tête Stripe-Signature)."""
+
+    def __init__(self, secret=SECRET):
+        self.secret = secret
+        self.count = 0
+
+    def checkout_completed(self, hotel_id=1, email="client@example.com"):
+        self.count += 1
+        return {
+            "id": f"evt_test_{self.count}",
+            "object": "event",
+            "type": "checkout.session.completed",
+            "data": {"object": {"id": f"cs_test_{self.count}", "customer": "cus_test",
+                                "metadata": {"hotel_id": str(hotel_id), "email": email}}},
+        }
+
+    def sign(self, event):
+        payload = json.dumps(event).encode("utf-8")
+        timestamp = int(time.time())
+        signature = hmac.new(self.secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+        return payload, f"t={timestamp},v1={signature}"
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "hotels.db")
+    conn = open_connection(path)
+    ensure_events_table(conn)
+    conn.execute("CREATE TABLE reservations (id INTEGER PRIMARY KEY, hotel_id INTEGER, email TEXT, session_id TEXT)")
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+def processor(db_path):
+    writer = SingleWriter(db_path)
+    connections = ConnectionPool(db_path)
+    processor = StripeEventProcessor(writer=writer, connections=connections, backoff_base=0, poll_interval=0.05)
+    processor.after_commit = []
+
+    @processor.handler("checkout.session.completed")
+    def insert_reservation(write_conn, session):
+        if not session["metadata"].get("email"):
+            raise ValueError("Metadata manquants")
+        write_conn.execute("INSERT INTO reservations (hotel_id, email, session_id) VALUES (?, ?, ?)",
+                           (session["metadata"]["hotel_id"], session["metadata"]["email"], session["id"]))
+        return processor.after_commit.append
+
+    yield processor
+    processor.close()
+    writer.close()
+    connections.close_all()
+
+@pytest.fixture
+def client(processor):
+    """Route minimale identique à /stripe-webhook : signature, enregistrement, accusé."""
+    app = Flask(__name__)
+
+    @app.route("/stripe-webhook", methods=["POST"])
+    def stripe_webhook():
+        try:
+            event_id, event_type = parse_event(request.data, request.headers.get("Stripe-Signature"), SECRET)
+        except (ValueError, stripe.error.SignatureVerificationError):
+            return "Invalid signature", 400
+        processor.receive(event_id, event_type, request.data)
+        return "", 200
+
+    return app.test_client()
+
+def query(db_path, sql):
+    conn = open_connection(db_path)
+    rows = [tuple(row) for row in conn.execute(sql)]
+    conn.close()
+    return rows
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "délai dépassé"
+        time.sleep(0.02)
+
+def test_replayed_stream_applies_each_event_once(client, processor, db_path):
+    """Renvois Stripe (doublons, désordre, requêtes concurrentes) : une réservation par événement."""
+    stripe_fake = FakeStripe()
+    events = [stripe_fake.checkout_completed(hotel_id=i % 3 + 1, email=f"client{i}@example.com") for i in range(15)]
+    deliveries = [stripe_fake.sign(event) for event in events for _ in range(3)]
+    random.Random(7).shuffle(deliveries)
+
+    def post(delivery):
+        payload, signature = delivery
+        assert client.post("/stripe-webhook", data=payload, headers={"Stripe-Signature": signature}).status_code == 200
+
+    threads = [threading.Thread(target=post, args=(delivery,)) for delivery in deliveries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    wait_until(lambda: len(processor.after_commit) == 15)
+    assert sorted(query(db_path, "SELECT session_id FROM reservations")) == sorted((f"cs_test_{i}",) for i in range(1, 16))
+    assert query(db_path, "SELECT DISTINCT status, attempts FROM stripe_events") == [("processed", 1)]
+
+    # Renvoi tardif d'un événement déjà appliqué : accusé, sans nouvelle réservation
+    post(stripe_fake.sign(events[0]))
+    assert processor.process_due() == 0
+    assert query(db_path, "SELECT COUNT(*) FROM reservations") == [(15,)]
+
+def test_ack_does_not_wait_for_processing(client, processor, db_path):
+    """La route répond pendant qu'un gestionnaire lent est bloqué ; l'événement est appliqué ensuite."""
+    release = threading.Event()
+    slow = processor._handlers["checkout.session.completed"]
+    processor.handler("checkout.session.completed")(lambda conn, session: release.wait(5) and slow(conn, session))
+
+    stripe_fake = FakeStripe()
+    payload, signature = stripe_fake.sign(stripe_fake.checkout_completed())
+    assert client.post("/stripe-webhook", data=payload, headers={"Stripe-Signature": signature}).status_code == 200
+    assert query(db_path, "SELECT status FROM stripe_events") == [("pending",)]
+
+    release.set()
+    wait_until(lambda: query(db_path, "SELECT status FROM stripe_events") == [("processed",)])
+    assert query(db_path, "SELECT COUNT(*) FROM reservations") == [(1,)]
+
+def test_bad_signature_is_rejected_and_not_recorded(client, db_path):
+    stripe_fake = FakeStripe(secret="whsec_autre")
+    payload, signature = stripe_fake.sign(stripe_fake.checkout_completed())
+    assert client.post("/stripe-webhook", data=payload, headers={"Stripe-Signature": signature}).status_code == 400
+    assert query(db_path, "SELECT COUNT(*) FROM stripe_events") == [(0,)]
+
+def test_failed_and_unknown_events_are_recorded(client, processor, db_path):
+    """Données invalides : 'failed' sans écriture partielle ; type sans gestionnaire : 'ignored'."""
+    stripe_fake = FakeStripe()
+    invalid = stripe_fake.checkout_completed(email="")
+    unknown = dict(stripe_fake.checkout_completed(), type="customer.created")
+    for event in (invalid, unknown):
+        payload, signature = stripe_fake.sign(event)
+        client.post("/stripe-webhook", data=payload, headers={"Stripe-Signature": signature})
+
+    wait_until(lambda: query(db_path, "SELECT COUNT(*) FROM stripe_events WHERE status = 'pending'") == [(0,)])
+    statuses = dict((row[0], row[1:]) for row in query(db_path, "SELECT id, status, last_error FROM stripe_events"))
+    assert statuses[invalid["id"]] == ("failed", "ValueError: Metadata manquants")
+    assert statuses[unknown["id"]] == ("ignored", None)
+    assert query(db_path, "SELECT COUNT(*) FROM reservations") == [(0,)]
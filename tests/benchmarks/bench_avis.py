@@ -0,0 +1,89 @@
+"""
+Benchmark du chargement des avis pour les routes de listing.
+
+Compare l'ancienne approche (une requête `reviews JOIN user` par hôtel)
+avec le chargement groupé de appAvis.load_reviews_for_hotels, pour
+plusieurs tailles de catalogue. Affiche le nombre de requêtes SQL et
+la latence médiane.
+
+Lancement (depuis la racine du projet) :
+    PYTHONPATH=Backend/app python tests/benchmarks/bench_avis.py
+"""
+
+import random
+import sqlite3
+import statistics
+import time
+
+from appAvis import format_review, load_reviews_for_hotels
+
+CATALOG_SIZES = [10, 50, 100, 500, 1000, 2000]
+REVIEWS_PER_HOTEL = 5
+REPEAT = 7
+
+
+def build_database(hotel_count):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE user (id_user INTEGER PRIMARY KEY, name TEXT, first_name TEXT);
+        CREATE TABLE hotels (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE reviews (id INTEGER PRIMARY KEY AUTOINCREMENT, hotel_id INTEGER, user_id INTEGER,
+                              rating INTEGER, comment TEXT, date_posted DATE);
+    """)
+    conn.executemany("INSERT INTO user VALUES (?, ?, ?)", [(i, f"Nom{i}", f"Prenom{i}") for i in range(1, 201)])
+    conn.executemany("INSERT INTO hotels VALUES (?, ?)", [(i, f"Hotel {i}") for i in range(1, hotel_count + 1)])
+    conn.executemany(
+        "INSERT INTO reviews (hotel_id, user_id, rating, comment, date_posted) VALUES (?, ?, ?, ?, ?)",
+        [(h, random.randint(1, 200), random.randint(7, 10), "Très bon séjour", f"2025-{random.randint(1, 12):02d}-15")
+         for h in range(1, hotel_count + 1) for _ in range(REVIEWS_PER_HOTEL)]
+    )
+    conn.commit()
+    return conn
+
+
+def per_hotel_queries(conn, hotel_ids):
+    """Ancienne approche : une requête par hôtel (N+1)."""
+    result = {}
+    for hotel_id in hotel_ids:
+        cursor = conn.execute("""
+            SELECT r.rating, r.comment, r.date_posted, u.first_name, u.name
+            FROM reviews r
+            JOIN user u ON r.user_id = u.id_user
+            WHERE r.hotel_id = ?
+            ORDER BY r.date_posted DESC
+        """, (hotel_id,))
+        result[hotel_id] = [format_review(row) for row in cursor.fetchall()]
+    return result
+
+
+def measure(conn, loader, hotel_ids):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    loader(conn, hotel_ids)
+    conn.set_trace_callback(None)
+
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        loader(conn, hotel_ids)
+        timings.append((time.perf_counter() - start) * 1000)
+    # +1 pour la requête de listing des hôtels elle-même
+    return len(statements) + 1, statistics.median(timings)
+
+
+def main():
+    random.seed(42)
+    print(f"{'hôtels':>8} | {'requêtes avant':>14} | {'ms avant':>9} | {'requêtes après':>14} | {'ms après':>9} | {'gain':>6}")
+    print("-" * 75)
+    for size in CATALOG_SIZES:
+        conn = build_database(size)
+        hotel_ids = [row["id"] for row in conn.execute("SELECT id FROM hotels")]
+        before_queries, before_ms = measure(conn, per_hotel_queries, hotel_ids)
+        after_queries, after_ms = measure(conn, load_reviews_for_hotels, hotel_ids)
+        print(f"{size:>8} | {before_queries:>14} | {before_ms:>9.2f} | {after_queries:>14} | {after_ms:>9.2f} | {before_ms / after_ms:>5.1f}x")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark d'une rafale de connexions (/login) sur un serveur Flask local.
+
+Compare le hachage bcrypt dans le thread de la requête (ancienne approche,
+PASSWORD_HASH_WORKERS = 0) avec le pool de processus de appMotDePasse.
+Pendant que LOGIN_CLIENTS clients se connectent en boucle, une route sans
+rapport (liste des hôtels) est appelée toutes les 20 ms. Affiche le débit de
+connexions et la latence médiane / p99 de cette route.
+
+Lancement (depuis la racine du projet) :
+    PYTHONPATH=Backend/app python tests/benchmarks/bench_connexion.py
+"""
+
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ["HOTELS_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "hotels.db")
+
+import bcrypt
+import requests
+from flask import Flask, jsonify
+from werkzeug.serving import make_server
+
+from appConnexion import get_db_connection, init_db, open_connection
+from appInscription import inscription_bp, init_inscription_extensions
+from appMotDePasse import password_hasher
+
+ROUNDS = 10
+USERS = 50
+LOGIN_CLIENTS = 16
+DURATION = 5.0
+PROBE_INTERVAL = 0.02
+
+def build_database():
+    conn = open_connection()
+    conn.executescript("""
+        CREATE TABLE user (id_user INTEGER PRIMARY KEY, name TEXT, first_name TEXT, email TEXT UNIQUE,
+                           password TEXT, phone TEXT, stripe_customer_id TEXT);
+        CREATE TABLE hotels (id INTEGER PRIMARY KEY, name TEXT, city TEXT, price_per_night REAL);
+    """)
+    hashed = bcrypt.hashpw(b"motdepasse", bcrypt.gensalt(ROUNDS)).decode()
+    conn.executemany("INSERT INTO user (name, first_name, email, password) VALUES (?, ?, ?, ?)",
+                     [(f"Nom{i}", f"Prenom{i}", f"client{i}@example.com", hashed) for i in range(USERS)])
+    conn.executemany("INSERT INTO hotels (name, city, price_per_night) VALUES (?, ?, ?)",
+                     [(f"Hôtel {i}", "Nice", 100 + i) for i in range(200)])
+    conn.commit()
+    conn.close()
+
+def build_app():
+    app = Flask(__name__)
+    app.config["BCRYPT_LOG_ROUNDS"] = ROUNDS
+    init_db(app)
+    init_inscription_extensions(app)
+    app.register_blueprint(inscription_bp)
+
+    @app.route("/hotels")
+    def hotels():
+        rows = get_db_connection().execute("SELECT id, name, city, price_per_night FROM hotels LIMIT 50").fetchall()
+        return jsonify([dict(row) for row in rows])
+
+    return app
+
+def run(app, workers):
+    password_hasher.close()
+    password_hasher.workers = workers
+    password_hasher.warm_up()
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    stop = time.monotonic() + DURATION
+    logins, refused, probes = [], [], []
+
+    def storm(number):
+        session = requests.Session()
+        while time.monotonic() < stop:
+            response = session.post(f"{base}/login", json={"email": f"client{number % USERS}@example.com",
+                                                           "password": "motdepasse"})
+            (logins if response.status_code == 200 else refused).append(1)
+
+    def probe():
+        session = requests.Session()
+        while time.monotonic() < stop:
+            started = time.perf_counter()
+            session.get(f"{base}/hotels")
+            probes.append(time.perf_counter() - started)
+            time.sleep(PROBE_INTERVAL)
+
+    threads = [threading.Thread(target=storm, args=(n,)) for n in range(LOGIN_CLIENTS)]
+    threads.append(threading.Thread(target=probe))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+
+    probes.sort()
+    return (len(logins) / DURATION, len(refused), statistics.median(probes) * 1000,
+            probes[int(len(probes) * 0.99)] * 1000)
+
+def main():
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    build_database()
+    app = build_app()
+    pool_workers = max(1, (os.cpu_count() or 2) - 1)
+    results = {"thread de la requête": run(app, 0), f"pool ({pool_workers} processus)": run(app, pool_workers)}
+    password_hasher.close()
+
+    print(f"{LOGIN_CLIENTS} clients /login pendant {DURATION:.0f} s, bcrypt coût {ROUNDS}, {os.cpu_count()} cœur(s)")
+    print(f"{'hachage':>22} | {'logins/s':>8} | {'503':>5} | {'/hotels médiane ms':>18} | {'/hotels p99 ms':>14}")
+    for name, (throughput, refused, median, p99) in results.items():
+        print(f"{name:>22} | {throughput:8.1f} | {refused:5d} | {median:18.1f} | {p99:14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark des appels Stripe de /create-checkout-session, contre le serveur
+local stripe_stub.py (latence réseau simulée).
+
+Compare l'ancienne approche (stripe.Customer.create / stripe.checkout.Session.create
+avec le client HTTP par défaut du SDK, client Stripe relu en base à chaque
+paiement) avec appPasserelleStripe.StripeGateway (connexions réutilisées,
+délais stricts, cache des clients Stripe). Affiche la latence médiane et
+p95 par paiement, le nombre de connexions TCP, puis la durée d'un paiement
+quand Stripe ne répond pas.
+
+Lancement (depuis la racine du projet) :
+    PYTHONPATH=Backend/app python tests/benchmarks/bench_stripe.py
+"""
+
+import sqlite3
+import statistics
+import time
+
+import stripe
+
+from appPasserelleStripe import StripeGateway
+from stripe_stub import StripeStub
+
+PAYMENTS = 200
+USERS = 20
+LATENCY = 0.005   # Latence simulée de chaque réponse Stripe (secondes)
+STALL = 5.0       # Réponse bloquée (panne partielle côté Stripe)
+
+SESSION = dict(payment_method_types=["card"], mode="payment",
+               success_url="http://127.0.0.1:5003/success", cancel_url="http://127.0.0.1:5003/cancel")
+
+class _Writer:
+    """Écrivain minimal : exécute l'écriture directement sur la base en mémoire."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, job, *args):
+        result = job(self.conn, *args)
+        self.conn.commit()
+        return result
+
+def build_database():
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE user (id_user INTEGER PRIMARY KEY, email TEXT, first_name TEXT, name TEXT, "
+                 "stripe_customer_id TEXT)")
+    conn.executemany("INSERT INTO user (id_user, email, first_name, name) VALUES (?, ?, ?, ?)",
+                     [(i, f"client{i}@example.com", f"Prenom{i}", f"Nom{i}") for i in range(1, USERS + 1)])
+    conn.commit()
+    return conn
+
+def legacy_payment(conn, user_id):
+    """Ancienne approche : client Stripe relu en base, SDK global (délai de lecture 80 s)."""
+    row = conn.execute("SELECT email, first_name, name, stripe_customer_id FROM user WHERE id_user = ?",
+                       (user_id,)).fetchone()
+    customer_id = row["stripe_customer_id"]
+    if not customer_id:
+        customer_id = stripe.Customer.create(email=row["email"], name=f"{row['first_name']} {row['name']}").id
+        conn.execute("UPDATE user SET stripe_customer_id = ? WHERE id_user = ?", (customer_id, user_id))
+        conn.commit()
+    return stripe.checkout.Session.create(customer=customer_id, **SESSION).url
+
+def gateway_payment(gateway, conn, user_id):
+    return gateway.create_checkout_session(customer=gateway.customer_for(conn, user_id), **SESSION).url
+
+def measure(pay):
+    durations = []
+    for number in range(PAYMENTS):
+        started = time.perf_counter()
+        pay(number % USERS + 1)
+        durations.append(time.perf_counter() - started)
+    durations.sort()
+    return statistics.median(durations) * 1000, durations[int(len(durations) * 0.95)] * 1000
+
+def timed(pay):
+    started = time.perf_counter()
+    try:
+        pay(1)
+        outcome = "réponse"
+    except stripe.error.StripeError as e:
+        outcome = type(e).__name__
+    return time.perf_counter() - started, outcome
+
+def main():
+    results = {}
+
+    with StripeStub(delay=LATENCY, stall_seconds=STALL) as stub:
+        stripe.api_key = "sk_test_stub"
+        stripe.api_base = stub.url
+        conn = build_database()
+        results["SDK par défaut"] = measure(lambda user_id: legacy_payment(conn, user_id)) + (stub.connections,)
+        stub.stall_next = 1
+        stall = timed(lambda user_id: legacy_payment(conn, user_id))
+
+    with StripeStub(delay=LATENCY, stall_seconds=STALL) as stub:
+        conn = build_database()
+        gateway = StripeGateway(api_key="sk_test_stub", api_base=stub.url, read_timeout=1.0, writer=_Writer(conn))
+        results["StripeGateway"] = measure(lambda user_id: gateway_payment(gateway, conn, user_id)) + (stub.connections,)
+        stub.stall_next = 1
+        gateway_stall = timed(lambda user_id: gateway_payment(gateway, conn, user_id))
+        gateway.close()
+
+    print(f"{PAYMENTS} paiements, {USERS} utilisateurs, latence Stripe simulée {LATENCY * 1000:.0f} ms")
+    print(f"{'client':>16} | {'médiane ms':>10} | {'p95 ms':>8} | {'connexions':>10}")
+    for name, (median, p95, connections) in results.items():
+        print(f"{name:>16} | {median:10.2f} | {p95:8.2f} | {connections:10d}")
+    print(f"\nRéponse Stripe bloquée {STALL:.0f} s :")
+    print(f"  SDK par défaut : {stall[0]:.2f} s ({stall[1]})")
+    print(f"  StripeGateway  : {gateway_stall[0]:.2f} s ({gateway_stall[1]}, nouvel essai après le délai de lecture)")
+
+if __name__ == "__main__":
+    main()
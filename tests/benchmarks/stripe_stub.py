@@ -0,0 +1,102 @@
+"""
+Serveur HTTP local imitant les deux points d'accès Stripe utilisés par
+/create-checkout-session : POST /v1/customers et POST /v1/checkout/sessions.
+
+- Réponses JSON au format Stripe (id, object, url pour la session).
+- Clés d'idempotence respectées : même clé → même réponse, comme Stripe.
+- Injection de pannes : `delay` (latence de chaque réponse), `stall_next`
+  (réponses bloquées plus longtemps que le délai de lecture du client) et
+  `fail_next` (réponses 500).
+- Compteurs : `connections` (connexions TCP ouvertes) et `requests`.
+
+Utilisé par bench_stripe.py et par tests/backend/test_appPasserelleStripe.py :
+    with StripeStub() as stub:
+        StripeGateway(api_key="sk_test_stub", api_base=stub.url)
+"""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Connexions gardées ouvertes entre les requêtes
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # En-têtes et corps sans attente
+        with self.server.stub.lock:
+            self.server.stub.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        stub = self.server.stub
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        params = {key: values[0] for key, values in parse_qs(body).items()}
+        key = self.headers.get("Idempotency-Key")
+
+        with stub.lock:
+            stub.requests.append((self.path, params, key))
+            stalled = stub.stall_next > 0
+            stub.stall_next -= stalled
+            failed = not stalled and stub.fail_next > 0
+            stub.fail_next -= failed
+        time.sleep(stub.stall_seconds if stalled else stub.delay)
+
+        if failed:
+            return self._reply(500, {"error": {"type": "api_error", "message": "Erreur simulée"}})
+        with stub.lock:
+            if key in stub.responses:
+                return self._reply(200, stub.responses[key])
+            stub.count += 1
+            if self.path == "/v1/customers":
+                obj = {"id": f"cus_stub_{stub.count}", "object": "customer",
+                       "email": params.get("email"), "name": params.get("name")}
+            elif self.path == "/v1/checkout/sessions":
+                obj = {"id": f"cs_stub_{stub.count}", "object": "checkout.session",
+                       "customer": params.get("customer"),
+                       "url": f"https://checkout.stripe.com/c/pay/cs_stub_{stub.count}"}
+            else:
+                return self._reply(404, {"error": {"type": "invalid_request_error", "message": "Inconnu"}})
+            if key:
+                stub.responses[key] = obj
+        self._reply(200, obj)
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client parti après son délai de lecture
+
+class StripeStub:
+    def __init__(self, delay=0.0, stall_seconds=2.0):
+        self.delay = delay
+        self.stall_seconds = stall_seconds
+        self.stall_next = 0
+        self.fail_next = 0
+        self.connections = 0
+        self.count = 0
+        self.requests = []
+        self.responses = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()